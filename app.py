@@ -3,14 +3,34 @@
 import streamlit as st
 import os
 import json
-import requests
 from datetime import datetime
-from fpdf import FPDF
 from dotenv import load_dotenv
+from streamlit.errors import StreamlitAPIException
 from streamlit_option_menu import option_menu
 import base64
-from io import BytesIO
+from io import BytesIO, StringIO
 import re
+import secrets
+
+from core.bulk_reviews import (REVIEW_COLUMNS, ReviewCheckpoint, build_archive, checkpoint_path_for, generate_reviews,
+                               read_reviews)
+from core.career_graph import career_paths
+from core.chat_context import build_chat_context
+from core.chat_view import CHAT_PAGE_TURNS, turn_html, visible_turns
+from core.circuit_breaker import get_circuit_breaker
+from core.groq_client import DEFAULT_SYSTEM_PROMPT, GroqError, stream_chat_with_groq
+from core.guidance import (EXPERIENCE_LEVELS, career_path_outline_prompt, career_path_prompt, has_review_content,
+                           review_report_prompt, skills_gap_explain_prompt, skills_gap_prompt)
+from core.job_matching import get_job_index
+from core.llm_cache import get_cache
+from core.llm_metrics import get_metrics
+from core.rate_limiter import PRIORITY_CHAT, PRIORITY_INTERACTIVE, get_rate_limiter
+from core.resume_enhancer import (ENHANCE_PROMPTS, LINE_FIELDS, enhance_changed_lines, enhance_sections,
+                                  record_enhancement)
+from core.resume_pdf import generate_pdf
+from core.session_store import get_session_store
+from core.skills_index import get_skills_index, normalize
+from core.speculation import get_speculator
 
 # Load environment variables
 load_dotenv()
@@ -23,14 +43,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load custom CSS
-def load_css():
+# Read custom CSS once per process; reruns only re-emit the cached stylesheet
+@st.cache_resource
+def read_css():
     try:
         with open("style.css", "r") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+            return f"<style>{f.read()}</style>"
     except FileNotFoundError:
         # Add comprehensive CSS styling if style.css is not found
-        st.markdown("""
+        return """
         <style>
         .main-header {
             text-align: center;
@@ -160,196 +181,52 @@ def load_css():
             border-left: 4px solid #2e7d32;
         }
         </style>
-        """, unsafe_allow_html=True)
+        """
+
+# Load custom CSS
+def load_css():
+    st.markdown(read_css(), unsafe_allow_html=True)
 
 load_css()
 
 # Initialize session state
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
-if 'resume_data' not in st.session_state:
-    st.session_state.resume_data = {}
-
-# Groq API function with better error handling
-def chat_with_groq(message, system_prompt="You are a helpful career counselor and mental health assistant."):
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        return "Error: Please set your GROQ_API_KEY in the .env file. You can get an API key from https://console.groq.com/"
-    
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    data = {
-        "model": "llama3-8b-8192",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": message}
-        ],
-        "max_tokens": 1024,
-        "temperature": 0.7
-    }
-    
+# The id doubles as the session code a user enters to get back to their session after a reload.
+# It unlocks the resume and chat, so it is only ever shown to its owner, never put in a URL.
+SESSION_CODE = re.compile(r"[0-9a-f]{32}")
+
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = secrets.token_hex(16)
+
+# Resume data and chat history live in the session store, which may evict and restore them between runs
+def current_session():
+    return get_session_store().get(st.session_state.session_id)
+
+# Rerun only the calling fragment, or the whole app when this run wasn't a fragment rerun
+def rerun_fragment():
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        
-        response_data = response.json()
-        if "choices" in response_data and response_data["choices"]:
-            return response_data["choices"][0]["message"]["content"]
-        else:
-            return "Error: Invalid response from API"
-            
-    except requests.exceptions.Timeout:
-        return "Error: Request timed out. Please try again."
-    except requests.exceptions.ConnectionError:
-        return "Error: Connection failed. Please check your internet connection."
-    except requests.exceptions.HTTPError as e:
-        if response.status_code == 401:
-            return "Error: Invalid API key. Please check your GROQ_API_KEY."
-        elif response.status_code == 429:
-            return "Error: Rate limit exceeded. Please try again later."
-        else:
-            return f"Error: HTTP {response.status_code} - {str(e)}"
-    except json.JSONDecodeError:
-        return "Error: Invalid response format from API"
-    except Exception as e:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+# Stream a Groq reply into the page as it is generated
+def stream_groq_response(message, system_prompt=DEFAULT_SYSTEM_PROMPT, use_cache=True,
+                         priority=PRIORITY_INTERACTIVE, context=None, call_site="other"):
+    try:
+        return st.write_stream(stream_chat_with_groq(message, system_prompt, use_cache=use_cache,
+                                                     priority=priority, context=context, call_site=call_site))
+    except GroqError as e:
         return f"Error: {str(e)}"
 
-# AI Enhancement function with better error handling
+# AI Enhancement function with better error handling; after the first pass only new or edited lines are sent
 def enhance_resume_content(field_name, content):
-    if not content or not content.strip():
-        return content
-    
-    prompts = {
-        'education': f"Enhance this education section for a professional resume. Make it concise and impactful: {content}",
-        'experience': f"Enhance this work experience section for a professional resume. Use action verbs and quantify achievements where possible: {content}",
-        'skills': f"Organize and enhance this skills section for a professional resume. Group similar skills and present them professionally: {content}",
-        'projects': f"Enhance this projects section for a professional resume. Focus on impact and technologies used: {content}",
-        'achievements': f"Enhance this achievements section for a professional resume. Make them quantifiable and impactful: {content}",
-        'certificates': f"Enhance this certificates section for a professional resume. Present them professionally with dates if available: {content}"
-    }
-    
-    if field_name in prompts:
-        enhanced = chat_with_groq(prompts[field_name])
-        if enhanced.startswith("Error:"):
-            st.error(enhanced)
-            return content
-        return enhanced
-    return content
-
-# Enhanced PDF Generation Class with better error handling
-class ResumePDF(FPDF):
-    def __init__(self):
-        super().__init__()
-        self.add_page()
-        self.set_auto_page_break(auto=True, margin=15)
-        
-    def header(self):
-        pass
-        
-    def add_name_header(self, name, email, phone, location):
-        try:
-            # Name
-            self.set_font('Arial', 'B', 28)
-            self.set_text_color(0, 0, 0)
-            
-            # Handle potential encoding issues
-            name_clean = name.encode('latin-1', 'ignore').decode('latin-1') if name else ""
-            self.cell(0, 15, name_clean, 0, 1, 'C')
-            
-            # Contact info
-            self.set_font('Arial', '', 10)
-            self.set_text_color(100, 100, 100)
-            
-            # Clean contact info
-            email_clean = email.encode('latin-1', 'ignore').decode('latin-1') if email else ""
-            phone_clean = phone.encode('latin-1', 'ignore').decode('latin-1') if phone else ""
-            location_clean = location.encode('latin-1', 'ignore').decode('latin-1') if location else ""
-            
-            contact_parts = [part for part in [email_clean, phone_clean, location_clean] if part]
-            contact_line = " | ".join(contact_parts)
-            
-            self.cell(0, 6, contact_line, 0, 1, 'C')
-            
-            # Line separator
-            self.ln(5)
-            self.set_draw_color(200, 200, 200)
-            self.line(20, self.get_y(), 190, self.get_y())
-            self.ln(10)
-        except Exception as e:
-            print(f"Error in add_name_header: {e}")
-        
-    def add_section(self, title, content):
-        if not content or not content.strip():
-            return
-            
-        try:
-            # Section title
-            self.set_font('Arial', 'B', 12)
-            self.set_text_color(0, 0, 0)
-            title_clean = title.encode('latin-1', 'ignore').decode('latin-1')
-            self.cell(0, 8, title_clean.upper(), 0, 1, 'L')
-            
-            # Underline
-            self.set_draw_color(100, 100, 100)
-            self.line(20, self.get_y(), 190, self.get_y())
-            self.ln(3)
-            
-            # Content
-            self.set_font('Arial', '', 10)
-            self.set_text_color(0, 0, 0)
-            
-            # Split content into lines and process
-            lines = content.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line:
-                    # Clean the line for PDF encoding
-                    line_clean = line.encode('latin-1', 'ignore').decode('latin-1')
-                    
-                    # Check if line starts with bullet point
-                    if line_clean.startswith('•') or line_clean.startswith('-'):
-                        self.cell(5, 5, '•', 0, 0, 'L')
-                        self.cell(0, 5, line_clean[1:].strip(), 0, 1, 'L')
-                    else:
-                        self.cell(0, 5, line_clean, 0, 1, 'L')
-            self.ln(5)
-        except Exception as e:
-            print(f"Error in add_section: {e}")
-
-def generate_pdf(resume_data):
-    try:
-        pdf = ResumePDF()
-        
-        # Header
-        if resume_data.get('name'):
-            pdf.add_name_header(
-                resume_data.get('name', ''),
-                resume_data.get('email', ''),
-                resume_data.get('phone', ''),
-                resume_data.get('location', '')
-            )
-        
-        # Add sections in order
-        sections = [
-            ('Education', 'education'),
-            ('Experience', 'experience'),
-            ('Skills', 'skills'),
-            ('Projects', 'projects'),
-            ('Achievements', 'achievements'),
-            ('Certificates', 'certificates')
-        ]
-        
-        for section_title, section_key in sections:
-            if resume_data.get(section_key):
-                pdf.add_section(section_title, resume_data[section_key])
-        
-        return pdf.output(dest='S').encode('latin-1')
-    except Exception as e:
-        raise Exception(f"PDF generation failed: {str(e)}")
+    session = current_session()
+    enhanced, memory = enhance_changed_lines(field_name, content, session.enhancements.get(field_name),
+                                             priority=PRIORITY_INTERACTIVE)
+    if enhanced and enhanced.startswith("Error:"):
+        st.error(enhanced)
+    else:
+        session.enhancements[field_name] = memory
+    return enhanced
 
 # Format text for HTML display
 def format_text_for_html(text):
@@ -387,9 +264,157 @@ with st.sidebar:
         }
     )
 
+# Admin panel with LLM latency percentiles per call site, enabled with SHOW_ADMIN_METRICS=1
+@st.fragment
+def admin_metrics_panel():
+    with st.expander("📈 LLM Metrics"):
+        st.button("🔄 Refresh", key="refresh_metrics")
+        metrics = get_metrics()
+        rows = []
+        for call_site, site in sorted(metrics.call_site_summary().items()):
+            latency = site.get('latency', {})
+            rows.append({
+                'call site': call_site,
+                'calls': site.get('calls', 0),
+                'errors': site.get('errors', 0),
+                'p50 ms': round(latency['p50'] * 1000) if latency.get('p50') is not None else None,
+                'p95 ms': round(latency['p95'] * 1000) if latency.get('p95') is not None else None,
+                'p99 ms': round(latency['p99'] * 1000) if latency.get('p99') is not None else None,
+                'tokens': site.get('prompt_tokens', 0) + site.get('completion_tokens', 0),
+            })
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.caption("No LLM calls yet.")
+        st.caption("Response cache")
+        st.json(get_cache().stats(), expanded=False)
+        st.caption("Rate limiter")
+        st.json(get_rate_limiter().stats(), expanded=False)
+        breaker = get_circuit_breaker().stats()
+        st.caption(f"Circuit breaker: {breaker['state']}")
+        st.json(breaker, expanded=False)
+        st.caption("Speculative enhancement")
+        st.json(get_speculator().stats(), expanded=False)
+        st.caption("Session store")
+        st.json(get_session_store().stats(), expanded=False)
+        st.download_button("Prometheus metrics", data=metrics.to_prometheus(), file_name="metrics.prom",
+                           mime="text/plain", on_click="ignore")
+        st.download_button("JSON snapshot", data=json.dumps(metrics.snapshot(), indent=2),
+                           file_name="metrics.json", mime="application/json", on_click="ignore")
+
+# Session code panel: the only way back to a saved session after a reload or on a later visit
+@st.fragment
+def saved_session_panel():
+    store = get_session_store()
+    with st.expander("💾 Saved Session"):
+        st.caption(f"Your resume and chats are kept for {store.ttl / 86400:g} days. To pick up where you left off "
+                   "after a reload or on a later visit, enter this code. Anyone with it can read them, so keep it "
+                   "private.")
+        st.code(st.session_state.session_id, language=None)
+        code = st.text_input("Session code", type="password", key="restore_code").strip().lower()
+        if st.button("Resume Session", key="restore_session"):
+            if SESSION_CODE.fullmatch(code) and store.exists(code):
+                st.session_state.session_id = code
+                st.session_state.pop('chat_shown_turns', None)
+                st.rerun()
+            st.error("No saved session has that code.")
+        if st.button("Delete My Data", key="delete_session"):
+            store.delete(st.session_state.session_id)
+            st.session_state.session_id = secrets.token_hex(16)
+            st.session_state.pop('chat_shown_turns', None)
+            st.rerun()
+
+with st.sidebar:
+    saved_session_panel()
+
+if os.getenv("SHOW_ADMIN_METRICS") == "1":
+    with st.sidebar:
+        admin_metrics_panel()
+
+# Resume Builder sections: (field, enhance button key, text area height, what to ask for when empty)
+RESUME_SECTION_FORM = [
+    ('education', 'enhance_edu', 200, "education details"),
+    ('experience', 'enhance_exp', 250, "experience details"),
+    ('skills', 'enhance_skills', 180, "skills"),
+    ('projects', 'enhance_proj', 220, "projects"),
+    ('achievements', 'enhance_ach', 180, "achievements"),
+    ('certificates', 'enhance_cert', 180, "certificates")
+]
+
+# Personal information, rerun on its own when edited
+@st.fragment
+def personal_information():
+    resume_data = current_session().resume_data
+    with st.expander("Personal Information", expanded=True):
+        name = st.text_input("Full Name", value=resume_data.get('name', ''))
+        email = st.text_input("Email", value=resume_data.get('email', ''))
+        phone = st.text_input("Phone", value=resume_data.get('phone', ''))
+        location = st.text_input("Location", value=resume_data.get('location', ''))
+    
+    previous_name = resume_data.get('name', '')
+    resume_data.update({
+        'name': name,
+        'email': email,
+        'phone': phone,
+        'location': location
+    })
+    # The download button outside this fragment is labelled with the name
+    if name != previous_name:
+        st.rerun()
+
+# One resume section with its Enhance button, rerun on its own when edited
+@st.fragment
+def resume_section(field_name, button_key, height, missing_label):
+    label = field_name.capitalize()
+    session = current_session()
+    resume_data = session.resume_data
+    with st.expander(label, expanded=True):
+        content = st.text_area(label, value=resume_data.get(field_name, ''), height=height)
+        resume_data[field_name] = content
+        # Once a line-by-line section has been enhanced, re-enhancing it is already a small request
+        speculative = st.session_state.get('speculative_enhance', False) and not (
+            field_name in LINE_FIELDS and session.enhancements.get(field_name))
+        if speculative:
+            get_speculator().observe(st.session_state.session_id, field_name, content)
+        if st.button(f"🤖 Enhance {label}", key=button_key):
+            if content.strip():
+                with st.spinner(f"Enhancing {field_name} section..."):
+                    # Use the background result for this exact text if there is one, waiting if it's still running
+                    enhanced = speculative and get_speculator().take(st.session_state.session_id, field_name, content)
+                    if enhanced:
+                        session.enhancements[field_name] = record_enhancement(content, enhanced)
+                    else:
+                        enhanced = enhance_resume_content(field_name, content)
+                    if not enhanced.startswith("Error:"):
+                        resume_data[field_name] = enhanced
+                        st.success(f"{label} section enhanced!")
+                        rerun_fragment()
+            else:
+                st.warning(f"Please enter {missing_label} first.")
+
+# Local job postings ranked against the resume, with the terms each one shares per section
+@st.fragment
+def job_matches():
+    st.subheader("🔎 Matching Jobs")
+    job_index = get_job_index()
+    if job_index is None:
+        st.caption("No job postings indexed yet. Add some with: python -m core.job_matching add postings.jsonl")
+        return
+    if st.button("Find Matching Jobs", key="match_jobs"):
+        matches = job_index.search(current_session().resume_data, k=10)
+        if not matches:
+            st.info("No indexed postings share any terms with your resume yet.")
+        for match in matches:
+            posting = match['posting']
+            company = f" · {posting['company']}" if posting.get('company') else ""
+            st.markdown(f"**{posting.get('title') or 'Untitled'}**{company} — match {match['score']:.2f}")
+            for field_name, terms in match['overlap'].items():
+                st.caption(f"{field_name.capitalize()}: {', '.join(terms)}")
+
 # Resume Builder Tab
-if selected == "Resume Builder":
+def resume_builder_tab():
     st.header("📄 Resume Builder")
+    resume_data = current_session().resume_data
     
     # Single column layout with modern form container
     col1 = st.container()
@@ -399,134 +424,124 @@ if selected == "Resume Builder":
         
         st.subheader("📝 Resume Information")
         
-        # Personal Information
-        with st.expander("Personal Information", expanded=True):
-            name = st.text_input("Full Name", value=st.session_state.resume_data.get('name', ''))
-            email = st.text_input("Email", value=st.session_state.resume_data.get('email', ''))
-            phone = st.text_input("Phone", value=st.session_state.resume_data.get('phone', ''))
-            location = st.text_input("Location", value=st.session_state.resume_data.get('location', ''))
-        
-        # Education
-        with st.expander("Education", expanded=True):
-            education = st.text_area("Education", value=st.session_state.resume_data.get('education', ''), height=200)
-            if st.button("🤖 Enhance Education", key="enhance_edu"):
-                if education.strip():
-                    with st.spinner("Enhancing education section..."):
-                        enhanced = enhance_resume_content('education', education)
-                        if not enhanced.startswith("Error:"):
-                            st.session_state.resume_data['education'] = enhanced
-                            st.success("Education section enhanced!")
-                            st.rerun()
-                else:
-                    st.warning("Please enter education details first.")
-        
-        # Experience
-        with st.expander("Experience", expanded=True):
-            experience = st.text_area("Experience", value=st.session_state.resume_data.get('experience', ''), height=250)
-            if st.button("🤖 Enhance Experience", key="enhance_exp"):
-                if experience.strip():
-                    with st.spinner("Enhancing experience section..."):
-                        enhanced = enhance_resume_content('experience', experience)
-                        if not enhanced.startswith("Error:"):
-                            st.session_state.resume_data['experience'] = enhanced
-                            st.success("Experience section enhanced!")
-                            st.rerun()
-                else:
-                    st.warning("Please enter experience details first.")
-        
-        # Skills
-        with st.expander("Skills", expanded=True):
-            skills = st.text_area("Skills", value=st.session_state.resume_data.get('skills', ''), height=180)
-            if st.button("🤖 Enhance Skills", key="enhance_skills"):
-                if skills.strip():
-                    with st.spinner("Enhancing skills section..."):
-                        enhanced = enhance_resume_content('skills', skills)
-                        if not enhanced.startswith("Error:"):
-                            st.session_state.resume_data['skills'] = enhanced
-                            st.success("Skills section enhanced!")
-                            st.rerun()
-                else:
-                    st.warning("Please enter skills first.")
+        personal_information()
+        st.toggle("⚡ Pre-enhance sections in the background", key="speculative_enhance",
+                  help="Starts enhancing a section shortly after you stop editing it, "
+                       "so the Enhance button can apply the result right away.")
+        for field_name, button_key, height, missing_label in RESUME_SECTION_FORM:
+            resume_section(field_name, button_key, height, missing_label)
         
-        # Projects
-        with st.expander("Projects", expanded=True):
-            projects = st.text_area("Projects", value=st.session_state.resume_data.get('projects', ''), height=220)
-            if st.button("🤖 Enhance Projects", key="enhance_proj"):
-                if projects.strip():
-                    with st.spinner("Enhancing projects section..."):
-                        enhanced = enhance_resume_content('projects', projects)
-                        if not enhanced.startswith("Error:"):
-                            st.session_state.resume_data['projects'] = enhanced
-                            st.success("Projects section enhanced!")
-                            st.rerun()
-                else:
-                    st.warning("Please enter projects first.")
-        
-        # Achievements
-        with st.expander("Achievements", expanded=True):
-            achievements = st.text_area("Achievements", value=st.session_state.resume_data.get('achievements', ''), height=180)
-            if st.button("🤖 Enhance Achievements", key="enhance_ach"):
-                if achievements.strip():
-                    with st.spinner("Enhancing achievements section..."):
-                        enhanced = enhance_resume_content('achievements', achievements)
-                        if not enhanced.startswith("Error:"):
-                            st.session_state.resume_data['achievements'] = enhanced
-                            st.success("Achievements section enhanced!")
-                            st.rerun()
-                else:
-                    st.warning("Please enter achievements first.")
-        
-        # Certificates
-        with st.expander("Certificates", expanded=True):
-            certificates = st.text_area("Certificates", value=st.session_state.resume_data.get('certificates', ''), height=180)
-            if st.button("🤖 Enhance Certificates", key="enhance_cert"):
-                if certificates.strip():
-                    with st.spinner("Enhancing certificates section..."):
-                        enhanced = enhance_resume_content('certificates', certificates)
-                        if not enhanced.startswith("Error:"):
-                            st.session_state.resume_data['certificates'] = enhanced
-                            st.success("Certificates section enhanced!")
-                            st.rerun()
-                else:
-                    st.warning("Please enter certificates first.")
+        # Enhance every non-empty section at once
+        st.markdown("---")
+        report = st.session_state.pop('enhance_all_report', None)
+        if report:
+            enhanced_count, errors = report
+            if enhanced_count:
+                st.success(f"Enhanced {enhanced_count} section{'s' if enhanced_count != 1 else ''}!")
+            for field_name, error in errors.items():
+                st.error(f"{field_name.capitalize()}: {error} The original text was kept.")
         
-        # Update session state
-        st.session_state.resume_data.update({
-            'name': name,
-            'email': email,
-            'phone': phone,
-            'location': location,
-            'education': education,
-            'experience': experience,
-            'skills': skills,
-            'projects': projects,
-            'achievements': achievements,
-            'certificates': certificates
-        })
+        if st.button("✨ Enhance All Sections", key="enhance_all"):
+            pending = {field_name: resume_data.get(field_name, '') for field_name in ENHANCE_PROMPTS}
+            pending = {field_name: content for field_name, content in pending.items() if content.strip()}
+            if pending:
+                progress = st.progress(0.0, text=f"Enhancing {len(pending)} sections...")
+                finished = []
+                
+                def report_progress(field_name, error):
+                    finished.append(field_name)
+                    status = "failed" if error else "enhanced"
+                    progress.progress(len(finished) / len(pending),
+                                      text=f"{field_name.capitalize()} {status} ({len(finished)}/{len(pending)})")
+                
+                results, errors = enhance_sections(pending, on_complete=report_progress)
+                # Write every result in one go so the page reruns only once
+                resume_data.update(results)
+                enhancements = current_session().enhancements
+                for field_name, enhanced in results.items():
+                    enhancements[field_name] = record_enhancement(pending[field_name], enhanced)
+                st.session_state.enhance_all_report = (len(results), errors)
+                st.rerun()
+            else:
+                st.warning("Please fill in at least one section first.")
         
         # Generate PDF
         st.markdown("---")
-        if st.button("📥 Download PDF Resume", type="primary"):
-            if name:
+        name = resume_data.get('name', '')
+        # The PDF is rendered on click outside this script run, so a failure is reported on the next rerun
+        pdf_errors = st.session_state.setdefault('pdf_errors', [])
+        while pdf_errors:
+            st.error(f"Error generating PDF: {pdf_errors.pop(0)}")
+        if name:
+            session_id = st.session_state.session_id
+
+            def render_pdf():
+                # Looked up on click, since the session may have been evicted and restored as a new object.
+                # This runs outside the script run, so it reads the store directly rather than st.session_state.
                 try:
-                    with st.spinner("Generating PDF..."):
-                        pdf_data = generate_pdf(st.session_state.resume_data)
-                        st.download_button(
-                            label="Download Resume PDF",
-                            data=pdf_data,
-                            file_name=f"{name.replace(' ', '_')}_Resume.pdf",
-                            mime="application/pdf"
-                        )
-                        st.success("PDF generated successfully!")
+                    return generate_pdf(get_session_store().get(session_id).resume_data)
                 except Exception as e:
-                    st.error(f"Error generating PDF: {str(e)}")
-            else:
-                st.error("Please enter your name first.")
+                    pdf_errors.append(str(e))
+                    raise
+            
+            # Rendered on click from the session's current resume data;
+            # unchanged resumes come straight from the PDF cache
+            st.download_button(
+                label="📥 Download PDF Resume",
+                data=render_pdf,
+                file_name=f"{name.replace(' ', '_')}_Resume.pdf",
+                mime="application/pdf",
+                type="primary",
+                on_click="ignore"
+            )
+        else:
+            st.button("📥 Download PDF Resume", type="primary", disabled=True, help="Please enter your name first.")
+        
+        st.markdown("---")
+        job_matches()
         
         st.markdown('</div>', unsafe_allow_html=True)
 
+# Skills gap from the local taxonomy, before the model's explanation streams in
+def show_skills_gap(gap):
+    st.markdown(f"**{gap['role']}:** you have {gap['coverage']}% of the core skills")
+    st.progress(gap['coverage'] / 100)
+    st.markdown("✅ **Matching:** " + (", ".join(gap['matching'] + gap['bonus']) or "none yet"))
+    st.markdown("❌ **Missing:** " + (", ".join(gap['missing']) or "none"))
+    if gap['adjacent']:
+        st.markdown("🔗 **Quickest to learn:** " + "; ".join(
+            f"{item['skill']} (builds on {', '.join(item['builds_on'])})" for item in gap['adjacent']))
+    if gap['nice_to_have']:
+        st.caption("Nice to have: " + ", ".join(gap['nice_to_have']))
+    if gap['unrecognised']:
+        st.caption("Not in the skills index: " + ", ".join(gap['unrecognised']))
+
+# Career path from the local transition graph, before the model's suggestions stream in
+def show_career_paths(result):
+    def outline(path):
+        return " → ".join([result['current_role']] + [f"{step['role']} (~{step['months']} mo)" for step in path['steps']])
+
+    best, alternatives = result['paths'][0], result['paths'][1:]
+    st.markdown(f"**Typical route** (about {best['total_months']} months): " + outline(best))
+    for step in best['steps']:
+        if step['new_skills']:
+            st.caption(f"{step['role']}: new core skills {', '.join(step['new_skills'])}")
+    if alternatives:
+        with st.expander(f"{len(alternatives)} alternative route(s)"):
+            for path in alternatives:
+                st.markdown(f"- about {path['total_months']} months: " + outline(path))
+
+def show_role_resolution(result, current_role, dream_role):
+    """Say which career-map roles the typed titles were read as, so a substitution is never silent."""
+    for typed, resolved in ((current_role, result['current_role']), (dream_role, result['dream_role'])):
+        if resolved is None:
+            st.warning(f"\"{typed}\" isn't a role in the career map, so the route below is the AI's suggestion only.")
+        elif normalize(typed) != normalize(resolved):
+            st.caption(f"Reading \"{typed}\" as **{resolved}**.")
+
 # Career Guidance Tab
-elif selected == "Career Guidance":
+@st.fragment
+def career_guidance_tab():
     st.header("🎯 Career Guidance")
     
     col1, col2 = st.columns(2)
@@ -535,17 +550,25 @@ elif selected == "Career Guidance":
         st.subheader("🛤️ Career Path Analysis")
         current_role = st.text_input("Current Role", placeholder="Software Developer")
         dream_role = st.text_input("Dream Role", placeholder="Technical Lead")
-        experience_level = st.selectbox("Experience Level", ["0-1 years", "2-5 years", "5-10 years", "10+ years"])
+        experience_level = st.selectbox("Experience Level", EXPERIENCE_LEVELS)
+        expand_path = st.toggle("Ask the AI to expand the path", value=True, key="expand_career_path")
         
         if st.button("Generate Career Path", key="career_path"):
             if current_role and dream_role:
-                prompt = f"Provide a detailed career path from {current_role} to {dream_role} for someone with {experience_level} experience. Include specific steps, timeline, and required skills."
-                with st.spinner("Analyzing career path..."):
-                    response = chat_with_groq(prompt)
+                # Routes come from the local graph and show at once; the model only fleshes them out
+                result = career_paths(current_role, dream_role, experience_level)
+                show_role_resolution(result, current_role, dream_role)
+                if result['paths']:
+                    show_career_paths(result)
+                    prompt = career_path_outline_prompt(result['current_role'], result['dream_role'],
+                                                        experience_level, result['paths'][0]) if expand_path else None
+                else:
+                    prompt = career_path_prompt(current_role, dream_role, experience_level)
+                if prompt:
+                    st.markdown("**Career Path Analysis:**")
+                    response = stream_groq_response(prompt, call_site="career_path")
                     if response.startswith("Error:"):
                         st.error(response)
-                    else:
-                        st.markdown(f"**Career Path Analysis:**\n\n{response}")
             else:
                 st.error("Please fill in both roles.")
     
@@ -556,20 +579,30 @@ elif selected == "Career Guidance":
         
         if st.button("Analyze Skills Gap", key="skills_gap"):
             if current_skills and target_role:
-                prompt = f"Analyze the skills gap for transitioning to {target_role} with current skills: {current_skills}. Provide specific recommendations for skills to develop."
-                with st.spinner("Analyzing skills gap..."):
-                    response = chat_with_groq(prompt)
-                    if response.startswith("Error:"):
-                        st.error(response)
-                    else:
-                        st.markdown(f"**Skills Gap Analysis:**\n\n{response}")
+                # Computed locally and shown at once; the model is only asked to explain it
+                gap = get_skills_index().gap(current_skills, target_role)
+                if gap:
+                    show_skills_gap(gap)
+                    prompt = skills_gap_explain_prompt(gap)
+                else:
+                    prompt = skills_gap_prompt(current_skills, target_role)
+                st.markdown("**Skills Gap Analysis:**")
+                response = stream_groq_response(prompt, call_site="skills_gap")
+                if response.startswith("Error:"):
+                    st.error(response)
             else:
                 st.error("Please fill in required fields.")
 
 # Performance Review Tab
-elif selected == "Performance Review":
+@st.fragment
+def performance_review_tab():
     st.header("📊 Performance Review Assistant")
     
+    mode = st.radio("Mode", ["Single review", "Bulk (CSV)"], horizontal=True, label_visibility="collapsed")
+    if mode == "Bulk (CSV)":
+        bulk_review_mode()
+        return
+    
     # Self Assessment
     st.subheader("🎯 Self Assessment")
     col1, col2 = st.columns(2)
@@ -586,31 +619,66 @@ elif selected == "Performance Review":
     
     # Generate Review Report
     if st.button("📋 Generate Review Report", type="primary"):
-        if achievements or improvements or goals:
-            prompt = f"""
-            Generate a comprehensive performance review report based on this data:
-            - Overall Rating: {overall_rating}/5
-            - Key Achievements: {achievements}
-            - Areas for Improvement: {improvements}
-            - Goals: {goals}
-            - Manager Comments: {manager_comments}
-            - Recommendations: {recommendations}
-            
-            Provide a professional summary and action plan.
-            """
+        if has_review_content(achievements, improvements, goals):
+            prompt = review_report_prompt(overall_rating, achievements, improvements, goals,
+                                          manager_comments, recommendations)
             
-            with st.spinner("Generating review report..."):
-                response = chat_with_groq(prompt)
-                if response.startswith("Error:"):
-                    st.error(response)
-                else:
-                    st.markdown("### 📄 Performance Review Report")
-                    st.markdown(response)
+            st.markdown("### 📄 Performance Review Report")
+            response = stream_groq_response(prompt, call_site="review_report")
+            if response.startswith("Error:"):
+                st.error(response)
         else:
             st.error("Please fill in at least one section.")
 
+# Many reviews at once from a CSV; finished reports are checkpointed so a rerun only does the rest
+def bulk_review_mode():
+    st.subheader("📂 Bulk Reviews")
+    st.caption(f"Upload a CSV with the columns: {', '.join(REVIEW_COLUMNS)}.")
+    uploaded = st.file_uploader("Employees CSV", type="csv")
+    concurrency = st.number_input("Reports generated at the same time", min_value=1, max_value=16, value=4)
+    
+    if uploaded is not None and st.button("📋 Generate All Reports", type="primary", key="bulk_reviews"):
+        data = uploaded.getvalue()
+        try:
+            records = list(read_reviews(StringIO(data.decode('utf-8-sig'))))
+        except UnicodeDecodeError:
+            st.error("The CSV must be UTF-8 encoded.")
+            return
+        if not records:
+            st.warning("The CSV has no rows.")
+            return
+        
+        checkpoint = ReviewCheckpoint(checkpoint_path_for(data))
+        progress = st.progress(0.0, text=f"Generating {len(records)} reports...")
+        results = []
+        for result in generate_reviews(records, concurrency, checkpoint):
+            results.append(result)
+            progress.progress(len(results) / len(records), text=f"{len(results)}/{len(records)} reports finished")
+            title = f"{result['index']}. {result['name'] or 'Unnamed'}"
+            if 'error' in result:
+                st.error(f"{title}: {result['error']}")
+            else:
+                with st.expander(title + (" (resumed)" if result['resumed'] else "")):
+                    st.markdown(result['report'])
+        
+        failed = sum(1 for result in results if 'error' in result)
+        st.session_state.bulk_review_archive = build_archive(results)
+        if failed:
+            st.warning(f"{len(results) - failed} reports ready, {failed} failed. "
+                       "Generate again with the same file to retry only the failed rows.")
+        else:
+            # Every report is in the archive, so the checkpoint of full reports is no longer needed
+            checkpoint.remove()
+            st.success(f"All {len(results)} reports ready!")
+    
+    archive = st.session_state.get('bulk_review_archive')
+    if archive:
+        st.download_button("📥 Download Reports (ZIP)", data=archive, file_name="performance_reviews.zip",
+                           mime="application/zip", on_click="ignore")
+
 # Mental Health Chat Tab
-elif selected == "Mental Health Chat":
+@st.fragment
+def mental_health_chat_tab():
     st.header("💬 Mental Health & Wellness Chat")
     
     st.markdown("""
@@ -622,22 +690,19 @@ elif selected == "Mental Health Chat":
     </div>
     """, unsafe_allow_html=True)
     
-    # Chat History Display
-    if st.session_state.chat_history:
+    session = current_session()
+    
+    # Chat History Display: only the latest turns, so a rerun costs the same however long the chat gets
+    if session.chat_history:
         st.subheader("💭 Conversation History")
         
-        for i, (user_msg, bot_msg) in enumerate(st.session_state.chat_history):
-            st.markdown(f"""
-            <div class="user-message">
-                <strong>You:</strong> {user_msg}
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown(f"""
-            <div class="bot-message">
-                <strong>AI Counselor:</strong> {bot_msg}
-            </div>
-            """, unsafe_allow_html=True)
+        shown = st.session_state.setdefault('chat_shown_turns', CHAT_PAGE_TURNS)
+        turns, hidden = visible_turns(session.chat_history, shown)
+        if hidden:
+            st.button(f"⬆️ Show earlier messages ({hidden} more)", key="chat_show_earlier",
+                      on_click=lambda: st.session_state.update(chat_shown_turns=shown + CHAT_PAGE_TURNS))
+        for user_msg, bot_msg in turns:
+            st.markdown(turn_html(user_msg, bot_msg), unsafe_allow_html=True)
     
     # Chat Input
     st.subheader("💬 How are you feeling today?")
@@ -645,26 +710,44 @@ elif selected == "Mental Health Chat":
     
     col1, col2 = st.columns([1, 4])
     with col1:
-        if st.button("💌 Send Message", type="primary"):
-            if user_input:
-                system_prompt = """You are a compassionate mental health assistant and career counselor. 
-                Provide supportive, empathetic responses focused on mental well-being, stress management, 
-                and career guidance. Always prioritize the person's emotional well-being and provide practical advice."""
-                
-                with st.spinner("Thinking..."):
-                    response = chat_with_groq(user_input, system_prompt)
-                    if response.startswith("Error:"):
-                        st.error(response)
-                    else:
-                        st.session_state.chat_history.append((user_input, response))
-                        st.rerun()
-            else:
-                st.error("Please enter a message.")
+        send_clicked = st.button("💌 Send Message", type="primary")
     
     with col2:
         if st.button("🗑️ Clear Chat"):
-            st.session_state.chat_history = []
-            st.rerun()
+            session.clear_chat()
+            st.session_state.chat_shown_turns = CHAT_PAGE_TURNS
+            rerun_fragment()
+    
+    # Stream the reply full-width below the buttons rather than inside the narrow column
+    if send_clicked:
+        if user_input:
+            system_prompt = """You are a compassionate mental health assistant and career counselor. 
+            Provide supportive, empathetic responses focused on mental well-being, stress management, 
+            and career guidance. Always prioritize the person's emotional well-being and provide practical advice."""
+            
+            # Recent turns verbatim, older ones through the rolling summary
+            context = build_chat_context(session.chat_history, user_input, system_prompt, session.chat_memory)
+            
+            st.markdown("**AI Counselor:**")
+            response = stream_groq_response(user_input, system_prompt, use_cache=False, priority=PRIORITY_CHAT,
+                                            context=context, call_site="chat")
+            if response.startswith("Error:"):
+                st.error(response)
+            else:
+                session.chat_history.append((user_input, response))
+                rerun_fragment()
+        else:
+            st.error("Please enter a message.")
+
+# Tabs and resume sections are fragments, so a widget reruns only its own fragment
+if selected == "Resume Builder":
+    resume_builder_tab()
+elif selected == "Career Guidance":
+    career_guidance_tab()
+elif selected == "Performance Review":
+    performance_review_tab()
+elif selected == "Mental Health Chat":
+    mental_health_chat_tab()
 
 # Footer
 st.markdown("""
@@ -0,0 +1 @@
+"""Mock Groq server and benchmarks for the app's hot paths."""
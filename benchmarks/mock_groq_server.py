@@ -0,0 +1,267 @@
+"""Local stand-in for Groq's /openai/v1/chat/completions endpoint.
+
+Run standalone and point the app at it:
+    python -m benchmarks.mock_groq_server --port 8765 --latency lognormal:-1.5,0.5 --error-429 0.05
+    GROQ_API_URL=http://127.0.0.1:8765/openai/v1/chat/completions GROQ_API_KEY=mock streamlit run app.py
+
+or start it in-process with MockGroqServer(...).start().
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+
+def parse_latency(spec):
+    """Build a latency sampler from "fixed:S", "uniform:LO,HI", "normal:MU,SIGMA" or "lognormal:MU,SIGMA"."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockConfig:
+    """Behaviour of the mock server; every field can be changed while it is running."""
+
+    def __init__(self, latency="fixed:0.05", token_delay=0.005, reply_words=120,
+                 error_429=0.0, error_5xx=0.0, timeout_rate=0.0, timeout_seconds=60.0,
+                 requests_per_minute=100000, tokens_per_minute=100000000):
+        self.latency = parse_latency(latency) if isinstance(latency, str) else latency
+        self.token_delay = token_delay
+        self.reply_words = reply_words
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+
+class RateWindow:
+    """Fixed one-minute window of simulated request and token limits."""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.requests = 0
+        self.tokens = 0
+
+    def consume(self, tokens):
+        """Record a request; returns (allowed, headers)."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 60:
+                self.window_start, self.requests, self.tokens = now, 0, 0
+            allowed = (self.requests < self.config.requests_per_minute
+                       and self.tokens + tokens <= self.config.tokens_per_minute)
+            if allowed:
+                self.requests += 1
+                self.tokens += tokens
+            reset = max(0.0, 60 - (now - self.window_start))
+            headers = {
+                "x-ratelimit-limit-requests": str(self.config.requests_per_minute),
+                "x-ratelimit-limit-tokens": str(self.config.tokens_per_minute),
+                "x-ratelimit-remaining-requests": str(self.config.requests_per_minute - self.requests),
+                "x-ratelimit-remaining-tokens": str(max(0, self.config.tokens_per_minute - self.tokens)),
+                "x-ratelimit-reset-requests": f"{reset:.2f}s",
+                "x-ratelimit-reset-tokens": f"{reset:.2f}s",
+            }
+            return allowed, headers, reset
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY, delayed ACKs add ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            return self._send_json(400, {"error": {"message": "Invalid JSON"}})
+        if self.path != CHAT_COMPLETIONS_PATH:
+            return self._send_json(404, {"error": {"message": "Not found"}})
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._send_json(401, {"error": {"message": "Invalid API Key"}})
+
+        config = server.config
+        server.count("requests")
+        prompt_tokens = sum(len(m.get("content", "")) // 4 + 1 for m in payload.get("messages", []))
+        allowed, rate_headers, reset = server.rate_window.consume(prompt_tokens + payload.get("max_tokens", 0))
+        if not allowed:
+            server.count("rate_limited")
+            return self._send_json(429, {"error": {"message": "Rate limit reached"}},
+                                   dict(rate_headers, **{"Retry-After": f"{reset:.0f}"}))
+
+        roll = random.random()
+        if roll < config.timeout_rate:
+            server.count("timeouts")
+            time.sleep(config.timeout_seconds)
+            return self._send_json(504, {"error": {"message": "Gateway timeout"}}, rate_headers)
+        roll -= config.timeout_rate
+        if roll < config.error_429:
+            server.count("injected_429")
+            return self._send_json(429, {"error": {"message": "Rate limit reached"}},
+                                   dict(rate_headers, **{"Retry-After": "1"}))
+        roll -= config.error_429
+        if roll < config.error_5xx:
+            server.count("injected_5xx")
+            return self._send_json(random.choice([500, 502, 503]), {"error": {"message": "Upstream error"}},
+                                   rate_headers)
+
+        time.sleep(config.latency())
+        words = self._reply_words(payload)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+        if payload.get("stream"):
+            self._stream(payload, words, usage, rate_headers)
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": usage,
+            }, rate_headers)
+
+    def _reply_words(self, payload):
+        config = self.server.config
+        last = payload.get("messages", [{}])[-1].get("content", "")
+        seed_words = last.split() or ["ok"]
+        count = min(config.reply_words, payload.get("max_tokens", config.reply_words))
+        return [seed_words[i % len(seed_words)] for i in range(count)]
+
+    def _stream(self, payload, words, usage, headers):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        try:
+            for i, word in enumerate(words):
+                delta = {"content": word if i == 0 else " " + word}
+                self._write_event({"id": chunk_id, "object": "chat.completion.chunk", "model": payload.get("model"),
+                                   "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                if self.server.config.token_delay:
+                    time.sleep(self.server.config.token_delay)
+            self._write_event({"id": chunk_id, "object": "chat.completion.chunk", "model": payload.get("model"),
+                               "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                               "x_groq": {"usage": usage}})
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count("client_disconnects")
+
+    def _write_event(self, data):
+        self._write_chunk(b"data: " + json.dumps(data).encode() + b"\n\n")
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count("client_disconnects")
+
+
+class MockGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        super().__init__((host, port), MockGroqHandler)
+        self.config = config or MockConfig()
+        self.rate_window = RateWindow(self.config)
+        self.counters = {}
+        self._counter_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{CHAT_COMPLETIONS_PATH}"
+
+    def count(self, name):
+        with self._counter_lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def start(self):
+        """Serve on a background thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Groq chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0.05",
+                        help="fixed:S | uniform:LO,HI | normal:MU,SIGMA | lognormal:MU,SIGMA (seconds)")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Seconds between streamed tokens")
+    parser.add_argument("--reply-words", type=int, default=120)
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of requests answered with 5xx")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that hang")
+    parser.add_argument("--timeout-seconds", type=float, default=60.0)
+    parser.add_argument("--rpm", type=int, default=100000, help="Simulated requests per minute")
+    parser.add_argument("--tpm", type=int, default=100000000, help="Simulated tokens per minute")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(latency=args.latency, token_delay=args.token_delay, reply_words=args.reply_words,
+                        error_429=args.error_429, error_5xx=args.error_5xx, timeout_rate=args.timeout_rate,
+                        timeout_seconds=args.timeout_seconds, requests_per_minute=args.rpm,
+                        tokens_per_minute=args.tpm)
+    server = MockGroqServer(config, args.host, args.port)
+    print(f"Mock Groq API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
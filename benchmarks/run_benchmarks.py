@@ -0,0 +1,198 @@
+"""Benchmarks for the app's hot paths against the local mock Groq server.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--output bench_results.json] [--quick]
+
+Measures chat_with_groq latency and throughput at several concurrency
+levels, enhance_section for every prompt type, generate_pdf time and peak
+memory, and full-script rerun time of each tab through Streamlit's AppTest.
+Results are written as JSON so runs can be compared for regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.mock_groq_server import MockConfig, MockGroqServer
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+TABS = ["Resume Builder", "Career Guidance", "Performance Review", "Mental Health Chat"]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(50), 3),
+        "p95_ms": round(percentile(95), 3),
+        "p99_ms": round(percentile(99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def bench_chat(concurrency_levels, calls_per_level):
+    from core.groq_client import chat_with_groq
+
+    results = {}
+    for concurrency in concurrency_levels:
+        def call(i):
+            return timed(chat_with_groq, f"Benchmark message {i}", "You are a benchmark.", False)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(call, range(calls_per_level)))
+        wall = time.perf_counter() - started
+        errors = sum(1 for _, reply in outcomes if reply.startswith("Error:"))
+        results[str(concurrency)] = dict(
+            summarize([elapsed for elapsed, _ in outcomes]),
+            errors=errors,
+            throughput_rps=round(calls_per_level / wall, 2),
+        )
+    return results
+
+
+def bench_enhance(repeats):
+    from core.resume_enhancer import ENHANCE_PROMPTS, enhance_section
+
+    sample = "Worked on several projects using Python and SQL.\n- Led a team of 4\n- Shipped a reporting tool"
+    results = {}
+    for field_name in ENHANCE_PROMPTS:
+        samples = [timed(enhance_section, field_name, f"{sample} ({i})")[0] for i in range(repeats)]
+        results[field_name] = summarize(samples)
+    return results
+
+
+def sample_resume(scale):
+    lines = max(1, scale)
+    return {
+        "name": "Jordan Example",
+        "email": "jordan@example.com",
+        "phone": "+1 555 0100",
+        "location": "Remote",
+        "education": "\n".join(f"- Degree {i}, University of Somewhere, 20{i % 100:02d}" for i in range(lines)),
+        "experience": "\n".join(f"- Delivered project {i}, improving throughput by {i % 50}% across "
+                                f"several teams while mentoring engineers and owning on-call" for i in range(lines * 4)),
+        "skills": ", ".join(f"Skill{i}" for i in range(lines * 5)),
+        "projects": "\n".join(f"- Project {i}: built a service in Python and Go" for i in range(lines * 2)),
+        "achievements": "\n".join(f"- Award {i}" for i in range(lines)),
+        "certificates": "\n".join(f"- Certificate {i} (2024)" for i in range(lines)),
+    }
+
+
+def bench_pdf(repeats):
+    from core.resume_pdf import _render_pdf, generate_pdf, layout_section
+
+    results = {}
+    for label, scale in (("small", 1), ("large", 200)):
+        resume = sample_resume(scale)
+        cold = []
+        for _ in range(repeats):
+            _render_pdf.cache_clear()
+            layout_section.cache_clear()
+            cold.append(timed(generate_pdf, resume)[0])
+        warm = [timed(generate_pdf, resume)[0] for _ in range(repeats)]
+
+        _render_pdf.cache_clear()
+        layout_section.cache_clear()
+        tracemalloc.start()
+        pdf_bytes = generate_pdf(resume)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = {
+            "cold": summarize(cold),
+            "cached": summarize(warm),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "pdf_kb": round(len(pdf_bytes) / 1024, 1),
+        }
+    return results
+
+
+def bench_tabs(reruns):
+    import streamlit_option_menu
+    from streamlit.testing.v1 import AppTest
+
+    # The sidebar menu is a custom component that AppTest cannot drive; pick the tab directly
+    selected = {"tab": TABS[0]}
+    original_menu = streamlit_option_menu.option_menu
+    streamlit_option_menu.option_menu = lambda *args, **kwargs: selected["tab"]
+    results = {}
+    try:
+        for tab in TABS:
+            selected["tab"] = tab
+            at = AppTest.from_file(APP_PATH, default_timeout=60)
+            first, _ = timed(at.run)
+            samples = [timed(at.run)[0] for _ in range(reruns)]
+            results[tab] = dict(summarize(samples), first_run_ms=round(first * 1000, 3),
+                                exceptions=len(at.exception))
+    finally:
+        streamlit_option_menu.option_menu = original_menu
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot paths against a mock Groq server.")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for a smoke test")
+    parser.add_argument("--latency", default="lognormal:-3,0.4", help="Mock latency distribution")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated caller counts")
+    parser.add_argument("--only", help="Comma-separated subset of: chat,enhance,pdf,tabs")
+    args = parser.parse_args(argv)
+
+    repeats = 5 if args.quick else 30
+    selected = set(args.only.split(",")) if args.only else {"chat", "enhance", "pdf", "tabs"}
+    config = MockConfig(latency=args.latency, token_delay=0.0)
+
+    with MockGroqServer(config) as server:
+        # Point the app at the mock and keep caching out of the measurements
+        os.environ.update({
+            "GROQ_API_URL": server.url,
+            "GROQ_API_KEY": "mock-key",
+            "LLM_CACHE_SIZE": "0",
+            "LLM_CACHE_PATH": "",
+            "GROQ_REQUESTS_PER_MINUTE": "1000000",
+            "GROQ_TOKENS_PER_MINUTE": "1000000000",
+        })
+        report = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mock_latency": args.latency,
+            "results": {},
+        }
+        if "chat" in selected:
+            levels = [int(level) for level in args.concurrency.split(",")]
+            report["results"]["chat_with_groq"] = bench_chat(levels, repeats * 4)
+        if "enhance" in selected:
+            report["results"]["enhance_section"] = bench_enhance(repeats)
+        if "pdf" in selected:
+            report["results"]["generate_pdf"] = bench_pdf(repeats)
+        if "tabs" in selected:
+            report["results"]["tab_rerun"] = bench_tabs(repeats)
+        report["mock_server"] = dict(server.counters)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["results"], indent=2))
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
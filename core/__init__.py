@@ -0,0 +1 @@
+"""Streamlit-independent building blocks of the Professional Development Suite."""
@@ -0,0 +1,304 @@
+"""Headless HTTP API over the same core functions as the Streamlit app.
+
+Usage:
+    python -m core.api [--host 127.0.0.1] [--port 8000]
+
+Endpoints (JSON in, JSON out unless noted):
+    POST /v1/enhance        {"field": "experience", "content": "...", "lines"?}; send back the "lines" of the
+                            previous reply to re-enhance only new or edited lines
+    POST /v1/enhance-all    {"sections": {"skills": "...", ...}}
+    POST /v1/career-path    {"current_role", "dream_role", "experience_level", "explain"?}; "explain": false skips the LLM;
+                            returns {"current_role", "dream_role", "paths", "text"?}, a role null if not recognised
+    POST /v1/skills-gap     {"current_skills", "target_role", "explain"?}; "explain": false skips the LLM
+    POST /v1/review-report  {"overall_rating", "achievements", "improvements", "goals", ...}
+    POST /v1/chat           {"message", "system_prompt"?}
+    POST /v1/pdf            resume_data keys (name, email, ...); returns application/pdf
+    GET  /metrics           Prometheus text
+    GET  /healthz
+
+LLM calls run on a bounded thread pool sharing the process-wide GroqClient;
+PDFs render on a bounded process pool. Once either pool has as many requests
+queued or running as it allows, new ones get a 503 with Retry-After.
+"""
+import argparse
+import asyncio
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from urllib.parse import quote
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from core.career_graph import career_paths
+from core.circuit_breaker import get_circuit_breaker
+from core.groq_client import DEFAULT_SYSTEM_PROMPT, GroqError, get_client
+from core.guidance import (EXPERIENCE_LEVELS, REVIEW_FIELDS, career_path_outline_prompt, career_path_prompt,
+                           has_review_content, review_report_prompt, skills_gap_explain_prompt, skills_gap_prompt)
+from core.llm_metrics import get_metrics
+from core.rate_limiter import PRIORITY_CHAT, PRIORITY_INTERACTIVE
+from core.resume_enhancer import ENHANCE_PROMPTS, enhance_changed_lines, enhance_sections
+from core.resume_pdf import PDF_FIELDS, generate_pdf
+from core.skills_index import get_skills_index
+
+RETRY_AFTER = int(os.getenv("API_RETRY_AFTER", "2"))
+# GroqError statuses passed on with a Retry-After: rate limited (429) or circuit breaker open (503)
+RETRYABLE_ERRORS = (429, 503)
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Overloaded(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """Runs blocking calls on an executor, refusing new ones once max_pending are queued or running."""
+
+    def __init__(self, executor, max_pending):
+        self.executor = executor
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded()
+            self.pending += 1
+        try:
+            return await asyncio.wrap_future(self.executor.submit(fn, *args))
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"pending": self.pending, "max_pending": self.max_pending, "rejected": self.rejected}
+
+
+async def read_json(request, required=(), optional=()):
+    """The JSON object body; required fields must be non-blank strings, optional ones strings if given."""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise BadRequest("Request body must be JSON")
+    if not isinstance(body, dict):
+        raise BadRequest("Request body must be a JSON object")
+    for key in (*required, *optional):
+        if body.get(key) is not None and not isinstance(body[key], str):
+            raise BadRequest(f"{key} must be a string")
+    missing = [key for key in required if not (body.get(key) or '').strip()]
+    if missing:
+        raise BadRequest(f"Missing {', '.join(missing)}")
+    return body
+
+
+def is_text_map(value):
+    return isinstance(value, dict) and all(isinstance(text, str) for text in value.values())
+
+
+async def complete(request, prompt, call_site, system_prompt=DEFAULT_SYSTEM_PROMPT, use_cache=True,
+                   priority=PRIORITY_INTERACTIVE, **extra):
+    text = await request.app.state.llm.run(
+        lambda: get_client().chat(prompt, system_prompt, use_cache=use_cache, priority=priority,
+                                  call_site=call_site))
+    return JSONResponse({**extra, "text": text})
+
+
+async def enhance(request):
+    body = await read_json(request, required=('field', 'content'))
+    if body['field'] not in ENHANCE_PROMPTS:
+        raise BadRequest(f"field must be one of {', '.join(ENHANCE_PROMPTS)}")
+    if body.get('lines') is not None and not is_text_map(body['lines']):
+        raise BadRequest("lines must be the object returned by a previous enhance")
+    # GroqClient.chat raises, so failures reach groq_error with their status instead of coming back as text
+    enhanced, lines = await request.app.state.llm.run(enhance_changed_lines, body['field'], body['content'],
+                                                      body.get('lines'), PRIORITY_INTERACTIVE, get_client().chat)
+    return JSONResponse({"field": body['field'], "enhanced": enhanced, "lines": lines})
+
+
+async def enhance_all(request):
+    body = await read_json(request)
+    if not body.get('sections') or not is_text_map(body['sections']):
+        raise BadRequest("sections must map field names to text")
+    failures = []
+
+    def chat(*args, **kwargs):
+        try:
+            return get_client().chat(*args, **kwargs)
+        except GroqError as e:
+            failures.append(e)
+            raise
+
+    results, errors = await request.app.state.llm.run(
+        lambda: enhance_sections(body['sections'], priority=PRIORITY_INTERACTIVE, chat=chat))
+    if errors and not results and failures:
+        # Nothing to return: answer with the failure's status, as the single-call endpoints do
+        raise failures[0]
+    headers = {}
+    if any(e.status_code in RETRYABLE_ERRORS for e in failures):
+        headers["Retry-After"] = str(retry_after())
+    return JSONResponse({"results": results, "errors": errors}, headers=headers)
+
+
+async def career_path(request):
+    body = await read_json(request, required=('current_role', 'dream_role'), optional=('experience_level',))
+    experience_level = body.get('experience_level') or EXPERIENCE_LEVELS[0]
+    if experience_level not in EXPERIENCE_LEVELS:
+        raise BadRequest(f"experience_level must be one of {', '.join(EXPERIENCE_LEVELS)}")
+    result = career_paths(body['current_role'], body['dream_role'], experience_level)
+    if body.get('explain') is False:
+        return JSONResponse(result)
+    if result['paths']:
+        prompt = career_path_outline_prompt(result['current_role'], result['dream_role'], experience_level,
+                                            result['paths'][0])
+    else:
+        # No route in the graph (a title it doesn't know, or the same role twice): the model answers on its own
+        prompt = career_path_prompt(body['current_role'], body['dream_role'], experience_level)
+    return await complete(request, prompt, "career_path", **result)
+
+
+async def skills_gap(request):
+    body = await read_json(request, required=('current_skills', 'target_role'))
+    gap = get_skills_index().gap(body['current_skills'], body['target_role'])
+    if body.get('explain') is False:
+        return JSONResponse({"gap": gap})
+    if gap is None:
+        # A role the taxonomy doesn't know: the model answers on its own
+        return await complete(request, skills_gap_prompt(body['current_skills'], body['target_role']), "skills_gap",
+                              gap=None)
+    return await complete(request, skills_gap_explain_prompt(gap), "skills_gap", gap=gap)
+
+
+async def review_report(request):
+    body = await read_json(request, optional=REVIEW_FIELDS)
+    try:
+        overall_rating = int(body.get('overall_rating', 3))
+    except (TypeError, ValueError):
+        raise BadRequest("overall_rating must be a number from 1 to 5")
+    if not 1 <= overall_rating <= 5:
+        raise BadRequest("overall_rating must be a number from 1 to 5")
+    fields = {field: str(body.get(field) or '') for field in REVIEW_FIELDS}
+    if not has_review_content(**fields):
+        raise BadRequest("Fill in at least one of achievements, improvements or goals")
+    return await complete(request, review_report_prompt(overall_rating, **fields), "review_report")
+
+
+async def chat(request):
+    body = await read_json(request, required=('message',), optional=('system_prompt',))
+    return await complete(request, body['message'], "chat", body.get('system_prompt') or DEFAULT_SYSTEM_PROMPT,
+                          use_cache=False, priority=PRIORITY_CHAT)
+
+
+async def pdf(request):
+    body = await read_json(request, required=('name',), optional=PDF_FIELDS)
+    resume_data = {field: body.get(field) or '' for field in PDF_FIELDS}
+    pdf_bytes = await request.app.state.pdf.run(generate_pdf, resume_data)
+    return Response(pdf_bytes, media_type="application/pdf",
+                    headers={"Content-Disposition": content_disposition(resume_data['name'])})
+
+
+def content_disposition(name):
+    """Attachment header for NAME_Resume.pdf: an ASCII filename plus the full name as RFC 5987 filename*."""
+    stem = re.sub(r'[^\w.-]+', '_', name.strip())
+    ascii_stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', stem).strip('_') or 'resume'
+    return f"attachment; filename=\"{ascii_stem}_Resume.pdf\"; filename*=UTF-8''{quote(stem)}_Resume.pdf"
+
+
+async def metrics(request):
+    return PlainTextResponse(get_metrics().to_prometheus())
+
+
+async def healthz(request):
+    return JSONResponse({
+        "status": "ok",
+        "circuit": get_circuit_breaker().stats()["state"],
+        "llm": request.app.state.llm.stats(),
+        "pdf": request.app.state.pdf.stats(),
+    })
+
+
+async def bad_request(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+
+async def overloaded(request, exc):
+    return JSONResponse({"error": "Server is busy. Please retry shortly."}, status_code=503,
+                        headers={"Retry-After": str(RETRY_AFTER)})
+
+
+def retry_after():
+    """Seconds a rate-limited caller should wait: at least RETRY_AFTER, longer while the breaker is open."""
+    return max(RETRY_AFTER, round(get_circuit_breaker().retry_in()))
+
+
+async def groq_error(request, exc):
+    if exc.status_code in RETRYABLE_ERRORS:
+        # Rate limited or the circuit breaker is open: tell the caller when it is worth trying again
+        return JSONResponse({"error": str(exc)}, status_code=exc.status_code,
+                            headers={"Retry-After": str(retry_after())})
+    status_code = 504 if "timed out" in str(exc) else 502
+    return JSONResponse({"error": str(exc)}, status_code=status_code)
+
+
+def create_app(llm_workers=32, llm_queue=128, pdf_workers=None, pdf_queue=None):
+    """Build the Starlette app; pool sizes bound how much work can be queued before shedding load."""
+    pdf_workers = pdf_workers or os.cpu_count() or 1
+    pdf_queue = pdf_queue or pdf_workers * 4
+
+    @asynccontextmanager
+    async def lifespan(app):
+        llm_executor = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="api-llm")
+        pdf_executor = ProcessPoolExecutor(max_workers=pdf_workers)
+        app.state.llm = BoundedExecutor(llm_executor, llm_queue)
+        app.state.pdf = BoundedExecutor(pdf_executor, pdf_queue)
+        try:
+            yield
+        finally:
+            llm_executor.shutdown(wait=False, cancel_futures=True)
+            pdf_executor.shutdown(wait=False, cancel_futures=True)
+
+    routes = [
+        Route("/v1/enhance", enhance, methods=["POST"]),
+        Route("/v1/enhance-all", enhance_all, methods=["POST"]),
+        Route("/v1/career-path", career_path, methods=["POST"]),
+        Route("/v1/skills-gap", skills_gap, methods=["POST"]),
+        Route("/v1/review-report", review_report, methods=["POST"]),
+        Route("/v1/chat", chat, methods=["POST"]),
+        Route("/v1/pdf", pdf, methods=["POST"]),
+        Route("/metrics", metrics),
+        Route("/healthz", healthz),
+    ]
+    exception_handlers = {BadRequest: bad_request, Overloaded: overloaded, GroqError: groq_error}
+    return Starlette(routes=routes, exception_handlers=exception_handlers, lifespan=lifespan)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the resume and career tools over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--llm-workers', type=int, default=int(os.getenv("API_LLM_WORKERS", "32")),
+                        help="Threads making Groq calls (default: 32)")
+    parser.add_argument('--llm-queue', type=int, default=int(os.getenv("API_LLM_QUEUE", "128")),
+                        help="Groq-backed requests queued or running before returning 503 (default: 128)")
+    parser.add_argument('--pdf-workers', type=int, help="PDF rendering processes (default: CPU count)")
+    parser.add_argument('--pdf-queue', type=int, help="PDF requests queued or running before 503 (default: 4 per worker)")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    import uvicorn
+    load_dotenv()
+    uvicorn.run(create_app(args.llm_workers, args.llm_queue, args.pdf_workers, args.pdf_queue),
+                host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
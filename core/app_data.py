@@ -0,0 +1,29 @@
+"""Private on-disk locations for data the app keeps about its users: resumes, chats, reviews."""
+import os
+
+# Outside /tmp so it survives reboots; readable by the app's own user only
+APP_DATA_DIR = os.getenv("RESUME_AI_DATA_DIR") or os.path.join(
+    os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"), "resume-ai")
+
+
+def private_dir(path=None):
+    """Create path (default APP_DATA_DIR) if needed, owner-only (0700), and return it."""
+    path = path or APP_DATA_DIR
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    os.chmod(path, 0o700)
+    return path
+
+
+def private_path(*parts):
+    """A path inside APP_DATA_DIR, creating its directory owner-only."""
+    path = os.path.join(APP_DATA_DIR, *parts)
+    # makedirs only applies the mode to the last directory, so make APP_DATA_DIR private first
+    private_dir()
+    private_dir(os.path.dirname(path))
+    return path
+
+
+def open_private(path, mode='a', encoding='utf-8'):
+    """Open a file for writing, creating it owner-only (0600) if it doesn't exist."""
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if mode.startswith('a') else os.O_TRUNC)
+    return os.fdopen(os.open(path, flags, 0o600), mode, encoding=encoding)
@@ -0,0 +1,191 @@
+"""Headless batch rendering of resumes from JSONL or CSV into a ZIP of PDFs.
+
+Usage:
+    python -m core.batch_resumes resumes.jsonl -o resumes.zip [--workers 4] [--enhance]
+
+Each record uses the same keys as the Resume Builder's resume_data
+(name, email, phone, location, education, experience, skills, projects,
+achievements, certificates).
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from core.resume_pdf import PDF_FIELDS, generate_pdf
+
+
+def iter_records(path, file_format=None):
+    """Yield (index, record) pairs one at a time from a JSONL or CSV file."""
+    file_format = file_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            for index, row in enumerate(csv.DictReader(f), 1):
+                yield index, row
+        else:
+            index = 0
+            for line in f:
+                if line.strip():
+                    index += 1
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield index, {'_error': f"Invalid JSON: {e}"}
+                        continue
+                    if not isinstance(record, dict):
+                        record = {'_error': f"Expected a JSON object, got {type(record).__name__}"}
+                    yield index, record
+
+
+def bounded_map(executor, fn, items, window):
+    """Like executor.map but in completion order, with at most window tasks in flight.
+
+    items yields (index, record); this yields (index, record, future).
+    """
+    in_flight = {}
+    items = iter(items)
+    exhausted = False
+    while in_flight or not exhausted:
+        while not exhausted and len(in_flight) < window:
+            try:
+                index, record = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+            in_flight[executor.submit(fn, record)] = (index, record)
+        if not in_flight:
+            break
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, record = in_flight.pop(future)
+            yield index, record, future
+
+
+def enhance_record(record):
+    """Enhance a record's sections one after another; returns (record, errors)."""
+    from core.resume_enhancer import enhance_sections
+    results, errors = enhance_sections(record, max_workers=1)
+    return dict(record, **results), errors
+
+
+def enhanced_records(records, concurrency):
+    """Enhance records on a bounded thread pool, keeping original text where enhancement fails."""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, record, future in bounded_map(executor, enhance_record, records, concurrency * 2):
+            try:
+                enhanced, errors = future.result()
+            except Exception as e:
+                enhanced, errors = record, {'enhance': str(e)}
+            if errors:
+                enhanced = dict(enhanced, _warnings=errors)
+            yield index, enhanced
+
+
+def render_record(record):
+    """Render one record in a worker process; only picklable data crosses the boundary."""
+    return generate_pdf(record)
+
+
+def pdf_file_name(index, record):
+    name = re.sub(r'[^\w.-]+', '_', (record.get('name') or '').strip()) or 'resume'
+    return f"{index:05d}_{name}_Resume.pdf"
+
+
+def renderable(records, failures):
+    """Drop records that cannot be rendered, noting why."""
+    for index, record in records:
+        name = record.get('name') or ''
+        if record.get('_error'):
+            failures.append({'index': index, 'error': record['_error']})
+        elif not isinstance(name, str) or not name.strip():
+            failures.append({'index': index, 'error': "Missing name"})
+        else:
+            yield index, record
+
+
+def run_batch(input_path, output_path, workers=None, file_format=None, enhance=False,
+              enhance_concurrency=4, progress=None):
+    """Render every record into a ZIP at output_path and return a summary dict."""
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    rendered = 0
+    failures = []
+    warnings = []
+
+    records = iter_records(input_path, file_format)
+    if enhance:
+        records = enhanced_records(records, enhance_concurrency)
+
+    with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        pdf_jobs = (
+            (index, {field: record.get(field) or '' for field in PDF_FIELDS + ('_warnings',)})
+            for index, record in renderable(records, failures)
+        )
+        for index, record, future in bounded_map(executor, render_record, pdf_jobs, workers * 4):
+            if record.get('_warnings'):
+                warnings.append({'index': index, 'enhance_errors': record['_warnings']})
+            try:
+                pdf_bytes = future.result()
+            except Exception as e:
+                failures.append({'index': index, 'error': str(e)})
+            else:
+                # Written as soon as it arrives, so at most a window's worth of PDFs is in memory
+                archive.writestr(pdf_file_name(index, record), pdf_bytes)
+                rendered += 1
+            if progress is not None:
+                progress(rendered, len(failures), time.perf_counter() - started)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            'rendered': rendered,
+            'failed': len(failures),
+            'seconds': round(elapsed, 3),
+            'resumes_per_second': round(rendered / elapsed, 2) if elapsed else 0.0,
+            'failures': sorted(failures, key=lambda f: f['index']),
+            'enhance_warnings': sorted(warnings, key=lambda w: w['index']),
+        }
+        archive.writestr('report.json', json.dumps(summary, indent=2))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render resumes from JSONL or CSV into a ZIP of PDFs.")
+    parser.add_argument('input', help="JSONL or CSV file of resume records")
+    parser.add_argument('-o', '--output', default='resumes.zip', help="ZIP file to write")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help="Input format (default: from extension)")
+    parser.add_argument('--workers', type=int, help="PDF rendering processes (default: CPU count)")
+    parser.add_argument('--enhance', action='store_true', help="Enhance sections with the AI before rendering")
+    parser.add_argument('--enhance-concurrency', type=int, default=4,
+                        help="Records enhanced at the same time (default: 4)")
+    args = parser.parse_args(argv)
+
+    if args.enhance:
+        from dotenv import load_dotenv
+        load_dotenv()
+
+    last_report = [0.0]
+
+    def report_progress(rendered, failed, elapsed):
+        if elapsed - last_report[0] >= 1.0:
+            last_report[0] = elapsed
+            print(f"Rendered {rendered}, failed {failed} ({rendered / elapsed:.1f} resumes/sec)", file=sys.stderr)
+
+    summary = run_batch(args.input, args.output, workers=args.workers, file_format=args.format,
+                        enhance=args.enhance, enhance_concurrency=args.enhance_concurrency,
+                        progress=report_progress)
+
+    for failure in summary['failures']:
+        print(f"Record {failure['index']}: {failure['error']}", file=sys.stderr)
+    print(f"Rendered {summary['rendered']} resumes, {summary['failed']} failed, in {summary['seconds']}s "
+          f"({summary['resumes_per_second']} resumes/sec) -> {args.output}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
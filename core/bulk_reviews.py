@@ -0,0 +1,224 @@
+"""Bulk Performance Review reports from a CSV of employees.
+
+Usage:
+    python -m core.bulk_reviews reviews.csv -o reviews.zip [--concurrency 4]
+
+Columns match the Performance Review form: name, overall_rating (1-5),
+achievements, improvements, goals, manager_comments, recommendations.
+Finished reports are appended to a checkpoint file as they complete, so
+rerunning after a crash or a rate-limit stall only generates the rest; the
+checkpoint is deleted once every report has been written to the archive.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from core.app_data import open_private, private_dir, private_path
+from core.batch_resumes import bounded_map
+from core.groq_client import chat_with_groq
+from core.guidance import REVIEW_FIELDS, has_review_content, review_report_prompt
+from core.rate_limiter import PRIORITY_BULK
+
+REVIEW_COLUMNS = ('name', 'overall_rating') + REVIEW_FIELDS
+COLUMN_ALIASES = {'rating': 'overall_rating', 'employee': 'name', "manager's_comments": 'manager_comments'}
+
+# Checkpoints hold full reports, so by default they go in the app's private data directory
+BULK_REVIEW_DIR = os.getenv("BULK_REVIEW_DIR")
+
+
+def read_reviews(f):
+    """Yield (index, record) from a CSV file object; invalid rows carry an '_error'."""
+    reader = csv.DictReader(f)
+    for index, row in enumerate(reader, 1):
+        record = {}
+        for column, value in row.items():
+            if column is None:
+                continue
+            column = column.strip().lower().replace(' ', '_')
+            record[COLUMN_ALIASES.get(column, column)] = (value or '').strip()
+        record = {column: record.get(column, '') for column in REVIEW_COLUMNS}
+        try:
+            record['overall_rating'] = int(record['overall_rating'] or 3)
+            if not 1 <= record['overall_rating'] <= 5:
+                raise ValueError
+        except ValueError:
+            record['_error'] = f"overall_rating must be a number from 1 to 5, got {record['overall_rating']!r}"
+        else:
+            if not has_review_content(**record):
+                record['_error'] = "Fill in at least one of achievements, improvements or goals"
+        yield index, record
+
+
+def review_prompt(record):
+    return review_report_prompt(record['overall_rating'], **{field: record[field] for field in REVIEW_FIELDS})
+
+
+def review_key(record):
+    """Checkpoint key: a row is only skipped on resume if its prompt is unchanged."""
+    return hashlib.sha256(review_prompt(record).encode('utf-8')).hexdigest()
+
+
+def checkpoint_path_for(data):
+    """Default checkpoint location for an uploaded CSV, so the same upload resumes where it stopped."""
+    file_name = f"{hashlib.sha256(data).hexdigest()[:16]}.jsonl"
+    if BULK_REVIEW_DIR:
+        return os.path.join(private_dir(BULK_REVIEW_DIR), file_name)
+    return private_path("reviews", file_name)
+
+
+class ReviewCheckpoint:
+    """Append-only JSONL of finished reports, keyed by review_key, readable by the owner only."""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash; that row is simply generated again
+                        continue
+                    self.done[entry['key']] = entry['report']
+
+    def save(self, key, report):
+        with self._lock:
+            self.done[key] = report
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+            with open_private(self.path) as f:
+                f.write(json.dumps({'key': key, 'report': report}) + '\n')
+
+    def remove(self):
+        """Delete the checkpoint once its reports have been exported."""
+        with self._lock:
+            self.done = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def generate_review(record):
+    return chat_with_groq(review_prompt(record), priority=PRIORITY_BULK, call_site="review_report:bulk")
+
+
+def generate_reviews(records, concurrency=4, checkpoint=None):
+    """Yield one result dict per row as it completes.
+
+    Each result has index, name and either report or error; rows already in the
+    checkpoint are yielded first with resumed=True and are not sent again.
+    """
+    pending = []
+    for index, record in records:
+        result = {'index': index, 'name': record.get('name', ''), 'resumed': False}
+        if record.get('_error'):
+            yield dict(result, error=record['_error'])
+            continue
+        key = review_key(record)
+        if checkpoint is not None and key in checkpoint.done:
+            yield dict(result, report=checkpoint.done[key], resumed=True)
+            continue
+        pending.append((index, dict(record, _key=key)))
+
+    if not pending:
+        return
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, record, future in bounded_map(executor, generate_review, pending, concurrency * 2):
+            result = {'index': index, 'name': record['name'], 'resumed': False}
+            try:
+                report = future.result()
+            except Exception as e:
+                report = f"Error: {str(e)}"
+            if report.startswith("Error:"):
+                yield dict(result, error=report)
+                continue
+            if checkpoint is not None:
+                checkpoint.save(record['_key'], report)
+            yield dict(result, report=report)
+
+
+def review_file_name(result):
+    name = re.sub(r'[^\w.-]+', '_', (result.get('name') or '').strip()) or 'employee'
+    return f"{result['index']:05d}_{name}_Review.md"
+
+
+def build_archive(results):
+    """ZIP of one Markdown report per employee plus summary.csv, as bytes."""
+    buffer = io.BytesIO()
+    summary = io.StringIO()
+    writer = csv.writer(summary)
+    writer.writerow(['index', 'name', 'status', 'file', 'error'])
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for result in sorted(results, key=lambda r: r['index']):
+            if 'report' in result:
+                file_name = review_file_name(result)
+                title = result['name'] or f"Employee {result['index']}"
+                archive.writestr(file_name, f"# Performance Review: {title}\n\n{result['report'].strip()}\n")
+                writer.writerow([result['index'], result['name'], 'ok', file_name, ''])
+            else:
+                writer.writerow([result['index'], result['name'], 'failed', '', result['error']])
+        archive.writestr('summary.csv', summary.getvalue())
+    return buffer.getvalue()
+
+
+def run_bulk_reviews(input_path, output_path, concurrency=4, checkpoint_path=None, progress=None):
+    """Generate every report into a ZIP at output_path and return a summary dict."""
+    checkpoint = ReviewCheckpoint(checkpoint_path or output_path + '.checkpoint.jsonl')
+    started = time.perf_counter()
+    results = []
+    with open(input_path, newline='', encoding='utf-8') as f:
+        for result in generate_reviews(read_reviews(f), concurrency, checkpoint):
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    with open(output_path, 'wb') as f:
+        f.write(build_archive(results))
+    failures = [{'index': r['index'], 'error': r['error']} for r in results if 'error' in r]
+    if not failures:
+        # Everything is in the archive; the checkpoint is only kept while there are rows to retry
+        checkpoint.remove()
+    return {
+        'generated': sum(1 for r in results if 'report' in r and not r['resumed']),
+        'resumed': sum(1 for r in results if r['resumed']),
+        'failed': len(failures),
+        'seconds': round(time.perf_counter() - started, 3),
+        'failures': sorted(failures, key=lambda f: f['index']),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate performance review reports from a CSV.")
+    parser.add_argument('input', help="CSV with the Performance Review form's fields")
+    parser.add_argument('-o', '--output', default='reviews.zip', help="ZIP file to write")
+    parser.add_argument('--concurrency', type=int, default=4, help="Reports generated at the same time (default: 4)")
+    parser.add_argument('--checkpoint', help="Checkpoint file (default: OUTPUT.checkpoint.jsonl)")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    def report_progress(result):
+        status = "resumed" if result['resumed'] else ("failed" if 'error' in result else "done")
+        print(f"Row {result['index']} ({result['name'] or 'unnamed'}): {status}", file=sys.stderr)
+
+    summary = run_bulk_reviews(args.input, args.output, args.concurrency, args.checkpoint, report_progress)
+    for failure in summary['failures']:
+        print(f"Row {failure['index']}: {failure['error']}", file=sys.stderr)
+    print(f"Generated {summary['generated']} reports, resumed {summary['resumed']}, {summary['failed']} failed, "
+          f"in {summary['seconds']}s -> {args.output}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Per-call-site deadline budgets, hedging policy and model routing for Groq requests."""
+import math
+import os
+import threading
+
+from core.rate_limiter import estimate_tokens
+
+# deadline: seconds for the whole call, including rate-limit waits and retries.
+# hedge: whether a slow first attempt may be raced by a second identical request.
+CALL_POLICIES = {
+    'chat': {'deadline': 20.0, 'hedge': True},
+    'career_path': {'deadline': 30.0, 'hedge': True},
+    'skills_gap': {'deadline': 30.0, 'hedge': True},
+    'review_report': {'deadline': 45.0, 'hedge': True},
+    # Bulk reports aren't waited on by anyone, so they get more time and leave the hedge budget to interactive calls
+    'review_report:bulk': {'deadline': 120.0, 'hedge': False},
+    'chat_summary': {'deadline': 20.0, 'hedge': False},
+    'enhance': {'deadline': 60.0, 'hedge': False},
+}
+DEFAULT_POLICY = {'deadline': 30.0, 'hedge': False}
+
+FAST_MODEL = os.getenv("GROQ_FAST_MODEL", "llama-3.1-8b-instant")
+QUALITY_MODEL = os.getenv("GROQ_QUALITY_MODEL", "llama-3.3-70b-versatile")
+
+# models: tried in order, moving on when one is rate-limited or unavailable.
+# max_tokens: completion cap. output_ratio: when set, completion tokens are sized
+# to output_ratio times the user message (at least min_tokens), up to the cap.
+MODEL_ROUTES = {
+    'chat': {'models': [FAST_MODEL, QUALITY_MODEL], 'max_tokens': 1024, 'temperature': 0.7},
+    'chat_summary': {'models': [FAST_MODEL, QUALITY_MODEL], 'max_tokens': 400, 'temperature': 0.3},
+    'career_path': {'models': [QUALITY_MODEL, FAST_MODEL], 'max_tokens': 1024, 'temperature': 0.7},
+    'skills_gap': {'models': [QUALITY_MODEL, FAST_MODEL], 'max_tokens': 1024, 'temperature': 0.5},
+    'review_report': {'models': [QUALITY_MODEL, FAST_MODEL], 'max_tokens': 2048, 'temperature': 0.5},
+    'enhance': {'models': [FAST_MODEL, QUALITY_MODEL], 'max_tokens': 1024, 'temperature': 0.5,
+                'output_ratio': 2.0, 'min_tokens': 256},
+}
+DEFAULT_ROUTE = {'models': [FAST_MODEL, QUALITY_MODEL], 'max_tokens': 1024, 'temperature': 0.7}
+
+# Hedge once the first attempt is slower than this percentile of observed time to first byte
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+# Delay used until a call site has enough samples for the percentile to mean anything
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "2.0"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.25"))
+HEDGE_MIN_SAMPLES = 20
+
+
+def policy_for(call_site):
+    """Policy for a call site; "enhance:skills" falls back to the "enhance" entry."""
+    return CALL_POLICIES.get(call_site) or CALL_POLICIES.get(call_site.split(':', 1)[0], DEFAULT_POLICY)
+
+
+def route_for(call_site, message):
+    """Model chain, max_tokens and temperature for a call site and user message."""
+    route = MODEL_ROUTES.get(call_site) or MODEL_ROUTES.get(call_site.split(':', 1)[0], DEFAULT_ROUTE)
+    max_tokens = route['max_tokens']
+    if route.get('output_ratio'):
+        wanted = math.ceil(estimate_tokens(message) * route['output_ratio'])
+        max_tokens = min(max_tokens, max(route.get('min_tokens', 0), wanted))
+    return {'models': route['models'], 'max_tokens': max_tokens, 'temperature': route['temperature']}
+
+
+def hedge_delay(metrics, call_site):
+    """Seconds to wait for the first attempt before sending a hedge."""
+    if metrics is None:
+        return HEDGE_DEFAULT_DELAY
+    observed = metrics.percentile("llm_time_to_first_byte_seconds", call_site, HEDGE_PERCENTILE,
+                                  min_samples=HEDGE_MIN_SAMPLES)
+    if observed is None:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, observed)
+
+
+class HedgeBudget:
+    """Caps hedges at a fraction of requests.
+
+    Every hedge-eligible request deposits ratio tokens (up to max_tokens) and
+    each hedge spends one, so over time hedges stay below ratio of traffic.
+    """
+
+    def __init__(self, ratio=0.05, max_tokens=5.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = 1.0
+        self.hedges = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                self.hedges += 1
+                return True
+            self.denied += 1
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {"hedges": self.hedges, "denied": self.denied, "tokens": round(self.tokens, 2)}
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_hedge_budget():
+    """Return the process-wide HedgeBudget."""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = HedgeBudget(ratio=float(os.getenv("HEDGE_MAX_RATIO", "0.05")))
+    return _budget
@@ -0,0 +1,133 @@
+"""Local career-transition graph with memoized k-best path queries."""
+import heapq
+import json
+import os
+import threading
+from functools import lru_cache
+
+from core.skills_index import get_skills_index
+
+CAREER_GRAPH_PATH = os.getenv("CAREER_GRAPH_PATH",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "career_graph.json"))
+
+# Typical move times stretch or shrink with how much experience someone brings
+EXPERIENCE_PACE = {"0-1 years": 1.3, "2-5 years": 1.0, "5-10 years": 0.85, "10+ years": 0.75}
+# Extra cost per core skill a move requires that the previous role didn't, so big skill jumps rank lower
+SKILL_GAP_MONTHS = 2
+
+
+class CareerGraph:
+    """Roles from the skills taxonomy joined by transitions that take a typical number of months.
+
+    The skill delta of a move is the next role's required skills that the
+    current role doesn't already require.
+    """
+
+    def __init__(self, edges, skills_index):
+        self.skills_index = skills_index
+        self.edges = {}
+        for source, target, months in edges:
+            self.edges.setdefault(source, {})[target] = months
+        self.new_skills = {
+            (source, target): [skill for skill in skills_index.roles[target]["required"]
+                               if skill not in skills_index.roles[source]["required"]]
+            for source, targets in self.edges.items() for target in targets
+        }
+
+    def resolve(self, role_text):
+        """Nearest role in the graph for a free-text job title, or None."""
+        return self.skills_index.role(role_text)
+
+    def cost(self, source, target, pace):
+        return self.edges[source][target] * pace + SKILL_GAP_MONTHS * len(self.new_skills[(source, target)])
+
+    def shortest_path(self, source, target, pace, banned_edges=(), banned_nodes=()):
+        """Dijkstra from source to target; returns (cost, [roles]) or None."""
+        queue = [(0.0, source, [source])]
+        settled = set()
+        while queue:
+            cost, node, path = heapq.heappop(queue)
+            if node == target:
+                return cost, path
+            if node in settled:
+                continue
+            settled.add(node)
+            for neighbour in self.edges.get(node, {}):
+                if neighbour in settled or neighbour in banned_nodes or (node, neighbour) in banned_edges:
+                    continue
+                heapq.heappush(queue, (cost + self.cost(node, neighbour, pace), neighbour, path + [neighbour]))
+        return None
+
+    def k_best_paths(self, source, target, pace, k=3):
+        """Up to k cheapest loop-free paths (Yen's algorithm), cheapest first."""
+        first = self.shortest_path(source, target, pace)
+        if first is None:
+            return []
+        best = [first]
+        candidates = []
+        while len(best) < k:
+            _, previous = best[-1]
+            for i in range(len(previous) - 1):
+                root = previous[:i + 1]
+                banned_edges = {(p[i], p[i + 1]) for _, p in best if p[:i + 1] == root and len(p) > i + 1}
+                spur = self.shortest_path(root[-1], target, pace, banned_edges, banned_nodes=set(root[:-1]))
+                if spur is None:
+                    continue
+                root_cost = sum(self.cost(a, b, pace) for a, b in zip(root, root[1:]))
+                path = root[:-1] + spur[1]
+                if all(path != p for _, p in best) and all(path != p for _, p in candidates):
+                    heapq.heappush(candidates, (root_cost + spur[0], path))
+            if not candidates:
+                break
+            best.append(heapq.heappop(candidates))
+        return best
+
+    def describe(self, path, pace):
+        """A path as steps with typical months and the new core skills each move needs."""
+        steps = [{"role": target, "months": round(self.edges[source][target] * pace),
+                  "new_skills": self.new_skills[(source, target)]}
+                 for source, target in zip(path, path[1:])]
+        return {"roles": path, "steps": steps, "total_months": sum(step["months"] for step in steps)}
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_career_graph():
+    """Return the process-wide CareerGraph, loading the graph file on first use."""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                with open(CAREER_GRAPH_PATH, encoding="utf-8") as f:
+                    _graph = CareerGraph(json.load(f)["edges"], get_skills_index())
+    return _graph
+
+
+@lru_cache(maxsize=4096)
+def _resolve(role_text):
+    return get_career_graph().resolve(role_text)
+
+
+@lru_cache(maxsize=4096)
+def _paths_between(source, target, experience_level, k):
+    graph = get_career_graph()
+    pace = EXPERIENCE_PACE.get(experience_level, 1.0)
+    return tuple(json.dumps(graph.describe(path, pace)) for _, path in graph.k_best_paths(source, target, pace, k))
+
+
+def career_paths(current_role, dream_role, experience_level, k=3):
+    """Resolved roles and up to k paths between them.
+
+    A role that isn't in the graph comes back as None with no paths, so callers
+    can say so instead of showing a route for some other role. Title resolution
+    is memoized per title and paths per resolved (current, dream, experience
+    level), so differently spelled titles share one search.
+    """
+    source, target = _resolve(current_role.strip()), _resolve(dream_role.strip())
+    if source is None or target is None or source == target:
+        paths = []
+    else:
+        paths = [json.loads(path) for path in _paths_between(source, target, experience_level, k)]
+    return {"current_role": source, "dream_role": target, "paths": paths}
@@ -0,0 +1,81 @@
+"""Token-budgeted conversation context with a rolling summary of older turns."""
+import os
+
+from core.groq_client import chat_with_groq
+from core.rate_limiter import PRIORITY_CHAT, estimate_tokens
+
+# Prompt budget for system prompt, summary, recent turns and the new message.
+# Well inside the chat models' context windows, leaving ample room for the reply.
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "3000"))
+# How many extra turns to fold into the summary at once, so it is refreshed
+# every few messages rather than on each one
+SUMMARY_BATCH_TURNS = int(os.getenv("CHAT_SUMMARY_BATCH_TURNS", "4"))
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a supportive conversation between a user and an 
+AI counselor. Keep the facts, feelings, concerns and advice that matter for continuing the conversation. 
+Write at most 200 words in the third person."""
+
+
+def new_chat_memory():
+    """State kept per conversation: the rolling summary and how many turns it covers."""
+    return {'summary': '', 'summarized_turns': 0}
+
+
+def turn_tokens(turn):
+    user_msg, bot_msg = turn
+    return estimate_tokens(user_msg) + estimate_tokens(bot_msg)
+
+
+def summarize_turns(summary, turns):
+    """Fold turns into the existing summary; returns an "Error:" string on failure."""
+    transcript = "\n".join(f"User: {user_msg}\nCounselor: {bot_msg}" for user_msg, bot_msg in turns)
+    prompt = (f"Current summary:\n{summary or '(none yet)'}\n\n"
+              f"New conversation turns:\n{transcript}\n\n"
+              "Return the updated summary.")
+    return chat_with_groq(prompt, SUMMARY_SYSTEM_PROMPT, priority=PRIORITY_CHAT, call_site="chat_summary")
+
+
+def build_chat_context(history, user_message, system_prompt, memory,
+                       token_budget=CHAT_CONTEXT_TOKENS, summarize=summarize_turns):
+    """Return the messages to send between the system prompt and the new user message.
+
+    The most recent (user, bot) turns are kept verbatim while they fit in
+    token_budget. Turns that no longer fit are folded into memory['summary']
+    together with a few more of the oldest kept turns, so the summary only
+    needs recomputing every SUMMARY_BATCH_TURNS messages.
+    """
+    fixed_cost = estimate_tokens(system_prompt) + estimate_tokens(memory['summary']) + estimate_tokens(user_message)
+    unsummarized = history[memory['summarized_turns']:]
+    recent_start = _fit_recent_turns(unsummarized, token_budget - fixed_cost)
+
+    if recent_start > 0:
+        fold_count = min(len(unsummarized), recent_start + SUMMARY_BATCH_TURNS)
+        summary = summarize(memory['summary'], unsummarized[:fold_count])
+        if not summary.startswith("Error:"):
+            memory['summary'] = summary
+            memory['summarized_turns'] += fold_count
+            unsummarized = history[memory['summarized_turns']:]
+            fixed_cost = (estimate_tokens(system_prompt) + estimate_tokens(memory['summary'])
+                          + estimate_tokens(user_message))
+            recent_start = _fit_recent_turns(unsummarized, token_budget - fixed_cost)
+
+    context = []
+    if memory['summary']:
+        context.append({"role": "system", "content": f"Summary of the earlier conversation: {memory['summary']}"})
+    for user_msg, bot_msg in unsummarized[recent_start:]:
+        context.append({"role": "user", "content": user_msg})
+        context.append({"role": "assistant", "content": bot_msg})
+    return context
+
+
+def _fit_recent_turns(turns, budget):
+    """Index of the oldest turn such that it and every later turn fit in budget."""
+    start = len(turns)
+    used = 0
+    while start > 0:
+        cost = turn_tokens(turns[start - 1])
+        if used + cost > budget:
+            break
+        used += cost
+        start -= 1
+    return start
@@ -0,0 +1,30 @@
+"""Chat history display for the Mental Health Chat tab: escaped HTML per turn, cached across reruns."""
+import html
+import os
+import re
+from functools import lru_cache
+
+# Turns shown when the tab opens, and how many more each "earlier messages" click adds
+CHAT_PAGE_TURNS = int(os.getenv("CHAT_PAGE_TURNS", "10"))
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+
+def message_html(text):
+    """Escape a message for the chat bubbles, keeping its line breaks and **bold**."""
+    return _BOLD.sub(r"<strong>\1</strong>", html.escape(text)).replace("\n", "<br>")
+
+
+@lru_cache(maxsize=2048)
+def turn_html(user_msg, bot_msg):
+    return (f'<div class="user-message"><strong>You:</strong> {message_html(user_msg)}</div>'
+            f'<div class="bot-message"><strong>AI Counselor:</strong> {message_html(bot_msg)}</div>')
+
+
+def visible_turns(history, shown):
+    """The latest `shown` turns of history and how many earlier ones are hidden.
+
+    Only that slice is read, so with a disk-backed history older turns stay on disk.
+    """
+    hidden = max(0, len(history) - shown)
+    return history[hidden:], hidden
@@ -0,0 +1,144 @@
+"""Process-wide circuit breaker that fails Groq calls fast while the API is degraded."""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from core.llm_metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker driven by error rate and slow calls over a sliding window.
+
+    A call counts as failed when it errors at the transport level, returns a 5xx,
+    or takes longer than slow_call seconds to answer. Once at least min_calls
+    outcomes within window seconds are more than error_rate failed, the breaker
+    opens and rejects everything for open_seconds. It then lets half_open_probes
+    calls through at a time; that many successes close it again, any failure
+    reopens it.
+    """
+
+    def __init__(self, error_rate=0.5, slow_call=10.0, window=60.0, min_calls=10,
+                 open_seconds=30.0, half_open_probes=1, metrics=None, history=20):
+        self.error_rate = error_rate
+        self.slow_call = slow_call
+        self.window = window
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.metrics = metrics
+        self.state = CLOSED
+        self.opened_at = None
+        self.rejected = 0
+        self.transitions = deque(maxlen=history)
+        self._outcomes = deque()
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Admit one upstream attempt; every True must be followed by record()."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self._transition(HALF_OPEN, "cool-down elapsed")
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, ok, latency=None):
+        """Report an admitted attempt; ok=None means it was abandoned before reaching the API."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+            if ok is None:
+                return
+            failed = not ok or (latency is not None and latency > self.slow_call)
+
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._open("probe failed" if not ok else f"probe took {latency:.1f}s")
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED, "probes succeeded")
+                return
+            if self.state == OPEN:
+                # A straggler admitted before the breaker opened
+                return
+
+            now = time.monotonic()
+            self._outcomes.append((now, failed))
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._outcomes.popleft()
+            if len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for _, f in self._outcomes if f)
+                rate = failures / len(self._outcomes)
+                if rate > self.error_rate:
+                    self._open(f"{failures}/{len(self._outcomes)} calls failed or were slow in the last {self.window:g}s")
+
+    def retry_in(self):
+        """Seconds until the breaker will next let a probe through (0 unless open)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    def stats(self):
+        with self._lock:
+            failures = sum(1 for _, f in self._outcomes if f)
+            return {
+                "state": self.state,
+                "window_calls": len(self._outcomes),
+                "window_failures": failures,
+                "rejected": self.rejected,
+                "transitions": list(self.transitions),
+            }
+
+    def _open(self, reason):
+        self.opened_at = time.monotonic()
+        self._transition(OPEN, reason)
+
+    def _transition(self, state, reason):
+        previous, self.state = self.state, state
+        self._outcomes.clear()
+        self._probes = 0
+        self._probe_successes = 0
+        self.transitions.append({"at": time.time(), "from": previous, "to": state, "reason": reason})
+        log = logger.warning if state == OPEN else logger.info
+        log("Groq circuit breaker %s -> %s: %s", previous, state, reason)
+        if self.metrics is not None:
+            self.metrics.increment("llm_circuit_transitions_total", to=state)
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker():
+    """Return the process-wide CircuitBreaker guarding the Groq API."""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(
+                    error_rate=float(os.getenv("CIRCUIT_ERROR_RATE", "0.5")),
+                    slow_call=float(os.getenv("CIRCUIT_SLOW_CALL", "10")),
+                    window=float(os.getenv("CIRCUIT_WINDOW", "60")),
+                    min_calls=int(os.getenv("CIRCUIT_MIN_CALLS", "10")),
+                    open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "30")),
+                    metrics=get_metrics(),
+                )
+    return _breaker
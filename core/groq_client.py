@@ -0,0 +1,486 @@
+"""Pooled, keep-alive client for the Groq chat completions API."""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.call_policy import FAST_MODEL, get_hedge_budget, hedge_delay, policy_for, route_for
+from core.circuit_breaker import get_circuit_breaker
+from core.llm_cache import fingerprint, get_cache
+from core.llm_metrics import get_metrics
+from core.rate_limiter import PRIORITY_INTERACTIVE, RateLimitTimeout, estimate_tokens, get_rate_limiter
+from core.singleflight import FollowerTimeout, get_singleflight
+
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+DEFAULT_MODEL = FAST_MODEL
+DEFAULT_SYSTEM_PROMPT = "You are a helpful career counselor and mental health assistant."
+
+# Status codes worth another attempt: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Status codes, after retries, that move a routed call on to the next model in its chain;
+# 404 is what Groq returns for an unknown model. A 400 is a bad request, which no other model would accept.
+FALLBACK_STATUS_CODES = {404, 429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class GroqError(Exception):
+    """Raised when a Groq request fails; the message is safe to show to users."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GroqClient:
+    """Owns a pooled requests.Session so calls reuse TCP/TLS connections."""
+
+    def __init__(self, api_key=None, url=GROQ_API_URL, pool_size=10, timeout=30,
+                 max_retries=3, backoff_base=0.5, backoff_cap=8.0, max_retry_after=30.0,
+                 cache=None, rate_limiter=None, metrics=None, singleflight=None, hedge_budget=None,
+                 breaker=None):
+        self._api_key = api_key
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.singleflight = singleflight
+        self.hedge_budget = hedge_budget
+        self.breaker = breaker
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_retry_after = max_retry_after
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Runs the attempts of hedged calls while the caller waits for the first answer
+        self._hedge_pool = ThreadPoolExecutor(max_workers=pool_size * 2, thread_name_prefix="groq-hedge")
+
+    @property
+    def api_key(self):
+        return self._api_key or os.getenv("GROQ_API_KEY")
+
+    def build_payload(self, message, system_prompt=DEFAULT_SYSTEM_PROMPT,
+                      model=DEFAULT_MODEL, max_tokens=1024, temperature=0.7, context=None):
+        """context is an optional list of earlier messages sent between the system prompt and message."""
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                *(context or []),
+                {"role": "user", "content": message}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+
+    def chat(self, message, system_prompt=DEFAULT_SYSTEM_PROMPT, use_cache=True,
+             priority=PRIORITY_INTERACTIVE, call_site="other", **options):
+        """Send one chat completion and return the reply text, raising GroqError on failure.
+
+        call_site tags the call in the metrics, e.g. "career_path" or "enhance:skills",
+        and picks its model route unless options name a model explicitly.
+        """
+        payload, fallbacks = self._route(message, system_prompt, call_site, options)
+        key = fingerprint(payload)
+        cache_key = key if use_cache and self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._count("llm_cache_hits_total", call_site)
+                return cached
+
+        def complete():
+            return self._complete(payload, priority, call_site, cache_key, fallbacks)
+
+        if self.singleflight is None:
+            return complete()
+        # Identical requests already in flight from other sessions share that one call
+        return self.singleflight.do(key, complete, on_follow=lambda: self._count("llm_coalesced_total", call_site))
+
+    def _complete(self, payload, priority, call_site, cache_key, fallbacks=()):
+        started = time.perf_counter()
+        info = {"retries": 0, "model": payload["model"]}
+        try:
+            response = self._send_routed(payload, priority, info, call_site, fallbacks)
+            ttfb = time.perf_counter() - started
+            try:
+                response_data = response.json()
+            except json.JSONDecodeError:
+                raise GroqError("Invalid response format from API")
+            if not response_data.get("choices"):
+                raise GroqError("Invalid response from API")
+            content = response_data["choices"][0]["message"]["content"]
+        except GroqError as e:
+            self._record(call_site, started, info, status=e.status_code or "error")
+            raise
+
+        self._record(call_site, started, info, ttfb, response_data.get("usage"), response.status_code)
+        if cache_key is not None:
+            self.cache.set(cache_key, content)
+        return content
+
+    def stream_chat(self, message, system_prompt=DEFAULT_SYSTEM_PROMPT, use_cache=True,
+                    priority=PRIORITY_INTERACTIVE, call_site="other", **options):
+        """Yield the reply text piece by piece as the server streams it."""
+        payload, fallbacks = self._route(message, system_prompt, call_site, options)
+        key = fingerprint(payload)
+        cache_key = key if use_cache and self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._count("llm_cache_hits_total", call_site)
+                yield cached
+                return
+
+        def stream():
+            return self._stream(payload, priority, call_site, cache_key, fallbacks)
+
+        if self.singleflight is None:
+            yield from stream()
+            return
+        try:
+            yield from self.singleflight.stream(key, stream,
+                                                on_follow=lambda: self._count("llm_coalesced_total", call_site))
+        except FollowerTimeout:
+            raise GroqError("Request timed out. Please try again.")
+
+    def _stream(self, payload, priority, call_site, cache_key, fallbacks=()):
+        payload = dict(payload, stream=True)
+        started = time.perf_counter()
+        info = {"retries": 0, "model": payload["model"]}
+        try:
+            response = self._send_routed(payload, priority, info, call_site, fallbacks)
+        except GroqError as e:
+            self._record(call_site, started, info, status=e.status_code or "error")
+            raise
+
+        pieces = []
+        ttfb = None
+        usage = None
+        status = "cancelled"
+        try:
+            for data in iter_sse_data(response):
+                if ttfb is None:
+                    ttfb = time.perf_counter() - started
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    raise GroqError("Invalid response format from API")
+                # Groq reports usage on the last chunk under x_groq; OpenAI-style servers at the top level
+                usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage") or usage
+                choices = chunk.get("choices") or []
+                if choices:
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        pieces.append(content)
+                        yield content
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            status = "error"
+            raise GroqError("Connection lost while streaming the response. Please try again.")
+        except GroqError:
+            status = "error"
+            raise
+        finally:
+            response.close()
+            self._record(call_site, started, info, ttfb, usage, status)
+
+        # Only complete replies are cached; an abandoned or failed stream never gets here
+        if cache_key is not None and pieces:
+            self.cache.set(cache_key, "".join(pieces))
+
+    def _count(self, name, call_site):
+        if self.metrics is not None:
+            self.metrics.increment(name, call_site=call_site)
+
+    def _record(self, call_site, started, info, ttfb=None, usage=None, status=200):
+        if self.metrics is None:
+            return
+        usage = usage or {}
+        self.metrics.record_call(
+            call_site,
+            time.perf_counter() - started,
+            ttfb=ttfb,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            status=status,
+            retries=info["retries"],
+            model=info.get("model"),
+        )
+
+    def _route(self, message, system_prompt, call_site, options):
+        """Build the payload for a call site's route; returns it with the fallback models."""
+        route = route_for(call_site, message)
+        routed = {"model": route["models"][0], "max_tokens": route["max_tokens"],
+                  "temperature": route["temperature"], **options}
+        payload = self.build_payload(message, system_prompt, **routed)
+        if "model" in options:
+            return payload, []
+        fallbacks = [model for model in dict.fromkeys(route["models"]) if model != payload["model"]]
+        logger.info("route %s -> %s (max_tokens=%d, temperature=%s)", call_site, payload["model"],
+                    payload["max_tokens"], payload["temperature"])
+        return payload, fallbacks
+
+    def _send_routed(self, payload, priority, info, call_site, fallbacks):
+        """_send, moving down the fallback models while the current one is rate-limited or unavailable.
+
+        Only an upstream 429/5xx (or unknown model) moves on, and only while the
+        call's deadline has time left. Our own rate limiter running out of
+        budget, or an open circuit breaker, says nothing about the next model.
+        """
+        deadline = time.monotonic() + policy_for(call_site)['deadline']
+        fallbacks = list(fallbacks)
+        while True:
+            try:
+                return self._send(payload, priority, info, call_site, deadline)
+            except GroqError as e:
+                if (e.status_code not in FALLBACK_STATUS_CODES or not fallbacks
+                        or isinstance(e.__cause__, RateLimitTimeout) or time.monotonic() >= deadline
+                        or (self.breaker is not None and self.breaker.retry_in() > 0)):
+                    raise
+                model = fallbacks.pop(0)
+                logger.warning("route %s: %s failed with %s, falling back to %s",
+                               call_site, payload["model"], e.status_code, model)
+                if self.metrics is not None:
+                    self.metrics.increment("llm_route_fallbacks_total", call_site=call_site, model=model)
+                payload = dict(payload, model=model)
+                info["model"] = model
+
+    def _send(self, payload, priority, info, call_site, deadline):
+        """POST within the deadline, hedging slow first attempts where the call site's policy allows."""
+        policy = policy_for(call_site)
+        if not policy['hedge'] or self.hedge_budget is None:
+            return self.post(payload, priority, info, deadline)
+
+        self.hedge_budget.record_request()
+        primary = self._hedge_pool.submit(self.post, payload, priority, info, deadline)
+        try:
+            return primary.result(timeout=hedge_delay(self.metrics, call_site))
+        except FuturesTimeout:
+            pass
+        if not self.hedge_budget.try_spend():
+            return primary.result()
+
+        self._count("llm_hedges_total", call_site)
+        hedge_info = {"retries": 0}
+        hedge = self._hedge_pool.submit(self.post, payload, priority, hedge_info, deadline)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except GroqError as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    info["retries"] = hedge_info["retries"]
+                    self._count("llm_hedge_wins_total", call_site)
+                # A blocking request can't be aborted mid-flight; release the loser's connection when it lands
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                return response
+        raise error
+
+    def post(self, payload, priority=PRIORITY_INTERACTIVE, info=None, deadline=None):
+        """POST a payload, retrying 429/5xx responses with jittered backoff.
+
+        Each attempt first waits for budget from the shared rate limiter, if any.
+        deadline (a time.monotonic() value) bounds the whole call, retries included.
+        The response body is left unread, so the caller can time the first byte;
+        the number of retries is stored in info["retries"] when info is given.
+        """
+        if not self.api_key:
+            raise GroqError("Please set your GROQ_API_KEY in the .env file. "
+                            "You can get an API key from https://console.groq.com/")
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        # Completion tokens count against the budget as soon as they are reserved
+        token_cost = sum(estimate_tokens(m["content"]) for m in payload["messages"]) + payload.get("max_tokens", 0)
+
+        attempt = 0
+        while True:
+            if self.breaker is not None and not self.breaker.allow():
+                raise self._circuit_open_error()
+            response = self._attempt(headers, payload, token_cost, priority, deadline)
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.update_from_headers(response.headers)
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                remaining = self._remaining(deadline)
+                if remaining is not None and delay is not None and delay >= remaining:
+                    delay = None
+                if delay is not None:
+                    response.close()
+                    time.sleep(delay)
+                    attempt += 1
+                    if info is not None:
+                        info["retries"] = attempt
+                    continue
+
+            if response.ok:
+                return response
+            response.close()
+            raise self._http_error(response)
+
+    def _attempt(self, headers, payload, token_cost, priority, deadline):
+        """One rate-limited POST, reporting its outcome to the circuit breaker."""
+        ok = latency = None
+        try:
+            if self.rate_limiter is not None:
+                try:
+                    self.rate_limiter.acquire(token_cost, priority, timeout=self._remaining(deadline))
+                except RateLimitTimeout as e:
+                    raise GroqError("Rate limit exceeded. Please try again later.", 429) from e
+
+            remaining = self._remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise GroqError("Request timed out. Please try again.")
+            sent = time.perf_counter()
+            ok = False
+            try:
+                response = self.session.post(self.url, headers=headers, json=payload,
+                                             timeout=min(self.timeout, remaining or self.timeout), stream=True)
+            except requests.exceptions.Timeout:
+                raise GroqError("Request timed out. Please try again.")
+            except requests.exceptions.ConnectionError:
+                raise GroqError("Connection failed. Please check your internet connection.")
+            latency = time.perf_counter() - sent
+            ok = response.status_code < 500
+            return response
+        finally:
+            if self.breaker is not None:
+                self.breaker.record(ok, latency)
+
+    def _circuit_open_error(self):
+        if self.metrics is not None:
+            self.metrics.increment("llm_circuit_rejections_total")
+        wait_seconds = max(1, round(self.breaker.retry_in()))
+        return GroqError("The AI service is having trouble right now. "
+                         f"Please try again in about {wait_seconds} seconds.", 503)
+
+    @staticmethod
+    def _remaining(deadline):
+        return None if deadline is None else deadline - time.monotonic()
+
+    def _retry_delay(self, attempt, response):
+        """Seconds to wait before the next attempt, or None if Retry-After is too far away."""
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            # Honor the server's hint, plus a little jitter so waiting callers don't stampede
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _http_error(self, response):
+        if response.status_code == 401:
+            return GroqError("Invalid API key. Please check your GROQ_API_KEY.", 401)
+        if response.status_code == 429:
+            return GroqError("Rate limit exceeded. Please try again later.", 429)
+        return GroqError(f"HTTP {response.status_code} - {response.reason}", response.status_code)
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def iter_sse_data(response):
+    """Yield the data field of each server-sent event in a streaming response."""
+    data_lines = []
+    # chunk_size=None hands over bytes as soon as they arrive instead of buffering
+    for raw_line in response.iter_lines(chunk_size=None):
+        line = raw_line.decode("utf-8")
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide GroqClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GroqClient(
+                    url=os.getenv("GROQ_API_URL", GROQ_API_URL),
+                    pool_size=int(os.getenv("GROQ_POOL_SIZE", "10")),
+                    max_retries=int(os.getenv("GROQ_MAX_RETRIES", "3")),
+                    cache=get_cache(),
+                    rate_limiter=get_rate_limiter(),
+                    metrics=get_metrics(),
+                    singleflight=get_singleflight(),
+                    hedge_budget=get_hedge_budget(),
+                    breaker=get_circuit_breaker(),
+                )
+    return _client
+
+
+def chat_with_groq(message, system_prompt=DEFAULT_SYSTEM_PROMPT, use_cache=True,
+                   priority=PRIORITY_INTERACTIVE, call_site="other"):
+    """Return the model's reply, or a string starting with "Error:" on failure.
+
+    Set use_cache=False where a fresh answer is expected, e.g. conversational chat.
+    """
+    try:
+        return get_client().chat(message, system_prompt, use_cache=use_cache, priority=priority,
+                                 call_site=call_site)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+def stream_chat_with_groq(message, system_prompt=DEFAULT_SYSTEM_PROMPT, use_cache=True,
+                          priority=PRIORITY_INTERACTIVE, context=None, call_site="other"):
+    """Yield the model's reply as it streams in, raising GroqError on failure.
+
+    Unlike chat_with_groq, errors are raised rather than returned, since by the
+    time a mid-stream failure happens part of the reply may already be on screen.
+    """
+    yield from get_client().stream_chat(message, system_prompt, use_cache=use_cache, priority=priority,
+                                        context=context, call_site=call_site)
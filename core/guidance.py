@@ -0,0 +1,58 @@
+"""Prompt builders for the Career Guidance and Performance Review tools."""
+
+EXPERIENCE_LEVELS = ["0-1 years", "2-5 years", "5-10 years", "10+ years"]
+
+# Self-assessment fields of a performance review, in the order they appear in the report prompt
+REVIEW_FIELDS = ('achievements', 'improvements', 'goals', 'manager_comments', 'recommendations')
+
+
+def career_path_prompt(current_role, dream_role, experience_level):
+    return (f"Provide a detailed career path from {current_role} to {dream_role} for someone with "
+            f"{experience_level} experience. Include specific steps, timeline, and required skills.")
+
+
+def career_path_outline_prompt(current_role, dream_role, experience_level, path):
+    """Ask the model to flesh out a route already found in the career graph, not to invent one."""
+    steps = "\n".join(f"{i}. {step['role']} (~{step['months']} months; new core skills: "
+                      f"{', '.join(step['new_skills']) or 'none'})" for i, step in enumerate(path['steps'], 1))
+    return (f"Someone with {experience_level} experience wants to move from {current_role} to {dream_role}. "
+            f"A typical route is:\n{steps}\n"
+            "For each step, briefly suggest concrete actions, projects or certifications that help make the move. "
+            "Keep the steps and timeline as given.")
+
+
+def skills_gap_prompt(current_skills, target_role):
+    return (f"Analyze the skills gap for transitioning to {target_role} with current skills: {current_skills}. "
+            "Provide specific recommendations for skills to develop.")
+
+
+def skills_gap_explain_prompt(gap):
+    """Ask only for the explanation of a gap already computed by the skills index."""
+    adjacent = "; ".join(f"{item['skill']} (builds on {', '.join(item['builds_on'])})" for item in gap['adjacent'])
+    return (f"Someone wants to become a {gap['role']}. A skills analysis found:\n"
+            f"- Has: {', '.join(gap['have']) or 'none listed'}\n"
+            f"- Missing core skills: {', '.join(gap['missing']) or 'none'}\n"
+            f"- Missing nice-to-have skills: {', '.join(gap['nice_to_have']) or 'none'}\n"
+            f"- Quickest to learn: {adjacent or 'none'}\n"
+            "Briefly explain why each missing core skill matters for the role and suggest the order to learn "
+            "them in, starting with the quickest. Do not repeat the lists.")
+
+
+def review_report_prompt(overall_rating, achievements='', improvements='', goals='',
+                         manager_comments='', recommendations=''):
+    return f"""
+Generate a comprehensive performance review report based on this data:
+- Overall Rating: {overall_rating}/5
+- Key Achievements: {achievements}
+- Areas for Improvement: {improvements}
+- Goals: {goals}
+- Manager Comments: {manager_comments}
+- Recommendations: {recommendations}
+
+Provide a professional summary and action plan.
+"""
+
+
+def has_review_content(achievements='', improvements='', goals='', **_):
+    """A report needs at least one of achievements, improvements or goals."""
+    return bool(achievements or improvements or goals)
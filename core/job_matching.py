@@ -0,0 +1,350 @@
+"""Rank job postings against a resume with hashed TF-IDF vectors.
+
+Usage:
+    python -m core.job_matching add postings.jsonl [--index job_index]
+    python -m core.job_matching search resume.json [--index job_index] [-k 10]
+    python -m core.job_matching compact [--index job_index]
+
+Postings are JSONL records with title and description (company, location,
+url and skills are optional). Each `add` writes a new immutable segment of
+column-major postings arrays that are memory-mapped at query time, so adding
+postings never rewrites the existing ones. A query gathers only the postings
+of its own terms and sums them with np.bincount, so its cost depends on how
+common the resume's terms are, not on the number of postings.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+N_FEATURES = 2 ** 20
+# Query terms kept after weighting; the rest contribute little and cost the most postings
+MAX_QUERY_TERMS = 300
+RESUME_SECTIONS = ('skills', 'experience', 'projects', 'education', 'achievements', 'certificates')
+
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", "job_index")
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or our that the their this to
+was we were will with you your they them he she his her i me my not no so than then there these those
+who whom which what when where why how all any both each few more most other some such can could should
+would may might must also about above after again against before below between during over under up
+down out off very just own same too only us etc using use used work working years year role team
+""".split())
+
+
+def tokenize(text):
+    """Lowercased words, keeping c++, c#, node.js and the like in one piece; stop words dropped."""
+    return [token for token in _TOKEN.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+@lru_cache(maxsize=200000)
+def feature_id(term):
+    return zlib.crc32(term.encode('utf-8')) & (N_FEATURES - 1)
+
+
+def term_counts(text):
+    """Hashed unigram and bigram counts of a text as (feature ids, counts) arrays."""
+    tokens = tokenize(text)
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not terms:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    ids, counts = np.unique(np.fromiter((feature_id(t) for t in terms), dtype=np.int32, count=len(terms)),
+                            return_counts=True)
+    return ids, counts.astype(np.float32)
+
+
+def posting_text(record):
+    skills = record.get('skills') or ''
+    if isinstance(skills, list):
+        skills = " ".join(skills)
+    # The title counts twice: it says more about the role than any one line of the description
+    title = record.get('title') or ''
+    return " ".join([title, title, skills, record.get('description') or ''])
+
+
+def _tf_weights(counts):
+    weights = 1 + np.log(counts)
+    return weights / np.linalg.norm(weights)
+
+
+def resume_sections(resume_data):
+    return {field: resume_data.get(field) or '' for field in RESUME_SECTIONS if (resume_data.get(field) or '').strip()}
+
+
+class _Segment:
+    """One immutable batch of postings, stored column-major (by feature) and memory-mapped."""
+
+    FILES = ('features', 'indptr', 'doc_ids', 'weights', 'offsets')
+
+    def __init__(self, path):
+        for name in self.FILES:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+        self.n_docs = len(self.offsets)
+
+    @staticmethod
+    def write(path, docs, offsets):
+        """docs is a list of (feature ids, counts); weights are log-scaled, L2-normalised term frequencies."""
+        rows = np.concatenate([np.full(len(ids), row, dtype=np.int32) for row, (ids, _) in enumerate(docs)])
+        cols = np.concatenate([ids for ids, _ in docs])
+        vals = np.concatenate([_tf_weights(counts) if len(counts) else counts for _, counts in docs]).astype(np.float32)
+        order = np.lexsort((rows, cols))
+        features, per_feature = np.unique(cols[order], return_counts=True)
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            'features': features.astype(np.int32),
+            'indptr': np.concatenate([[0], np.cumsum(per_feature)]).astype(np.int64),
+            'doc_ids': rows[order],
+            'weights': vals[order],
+            'offsets': np.asarray(offsets, dtype=np.int64),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+        return np.bincount(cols, minlength=N_FEATURES)
+
+    def scores(self, query_ids, query_weights):
+        """Dot product of every posting in the segment with the query."""
+        pos = np.searchsorted(self.features, query_ids)
+        pos[pos >= len(self.features)] = 0
+        hit = self.features[pos] == query_ids
+        pos, query_weights = pos[hit], query_weights[hit]
+        starts = self.indptr[pos]
+        lengths = self.indptr[pos + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(self.n_docs)
+        # Flat indices of every posting of every query term, without a Python loop
+        firsts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        postings = firsts + np.arange(total)
+        weights = np.repeat(query_weights, lengths) * self.weights[postings]
+        return np.bincount(self.doc_ids[postings], weights=weights, minlength=self.n_docs)
+
+
+class JobIndex:
+    """A directory of postings segments plus shared document frequencies.
+
+    Layout: postings.jsonl (every record added, in order), df.npy, meta.json
+    and one directory per segment.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._meta_mtime = None
+        self.segments = []
+        self.df = np.zeros(N_FEATURES, dtype=np.int64)
+        self.n_docs = 0
+        self._load()
+
+    def _load(self):
+        """Pick up segments another process added; call with the lock held (or from __init__)."""
+        meta_path = os.path.join(self.path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return
+        mtime = os.path.getmtime(meta_path)
+        if mtime == self._meta_mtime:
+            return
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        self.segments = [_Segment(os.path.join(self.path, name)) for name in meta['segments']]
+        self.df = np.load(os.path.join(self.path, 'df.npy'), mmap_mode='r')
+        self.n_docs = meta['n_docs']
+        self._meta_mtime = mtime
+
+    def add(self, records):
+        """Append postings as a new segment; returns how many were added.
+
+        The segment is written before the records reach postings.jsonl, and
+        both are undone if any step fails, so compact never finds records
+        that no segment indexed.
+        """
+        with self._lock:
+            self._load()
+            os.makedirs(self.path, exist_ok=True)
+            postings_path = os.path.join(self.path, 'postings.jsonl')
+            start = os.path.getsize(postings_path) if os.path.exists(postings_path) else 0
+            docs, offsets, lines = [], [], []
+            offset = start
+            for record in records:
+                line = (json.dumps(record) + '\n').encode('utf-8')
+                offsets.append(offset)
+                lines.append(line)
+                docs.append(term_counts(posting_text(record)))
+                offset += len(line)
+            if not docs:
+                return 0
+            name = f"seg-{len(self.segments):05d}"
+            while os.path.exists(os.path.join(self.path, name)):
+                name += "x"
+            segment_path = os.path.join(self.path, name)
+            try:
+                df = np.asarray(self.df) + _Segment.write(segment_path, docs, offsets)
+                with open(postings_path, 'ab') as f:
+                    f.writelines(lines)
+                self._commit(self._segment_names() + [name], df, self.n_docs + len(docs))
+            except BaseException:
+                if os.path.exists(postings_path):
+                    os.truncate(postings_path, start)
+                shutil.rmtree(segment_path, ignore_errors=True)
+                raise
+            return len(docs)
+
+    def compact(self):
+        """Rewrite every segment into one, so queries touch one set of arrays."""
+        with self._lock:
+            self._load()
+            if len(self.segments) <= 1:
+                return
+            old = self._segment_names()
+            docs, offsets = [], []
+            for offset, record in self._iter_postings():
+                offsets.append(offset)
+                docs.append(term_counts(posting_text(record)))
+            name = f"seg-{len(old):05d}c"
+            try:
+                df = _Segment.write(os.path.join(self.path, name), docs, offsets)
+                self._commit([name], df, len(docs))
+            except BaseException:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+                raise
+            for segment in old:
+                for file_name in _Segment.FILES:
+                    os.remove(os.path.join(self.path, segment, f"{file_name}.npy"))
+                os.rmdir(os.path.join(self.path, segment))
+
+    def _segment_names(self):
+        meta_path = os.path.join(self.path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return []
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)['segments']
+
+    def _commit(self, segments, df, n_docs):
+        # df first, then meta: readers only switch over once meta.json names the new segment
+        np.save(os.path.join(self.path, 'df.tmp.npy'), np.asarray(df, dtype=np.int64))
+        os.replace(os.path.join(self.path, 'df.tmp.npy'), os.path.join(self.path, 'df.npy'))
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'segments': segments, 'n_docs': n_docs, 'n_features': N_FEATURES}, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+        self._meta_mtime = None
+        self._load()
+
+    def _iter_postings(self):
+        path = os.path.join(self.path, 'postings.jsonl')
+        with open(path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    yield offset, json.loads(line)
+                offset += len(line)
+
+    def _read_posting(self, offset):
+        with open(os.path.join(self.path, 'postings.jsonl'), 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    @staticmethod
+    def _query_vector(text, df, n_docs):
+        ids, counts = term_counts(text)
+        if not len(ids):
+            return ids, counts
+        idf = np.log((1 + n_docs) / (1 + np.asarray(df[ids], dtype=np.float64))) + 1
+        weights = (1 + np.log(counts)) * idf
+        if len(ids) > MAX_QUERY_TERMS:
+            keep = np.argpartition(weights, -MAX_QUERY_TERMS)[-MAX_QUERY_TERMS:]
+            ids, weights = ids[keep], weights[keep]
+        return ids, weights / np.linalg.norm(weights)
+
+    def search(self, resume_data, k=10):
+        """Top-k postings for a resume, each with its score and the terms it shares with each section."""
+        # One consistent view of the index; add and compact swap these under the same lock
+        with self._lock:
+            self._load()
+            segments, df, n_docs = self.segments, self.df, self.n_docs
+        sections = resume_sections(resume_data)
+        query_ids, query_weights = self._query_vector(" ".join(sections.values()), df, n_docs)
+        if not len(query_ids) or not segments:
+            return []
+
+        candidates = []
+        for segment in segments:
+            scores = segment.scores(query_ids, query_weights)
+            top = np.argpartition(scores, -min(k, len(scores)))[-k:]
+            candidates.extend((float(scores[i]), segment, int(i)) for i in top if scores[i] > 0)
+        candidates.sort(key=lambda c: c[0], reverse=True)
+
+        matches = []
+        section_terms = {field: set(tokenize(text)) for field, text in sections.items()}
+        for score, segment, local_id in candidates[:k]:
+            posting = self._read_posting(int(segment.offsets[local_id]))
+            posting_terms = set(tokenize(posting_text(posting)))
+            overlap = {}
+            for field, terms in section_terms.items():
+                shared = terms & posting_terms
+                if shared:
+                    # Rarest shared terms first: they say the most about the fit
+                    overlap[field] = sorted(shared, key=lambda t: df[feature_id(t)])[:8]
+            matches.append({'posting': posting, 'score': round(score, 4), 'overlap': overlap})
+        return matches
+
+    def stats(self):
+        return {'postings': self.n_docs, 'segments': len(self.segments)}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_job_index():
+    """Return the process-wide JobIndex at JOB_INDEX_PATH, or None if no postings have been added."""
+    global _index
+    if _index is None:
+        if not os.path.exists(os.path.join(JOB_INDEX_PATH, 'meta.json')):
+            return None
+        with _index_lock:
+            if _index is None:
+                _index = JobIndex(JOB_INDEX_PATH)
+    return _index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the job postings index.")
+    parser.add_argument('command', choices=['add', 'search', 'compact'])
+    parser.add_argument('input', nargs='?', help="Postings JSONL (add) or resume JSON (search)")
+    parser.add_argument('--index', default=JOB_INDEX_PATH, help=f"Index directory (default: {JOB_INDEX_PATH})")
+    parser.add_argument('-k', type=int, default=10, help="Matches to show (default: 10)")
+    args = parser.parse_args(argv)
+
+    index = JobIndex(args.index)
+    if args.command == 'compact':
+        index.compact()
+        print(f"Compacted {index.n_docs} postings into 1 segment")
+        return 0
+    if not args.input:
+        parser.error(f"{args.command} needs an input file")
+    if args.command == 'add':
+        with open(args.input, encoding='utf-8') as f:
+            added = index.add(json.loads(line) for line in f if line.strip())
+        print(f"Added {added} postings ({index.n_docs} in {len(index.segments)} segments)")
+        return 0
+    with open(args.input, encoding='utf-8') as f:
+        resume_data = json.load(f)
+    for match in index.search(resume_data, args.k):
+        posting = match['posting']
+        print(f"{match['score']:.3f}  {posting.get('title', '')} - {posting.get('company', '')}")
+        for field, terms in match['overlap'].items():
+            print(f"         {field}: {', '.join(terms)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""In-process metrics for LLM calls, exportable as Prometheus text or a JSON snapshot."""
+import os
+import threading
+from collections import deque
+
+# Upper bounds in seconds for the Prometheus histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Recent samples kept per histogram for percentile estimates
+PERCENTILE_WINDOW = int(os.getenv("LLM_METRICS_WINDOW", "2048"))
+
+
+class Histogram:
+    """Cumulative bucket counts for Prometheus plus a window of recent samples for percentiles."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, window=PERCENTILE_WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def percentile(self, p):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class LLMMetrics:
+    """Per-call-site latency histograms, counters and gauges, safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+
+    def record_call(self, call_site, wall_time, ttfb=None, prompt_tokens=0, completion_tokens=0,
+                    status="200", retries=0, model=None):
+        """Record one upstream call (including its retries) made for call_site.
+
+        With a model, per-route counters are kept as well, so latency and tokens
+        can be compared across the models a call site is routed to.
+        """
+        with self._lock:
+            self._observe("llm_call_duration_seconds", call_site, wall_time)
+            if ttfb is not None:
+                self._observe("llm_time_to_first_byte_seconds", call_site, ttfb)
+            self._add("llm_calls_total", (("call_site", call_site), ("status", str(status))), 1)
+            self._add("llm_retries_total", (("call_site", call_site),), retries)
+            self._add("llm_tokens_total", (("call_site", call_site), ("kind", "prompt")), prompt_tokens or 0)
+            self._add("llm_tokens_total", (("call_site", call_site), ("kind", "completion")), completion_tokens or 0)
+            if model:
+                route = (("call_site", call_site), ("model", model))
+                self._add("llm_route_calls_total", route + (("status", str(status)),), 1)
+                self._add("llm_route_seconds_total", route, wall_time)
+                self._add("llm_route_tokens_total", route + (("kind", "prompt"),), prompt_tokens or 0)
+                self._add("llm_route_tokens_total", route + (("kind", "completion"),), completion_tokens or 0)
+
+    def increment(self, name, amount=1, **labels):
+        """Bump a free-form counter, e.g. increment("llm_cache_hits_total", call_site="chat")."""
+        with self._lock:
+            self._add(name, tuple(sorted(labels.items())), amount)
+
+    def set_gauge(self, name, value, **labels):
+        """Set a value that can go down as well as up, e.g. set_gauge("sessions_resident", 12)."""
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def percentile(self, name, call_site, p, min_samples=1):
+        """Recent p-th percentile of a histogram, or None with fewer than min_samples samples."""
+        with self._lock:
+            histogram = self._histograms.get((name, call_site))
+            if histogram is None or len(histogram.recent) < min_samples:
+                return None
+            return histogram.percentile(p)
+
+    def call_site_summary(self):
+        """Latency percentiles (seconds), call and error counts per call site."""
+        with self._lock:
+            sites = {}
+            for (name, call_site), histogram in self._histograms.items():
+                key = "latency" if name == "llm_call_duration_seconds" else "ttfb"
+                sites.setdefault(call_site, {})[key] = histogram.summary()
+            for (name, labels), value in self._counters.items():
+                labels = dict(labels)
+                call_site = labels.get("call_site")
+                if name == "llm_calls_total" and call_site in sites:
+                    site = sites[call_site]
+                    site["calls"] = site.get("calls", 0) + value
+                    if labels["status"] != "200":
+                        site["errors"] = site.get("errors", 0) + value
+                elif name == "llm_tokens_total" and call_site in sites:
+                    sites[call_site][f"{labels['kind']}_tokens"] = value
+                elif name == "llm_retries_total" and call_site in sites:
+                    sites[call_site]["retries"] = value
+            return sites
+
+    def snapshot(self):
+        """Everything recorded so far as a JSON-serialisable dict."""
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            gauges = [{"name": name, "labels": dict(labels), "value": value}
+                      for (name, labels), value in sorted(self._gauges.items())]
+        return {"call_sites": self.call_site_summary(), "counters": counters, "gauges": gauges}
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            by_name = {}
+            for (name, call_site), histogram in sorted(self._histograms.items()):
+                by_name.setdefault(name, []).append((call_site, histogram))
+            for name, series in by_name.items():
+                lines.append(f"# TYPE {name} histogram")
+                for call_site, histogram in series:
+                    label = f'call_site="{_escape(call_site)}"'
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{name}_sum{{{label}}} {histogram.total}")
+                    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+            seen_types = set()
+            for kind, series in (("counter", self._counters), ("gauge", self._gauges)):
+                for (name, labels), value in sorted(series.items()):
+                    if name not in seen_types:
+                        lines.append(f"# TYPE {name} {kind}")
+                        seen_types.add(name)
+                    label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+                    lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def _observe(self, name, call_site, value):
+        key = (name, call_site)
+        if key not in self._histograms:
+            self._histograms[key] = Histogram()
+        self._histograms[key].observe(value)
+
+    def _add(self, name, labels, amount):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_metrics = LLMMetrics()
+
+
+def get_metrics():
+    """Return the process-wide LLMMetrics."""
+    return _metrics
@@ -0,0 +1,187 @@
+"""Process-wide client-side rate limiter driven by Groq's x-ratelimit headers."""
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+
+# Lower numbers are served first
+PRIORITY_CHAT = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BULK = 2
+PRIORITY_SPECULATIVE = 3
+
+PRIORITY_NAMES = {PRIORITY_CHAT: "chat", PRIORITY_INTERACTIVE: "interactive", PRIORITY_BULK: "bulk",
+                  PRIORITY_SPECULATIVE: "speculative"}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a call has waited longer than allowed for rate-limit budget."""
+
+
+def parse_duration(value):
+    """Parse Groq reset durations such as "2m59.56s", "7.66s" or "250ms" into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (about four characters per token) for budgeting."""
+    return len(text) // 4 + 1 if text else 0
+
+
+class TokenBucket:
+    """A bucket refilled continuously; re-synchronised from the server's view when headers arrive."""
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, cost):
+        # A cost larger than the whole bucket is let through once the bucket is full
+        needed = min(cost, self.capacity) - self.tokens
+        if needed <= 0:
+            return 0.0
+        return needed / self.rate if self.rate > 0 else float("inf")
+
+    def sync(self, limit, remaining, reset_seconds, now):
+        if limit is not None and limit > 0:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.capacity, float(remaining))
+            self.updated_at = now
+            if reset_seconds:
+                # The server refills what has been used by the time the window resets
+                self.rate = max(self.capacity - self.tokens, 1.0) / reset_seconds
+
+
+class RateLimiter:
+    """Delays calls before they would be rejected, serving higher priorities first."""
+
+    def __init__(self, requests_per_minute=30, tokens_per_minute=6000, max_wait=60.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._wait_stats = {name: {"calls": 0, "total_wait": 0.0, "max_wait": 0.0}
+                            for name in PRIORITY_NAMES.values()}
+        self.timeouts = 0
+
+    def acquire(self, token_cost, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Block until one request and token_cost tokens are available; returns seconds waited.
+
+        Gives up with RateLimitTimeout after timeout seconds (default: max_wait).
+        """
+        max_wait = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        started = time.monotonic()
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.requests.refill(now)
+                    self.tokens.refill(now)
+                    delay = max(self.requests.wait_time(1), self.tokens.wait_time(token_cost))
+                    if self._waiters[0] == entry and delay == 0:
+                        self.requests.tokens -= 1
+                        self.tokens.tokens -= min(token_cost, self.tokens.capacity)
+                        break
+                    waited = now - started
+                    if waited + delay > max_wait:
+                        self.timeouts += 1
+                        raise RateLimitTimeout(f"Waited {waited:.1f}s for rate-limit budget")
+                    self._cond.wait(timeout=min(delay, 1.0) if delay else 1.0)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+        waited = time.monotonic() - started
+        self._record_wait(priority, waited)
+        return waited
+
+    def update_from_headers(self, headers):
+        """Re-synchronise both buckets from x-ratelimit-* response headers."""
+        if "x-ratelimit-remaining-requests" not in headers and "x-ratelimit-remaining-tokens" not in headers:
+            return
+        now = time.monotonic()
+        with self._cond:
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                bucket.sync(
+                    _to_float(headers.get(f"x-ratelimit-limit-{kind}")),
+                    _to_float(headers.get(f"x-ratelimit-remaining-{kind}")),
+                    parse_duration(headers.get(f"x-ratelimit-reset-{kind}")),
+                    now,
+                )
+            self._cond.notify_all()
+
+    def stats(self):
+        """Queue depth, remaining budget and wait times per priority class."""
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            waits = {}
+            for name, stat in self._wait_stats.items():
+                waits[name] = dict(stat, avg_wait=stat["total_wait"] / stat["calls"] if stat["calls"] else 0.0)
+            return {
+                "queue_depth": len(self._waiters),
+                "remaining_requests": int(self.requests.tokens),
+                "remaining_tokens": int(self.tokens.tokens),
+                "timeouts": self.timeouts,
+                "waits": waits,
+            }
+
+    def _record_wait(self, priority, waited):
+        with self._cond:
+            stat = self._wait_stats[PRIORITY_NAMES.get(priority, "bulk")]
+            stat["calls"] += 1
+            stat["total_wait"] += waited
+            stat["max_wait"] = max(stat["max_wait"], waited)
+
+
+def _to_float(value):
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide RateLimiter shared by every session using the API key."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    requests_per_minute=float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+                    tokens_per_minute=float(os.getenv("GROQ_TOKENS_PER_MINUTE", "30000")),
+                    max_wait=float(os.getenv("GROQ_RATE_LIMIT_MAX_WAIT", "60")),
+                )
+    return _limiter
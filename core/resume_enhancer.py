@@ -0,0 +1,249 @@
+"""AI enhancement of resume sections, one at a time or concurrently."""
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.groq_client import chat_with_groq
+from core.rate_limiter import PRIORITY_BULK, estimate_tokens
+
+ENHANCE_PROMPTS = {
+    'education': "Enhance this education section for a professional resume. Make it concise and impactful: {content}",
+    'experience': "Enhance this work experience section for a professional resume. Use action verbs and quantify achievements where possible: {content}",
+    'skills': "Organize and enhance this skills section for a professional resume. Group similar skills and present them professionally: {content}",
+    'projects': "Enhance this projects section for a professional resume. Focus on impact and technologies used: {content}",
+    'achievements': "Enhance this achievements section for a professional resume. Make them quantifiable and impactful: {content}",
+    'certificates': "Enhance this certificates section for a professional resume. Present them professionally with dates if available: {content}"
+}
+
+# Prepended to the prompt for each part of a section too long to send in one go.
+# It must not mention the part's position, so an unchanged part keeps hitting the cache.
+ENHANCE_CHUNK_NOTE = ("This is one part of a longer resume section. Enhance only this part, "
+                      "keep its order, and do not add a heading or a summary. ")
+
+ENHANCE_MAX_WORKERS = int(os.getenv("ENHANCE_MAX_WORKERS", "6"))
+# Sections above this many estimated tokens are split and their parts enhanced in parallel
+ENHANCE_CHUNK_TOKENS = int(os.getenv("ENHANCE_CHUNK_TOKENS", "500"))
+# Blocks smaller than this (a lone heading, a one-line role) ride along with the next block
+MIN_CHUNK_TOKENS = 40
+# Parts of one section enhanced at once; high enough that a few pages finish in about one call's time
+ENHANCE_CHUNK_WORKERS = int(os.getenv("ENHANCE_CHUNK_WORKERS", "8"))
+
+BULLET_LINE = re.compile(r"^\s*([-*\u2022\u25aa\u25cf]|\d+[.)])\s+")
+
+# Sections whose lines stand on their own, so a re-enhance can rewrite just the lines that changed
+LINE_FIELDS = ('experience', 'projects', 'achievements')
+# Unchanged lines sent on either side of a changed run, so the rewrite matches its neighbours
+LINE_CONTEXT = 2
+# Above this share of new lines a fresh whole-section enhancement is cheaper than many small requests
+MAX_CHANGED_SHARE = 0.5
+
+ENHANCE_LINES_PROMPT = (
+    "Below is part of the {field_name} section of a resume. Lines starting with >> are new; "
+    "the others are already polished and are shown only for context. {instruction} "
+    "Rewrite each >> line in the same style as the others, keeping any bullet marker. "
+    "Return exactly {count} line(s), one per >> line, in order, without the >> marker and without "
+    "any other text.\n\n{content}"
+)
+
+
+def enhance_section(field_name, content, priority=PRIORITY_BULK, chat=None):
+    """Return the enhanced text, the content unchanged if there is nothing to do,
+    or a string starting with "Error:" on failure.
+
+    chat replaces chat_with_groq for the model calls; pass GroqClient.chat to
+    have failures raised as GroqError instead of returned.
+    """
+    if not content or not content.strip() or field_name not in ENHANCE_PROMPTS:
+        return content
+    chunks = split_section(content)
+    if len(chunks) == 1:
+        return _enhance_text(field_name, content, priority=priority, chat=chat)
+
+    # Map: every part in parallel, each cached on its own text. Reduce: rejoin in order.
+    with ThreadPoolExecutor(max_workers=min(ENHANCE_CHUNK_WORKERS, len(chunks))) as executor:
+        enhanced = list(executor.map(
+            lambda chunk: _enhance_text(field_name, chunk, ENHANCE_CHUNK_NOTE, priority, chat), chunks))
+    errors = [text for text in enhanced if text.startswith("Error:")]
+    if errors:
+        return errors[0]
+    return "\n\n".join(text.strip() for text in enhanced)
+
+
+def _enhance_text(field_name, content, note="", priority=PRIORITY_BULK, chat=None):
+    return (chat or chat_with_groq)(note + ENHANCE_PROMPTS[field_name].format(content=content), priority=priority,
+                                    call_site=f"enhance:{field_name}")
+
+
+def split_section(content, max_tokens=ENHANCE_CHUNK_TOKENS):
+    """Split a section into parts of at most about max_tokens, on natural boundaries.
+
+    Blank lines separate roles or projects; an oversized block is further split
+    into bullet groups, each starting at a non-bullet line such as a job title.
+    A small block rides along with the block after it, so editing one role
+    leaves the other parts, and their cached enhancements, unchanged; only a
+    small block at the very end is appended to the last part.
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return [content]
+    blocks = []
+    for block in re.split(r"\n\s*\n", content.strip()):
+        if block.strip():
+            blocks.extend(_split_block(block.strip("\n"), max_tokens))
+
+    chunks, carry = [], ""
+    for block in blocks:
+        block = f"{carry}\n{block}" if carry else block
+        if estimate_tokens(block) < MIN_CHUNK_TOKENS:
+            carry = block
+            continue
+        chunks.append(block)
+        carry = ""
+    if carry:
+        if chunks:
+            chunks[-1] = f"{chunks[-1]}\n\n{carry}"
+        else:
+            chunks.append(carry)
+    return chunks
+
+
+def line_key(line):
+    return hashlib.sha1(line.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def record_enhancement(original, enhanced):
+    """Line memory for a section: line hash -> the enhanced line it became.
+
+    Every enhanced line maps to itself, so it is recognised as done next time.
+    Original lines are mapped too when both texts have the same number of
+    lines, which is how a line-for-line rewrite comes back.
+    """
+    original_lines = [line for line in original.split("\n") if line.strip()]
+    enhanced_lines = [line for line in enhanced.split("\n") if line.strip()]
+    memory = {}
+    if len(original_lines) == len(enhanced_lines):
+        memory.update((line_key(before), after) for before, after in zip(original_lines, enhanced_lines))
+    memory.update((line_key(line), line) for line in enhanced_lines)
+    return memory
+
+
+def enhance_changed_lines(field_name, content, memory, priority=PRIORITY_BULK, chat=None):
+    """Re-enhance only the lines of content that memory doesn't know, merging them back in place.
+
+    memory is what record_enhancement (or a previous call) returned for this
+    section. Returns (text, memory) for the next call, or (error, memory)
+    with an "Error:" string. Known lines are kept as they are, so untouched
+    bullets are never reworded; each run of new lines is sent with
+    LINE_CONTEXT lines around it, all runs in parallel. Without a memory, or
+    when most lines are new, the whole section is enhanced instead. chat is as
+    for enhance_section.
+    """
+    lines = content.split("\n")
+    new = [i for i, line in enumerate(lines) if line.strip() and line_key(line) not in (memory or {})]
+    written = sum(1 for line in lines if line.strip())
+    if not memory or field_name not in LINE_FIELDS or len(new) > MAX_CHANGED_SHARE * written:
+        enhanced = enhance_section(field_name, content, priority, chat)
+        if enhanced.startswith("Error:"):
+            return enhanced, memory
+        return enhanced, record_enhancement(content, enhanced)
+
+    merged = [memory.get(line_key(line), line) if line.strip() else line for line in lines]
+    # New lines close enough to share context go in one request
+    runs = []
+    for i in new:
+        if runs and i - runs[-1][-1] <= 2 * LINE_CONTEXT + 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+    memory = dict(memory)
+    if runs:
+        with ThreadPoolExecutor(max_workers=min(ENHANCE_CHUNK_WORKERS, len(runs))) as executor:
+            rewrites = list(executor.map(lambda run: _enhance_run(field_name, merged, run, priority, chat), runs))
+        errors = [rewrite for rewrite in rewrites if isinstance(rewrite, str)]
+        if errors:
+            return errors[0], memory
+        for run, rewrite in zip(runs, rewrites):
+            for i, line in zip(run, rewrite):
+                memory[line_key(lines[i])] = line
+                merged[i] = line
+
+    # Keep only what the current text can still refer to, so the memory stays the size of the section
+    current = {line_key(line) for line in lines + merged if line.strip()}
+    memory = {key: line for key, line in memory.items() if key in current}
+    memory.update((line_key(line), line) for line in merged if line.strip())
+    return "\n".join(merged), memory
+
+
+def _enhance_run(field_name, lines, run, priority, chat=None):
+    """Rewrites of the lines at the indexes in run, in order, or an "Error:" string."""
+    start, stop = max(0, run[0] - LINE_CONTEXT), min(len(lines), run[-1] + LINE_CONTEXT + 1)
+    marked = set(run)
+    content = "\n".join(f">> {lines[i]}" if i in marked else lines[i]
+                        for i in range(start, stop) if lines[i].strip())
+    # The section prompt's instruction without its trailing "...: {content}"
+    instruction = ENHANCE_PROMPTS[field_name].split(":")[0] + "."
+    reply = (chat or chat_with_groq)(ENHANCE_LINES_PROMPT.format(field_name=field_name, instruction=instruction,
+                                                                 count=len(run), content=content),
+                                     priority=priority, call_site=f"enhance:{field_name}:lines")
+    if reply.startswith("Error:"):
+        return reply
+    rewrite = [re.sub(r"^\s*>>\s?", "", line).rstrip() for line in reply.strip().split("\n") if line.strip()]
+    if len(rewrite) == len(run):
+        return rewrite
+    if len(run) == 1:
+        return [" ".join(rewrite)]
+    # The model merged or split lines; ask again one line at a time so each lands in its place
+    rewrites = [_enhance_run(field_name, lines, [i], priority, chat) for i in run]
+    errors = [rewrite for rewrite in rewrites if isinstance(rewrite, str)]
+    return errors[0] if errors else [rewrite[0] for rewrite in rewrites]
+
+
+def _split_block(block, max_tokens):
+    """Break one oversized block into groups of lines, preferring to start each at a non-bullet line."""
+    if estimate_tokens(block) <= max_tokens:
+        return [block]
+    groups, current = [], []
+    for line in block.split("\n"):
+        starts_group = not BULLET_LINE.match(line) and any(BULLET_LINE.match(l) for l in current)
+        if current and (starts_group or estimate_tokens("\n".join(current + [line])) > max_tokens):
+            groups.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        groups.append("\n".join(current))
+    return groups
+
+
+def enhance_sections(sections, max_workers=ENHANCE_MAX_WORKERS, on_complete=None, priority=PRIORITY_BULK,
+                     chat=None):
+    """Enhance several sections concurrently on a bounded thread pool.
+
+    sections maps field name to content; empty sections are skipped.
+    on_complete(field_name, error) is called from the calling thread as each
+    section finishes, with error None on success.
+    Returns (results, errors): enhanced text and error message by field name.
+    Failed sections are left out of results so callers keep the original text.
+    chat is as for enhance_section; exceptions it raises become error messages.
+    """
+    pending = {field: content for field, content in sections.items()
+               if field in ENHANCE_PROMPTS and content and content.strip()}
+    results, errors = {}, {}
+    if not pending:
+        return results, errors
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+        futures = {executor.submit(enhance_section, field, content, priority, chat): field
+                   for field, content in pending.items()}
+        for future in as_completed(futures):
+            field = futures[future]
+            try:
+                enhanced = future.result()
+            except Exception as e:
+                enhanced = f"Error: {str(e)}"
+            if enhanced.startswith("Error:"):
+                errors[field] = enhanced
+            else:
+                results[field] = enhanced
+            if on_complete is not None:
+                on_complete(field, errors.get(field))
+    return results, errors
@@ -0,0 +1,191 @@
+"""Resume PDF rendering with cached section layouts and cached output bytes."""
+import logging
+import threading
+from functools import lru_cache
+
+from fpdf import FPDF
+
+from core.llm_metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Sections in the order they appear on the page
+PDF_SECTIONS = [
+    ('Education', 'education'),
+    ('Experience', 'experience'),
+    ('Skills', 'skills'),
+    ('Projects', 'projects'),
+    ('Achievements', 'achievements'),
+    ('Certificates', 'certificates')
+]
+PDF_FIELDS = ('name', 'email', 'phone', 'location') + tuple(key for _, key in PDF_SECTIONS)
+
+# The core fonts use WinAnsiEncoding, where byte 0x95 is the bullet glyph
+BULLET = '\x95'
+BULLET_WIDTH = 5
+# A4 width minus fpdf's default 1cm left and right margins
+TEXT_WIDTH = 190
+LINE_HEIGHT = 5
+
+_measure_lock = threading.Lock()
+_measure_pdf = FPDF()
+_measure_pdf.set_font('Helvetica', '', 10)
+
+
+@lru_cache(maxsize=4096)
+def clean_text(text):
+    """Drop characters the latin-1 core fonts cannot render."""
+    return text.encode('latin-1', 'ignore').decode('latin-1') if text else ""
+
+
+def wrap_line(text, width):
+    """Greedy word wrap of one line to width (mm) in 10pt Helvetica."""
+    with _measure_lock:
+        measure = _measure_pdf.get_string_width
+        if measure(text) <= width:
+            return [text]
+
+        lines = []
+        current = ""
+        for word in text.split(' '):
+            candidate = f"{current} {word}" if current else word
+            if measure(candidate) <= width:
+                current = candidate
+                continue
+            if current:
+                lines.append(current)
+            # Break words that are wider than the whole line on their own
+            while measure(word) > width:
+                cut = len(word) - 1
+                while cut > 1 and measure(word[:cut]) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            current = word
+        if current:
+            lines.append(current)
+        return lines
+
+
+@lru_cache(maxsize=256)
+def layout_section(content):
+    """Sanitise and wrap a section's text once per distinct content.
+
+    Returns a tuple of (is_bullet, wrapped_lines) entries, one per non-empty
+    input line, so editing one section leaves the others' layouts cached.
+    """
+    entries = []
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        is_bullet = line.startswith('•') or line.startswith('-')
+        if is_bullet:
+            line = line[1:].strip()
+        line_clean = clean_text(line)
+        width = TEXT_WIDTH - BULLET_WIDTH if is_bullet else TEXT_WIDTH
+        entries.append((is_bullet, tuple(wrap_line(line_clean, width))))
+    return tuple(entries)
+
+
+# Enhanced PDF Generation Class with better error handling
+class ResumePDF(FPDF):
+    def __init__(self):
+        super().__init__()
+        self.add_page()
+        self.set_auto_page_break(auto=True, margin=15)
+        
+    def header(self):
+        pass
+        
+    def add_name_header(self, name, email, phone, location):
+        try:
+            # Name
+            self.set_font('Helvetica', 'B', 28)
+            self.set_text_color(0, 0, 0)
+            self.cell(0, 15, clean_text(name), 0, 1, 'C')
+            
+            # Contact info
+            self.set_font('Helvetica', '', 10)
+            self.set_text_color(100, 100, 100)
+            
+            contact_parts = [part for part in map(clean_text, [email, phone, location]) if part]
+            contact_line = " | ".join(contact_parts)
+            
+            self.cell(0, 6, contact_line, 0, 1, 'C')
+            
+            # Line separator
+            self.ln(5)
+            self.set_draw_color(200, 200, 200)
+            self.line(20, self.get_y(), 190, self.get_y())
+            self.ln(10)
+        except Exception:
+            # Re-raised so a half-drawn page is neither returned nor cached by _render_pdf
+            logger.exception("Error in add_name_header")
+            get_metrics().increment("pdf_errors_total", step="add_name_header")
+            raise
+        
+    def add_section(self, title, content):
+        if not content or not content.strip():
+            return
+            
+        try:
+            # Section title
+            self.set_font('Helvetica', 'B', 12)
+            self.set_text_color(0, 0, 0)
+            self.cell(0, 8, clean_text(title).upper(), 0, 1, 'L')
+            
+            # Underline
+            self.set_draw_color(100, 100, 100)
+            self.line(20, self.get_y(), 190, self.get_y())
+            self.ln(3)
+            
+            # Content, laid out once per distinct section text
+            self.set_font('Helvetica', '', 10)
+            self.set_text_color(0, 0, 0)
+            
+            for is_bullet, lines in layout_section(content):
+                for i, line in enumerate(lines):
+                    if is_bullet:
+                        # Continuation lines are indented under the bullet text
+                        self.cell(BULLET_WIDTH, LINE_HEIGHT, BULLET if i == 0 else '', 0, 0, 'L')
+                    self.cell(0, LINE_HEIGHT, line, 0, 1, 'L')
+            self.ln(5)
+        except Exception:
+            logger.exception("Error in add_section (%s)", title)
+            get_metrics().increment("pdf_errors_total", step="add_section")
+            raise
+
+
+def resume_fields(resume_data):
+    """The parts of resume_data that affect the PDF, as a hashable cache key."""
+    return tuple(resume_data.get(field) or '' for field in PDF_FIELDS)
+
+
+@lru_cache(maxsize=64)
+def _render_pdf(fields):
+    resume_data = dict(zip(PDF_FIELDS, fields))
+    pdf = ResumePDF()
+    
+    # Header
+    if resume_data['name']:
+        pdf.add_name_header(
+            resume_data['name'],
+            resume_data['email'],
+            resume_data['phone'],
+            resume_data['location']
+        )
+    
+    for section_title, section_key in PDF_SECTIONS:
+        if resume_data[section_key]:
+            pdf.add_section(section_title, resume_data[section_key])
+    
+    return bytes(pdf.output())
+
+
+def generate_pdf(resume_data):
+    """Return the resume as PDF bytes, reusing the last rendering of identical content."""
+    try:
+        return _render_pdf(resume_fields(resume_data))
+    except Exception as e:
+        raise Exception(f"PDF generation failed: {str(e)}")
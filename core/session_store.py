@@ -0,0 +1,442 @@
+"""Bounded, disk-backed store for each browser session's resume data and chat history.
+
+Only a small hot window of every session stays in memory. Changes are written
+behind in batches by a background thread, least recently used sessions are
+evicted once the process holds more than max_sessions or max_bytes of them,
+and an evicted session is restored from disk on its next use. A session is
+also restored after a reload or on a later visit when the user presents its
+id, which the app shows them as a private session code and never puts in a URL.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from core.app_data import private_path
+from core.chat_context import new_chat_memory
+from core.llm_metrics import get_metrics
+
+# Holds resumes and chats, so by default it lives in the private app data directory (see core.app_data)
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH")
+
+
+class SQLiteSessionBackend:
+    """Sessions and chat turns in a SQLite database in WAL mode.
+
+    Any object with the same load, load_turns, write, delete and prune methods
+    can be passed to SessionStore instead.
+    """
+
+    def __init__(self, path):
+        if path != ":memory:":
+            # Owner-only before SQLite opens it; the -wal and -shm files it adds take the same mode
+            os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+            os.chmod(path, 0o600)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, resume_data TEXT NOT NULL, chat_memory TEXT NOT NULL, "
+            "turn_count INTEGER NOT NULL, updated_at REAL NOT NULL, enhancements TEXT NOT NULL DEFAULT '{}')"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(sessions)")}
+        if "enhancements" not in columns:
+            self._db.execute("ALTER TABLE sessions ADD COLUMN enhancements TEXT NOT NULL DEFAULT '{}'")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS turns ("
+            "session_id TEXT NOT NULL, idx INTEGER NOT NULL, user_msg TEXT NOT NULL, bot_msg TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, idx)) WITHOUT ROWID"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def load(self, session_id, recent_turns):
+        """(resume_data, chat_memory, enhancements, turn_count, last recent_turns turns), or None if unknown."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT resume_data, chat_memory, enhancements, turn_count FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        turn_count = row[3]
+        return (json.loads(row[0]), json.loads(row[1]), json.loads(row[2]), turn_count,
+                self.load_turns(session_id, max(0, turn_count - recent_turns), turn_count))
+
+    def load_turns(self, session_id, start, stop):
+        """Chat turns [start, stop) as (user, bot) tuples."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT user_msg, bot_msg FROM turns WHERE session_id = ? AND idx >= ? AND idx < ? ORDER BY idx",
+                (session_id, start, stop)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def write(self, batch):
+        """Write a batch of (session_id, resume_json, memory_json, enhancements_json, turn_count, first_new_turn,
+        new_turns) in one transaction.
+
+        Turns from first_new_turn on are replaced, which also drops the old
+        turns of a cleared chat.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            for session_id, resume_json, memory_json, enhancements_json, turn_count, first_new_turn, new_turns in batch:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sessions "
+                    "(session_id, resume_data, chat_memory, enhancements, turn_count, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (session_id, resume_json, memory_json, enhancements_json, turn_count, now)
+                )
+                self._db.execute("DELETE FROM turns WHERE session_id = ? AND idx >= ?", (session_id, first_new_turn))
+                self._db.executemany(
+                    "INSERT INTO turns (session_id, idx, user_msg, bot_msg) VALUES (?, ?, ?, ?)",
+                    [(session_id, first_new_turn + i, user_msg, bot_msg)
+                     for i, (user_msg, bot_msg) in enumerate(new_turns)]
+                )
+
+    def delete(self, session_id):
+        """Delete one session and its chat turns."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def prune(self, older_than):
+        """Delete sessions not written since the older_than timestamp."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM turns WHERE session_id IN "
+                             "(SELECT session_id FROM sessions WHERE updated_at < ?)", (older_than,))
+            self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (older_than,))
+
+
+class _TrackedDict(dict):
+    """A dict that marks its session dirty whenever a value actually changes.
+
+    The app writes every widget's value back on each rerun, so unchanged
+    assignments are ignored rather than queueing a write.
+    """
+
+    def __init__(self, session, data):
+        super().__init__(data)
+        self._session = session
+
+    def __setitem__(self, key, value):
+        with self._session.lock:
+            if key not in self or self[key] != value:
+                super().__setitem__(key, value)
+                self._session.mark_dirty()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def _changed(method):
+        def wrapper(self, *args, **kwargs):
+            with self._session.lock:
+                result = method(self, *args, **kwargs)
+                self._session.mark_dirty()
+            return result
+        return wrapper
+
+    __delitem__ = _changed(dict.__delitem__)
+    pop = _changed(dict.pop)
+    popitem = _changed(dict.popitem)
+    clear = _changed(dict.clear)
+    del _changed
+
+
+class ChatHistory:
+    """A session's chat turns, indexable like a list over the whole conversation.
+
+    Only the latest hot_turns (plus any not yet written) are held in memory;
+    older turns are read back from the backend when a slice reaches them.
+    """
+
+    def __init__(self, session, turn_count=0, recent=(), hot_turns=20):
+        self._session = session
+        self._turns = list(recent)
+        self._start = turn_count - len(self._turns)  # index of the first turn held in memory
+        self._saved = turn_count  # turns before this index are on disk
+        self.hot_turns = hot_turns
+
+    def __len__(self):
+        return self._start + len(self._turns)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("chat turn index out of range")
+            return self[index:index + 1][0]
+        start, stop, step = index.indices(len(self))
+        with self._session.lock:
+            turns, hot_start = list(self._turns), self._start
+        if start >= stop:
+            return []
+        cold = self._session.load_turns(start, min(stop, hot_start)) if start < hot_start else []
+        hot = turns[max(start, hot_start) - hot_start:stop - hot_start]
+        return (cold + hot)[::step]
+
+    def append(self, turn):
+        with self._session.lock:
+            self._turns.append(tuple(turn))
+            self._session.mark_dirty()
+            self._trim()
+
+    def unsaved(self):
+        """(index of the first unwritten turn, the unwritten turns); call with the session lock held."""
+        return self._saved, self._turns[self._saved - self._start:]
+
+    def mark_saved(self, count):
+        """Turns before count are on disk and may leave memory; call with the session lock held."""
+        self._saved = max(self._saved, count)
+        self._trim()
+
+    def _trim(self):
+        drop = min(len(self._turns) - self.hot_turns, self._saved - self._start)
+        if drop > 0:
+            del self._turns[:drop]
+            self._start += drop
+
+
+class Session:
+    """One browser session: resume_data, chat_memory and enhancements dicts plus its ChatHistory.
+
+    enhancements maps a resume field to its line memory from resume_enhancer.record_enhancement.
+    """
+
+    def __init__(self, store, session_id, state=None):
+        self.store = store
+        self.session_id = session_id
+        self.lock = store.lock
+        self.dirty = False
+        self.deleted = False
+        self.size = 0
+        resume_data, chat_memory, enhancements, turn_count, recent = state or ({}, new_chat_memory(), {}, 0, [])
+        self.resume_data = _TrackedDict(self, resume_data)
+        self.chat_memory = _TrackedDict(self, chat_memory)
+        self.enhancements = _TrackedDict(self, enhancements)
+        self.chat_history = ChatHistory(self, turn_count, recent, store.hot_turns)
+
+    def mark_dirty(self):
+        self.store._mark_dirty(self)
+
+    def load_turns(self, start, stop):
+        return self.store.backend.load_turns(self.session_id, start, stop)
+
+    def clear_chat(self):
+        """Start a new conversation; the old turns are deleted from disk on the next flush."""
+        with self.lock:
+            self.chat_memory = _TrackedDict(self, new_chat_memory())
+            self.chat_history = ChatHistory(self, hot_turns=self.store.hot_turns)
+            self.mark_dirty()
+
+
+class SessionStore:
+    """LRU of resident sessions over a backend, with write-behind batching.
+
+    get() returns the resident Session or restores it from the backend. A
+    background thread writes dirty sessions every flush_interval seconds in
+    one transaction, then evicts clean least recently used sessions until at
+    most max_sessions, holding at most max_bytes of data, remain in memory.
+    """
+
+    def __init__(self, backend, hot_turns=20, max_sessions=500, max_bytes=64 * 1024 * 1024,
+                 flush_interval=1.0, ttl=30 * 24 * 3600, metrics=None):
+        self.backend = backend
+        self.hot_turns = hot_turns
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self.metrics = metrics
+        self.lock = threading.RLock()
+        self.restores = 0
+        self.evictions = 0
+        self.flushes = 0
+        self._sessions = OrderedDict()
+        self._dirty = {}
+        self._resident_bytes = 0
+        self._pruned_at = 0.0
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._run, name="session-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def get(self, session_id):
+        """The Session for session_id, restored from disk or created empty if it isn't resident."""
+        with self.lock:
+            session = self._sessions.get(session_id) or self._dirty.get(session_id)
+            if session is not None:
+                if session_id not in self._sessions:
+                    # Evicted while a run still held it, then changed: take it back rather than reload
+                    self._sessions[session_id] = session
+                    self._resident_bytes += session.size
+                self._sessions.move_to_end(session_id)
+                return session
+        state = self.backend.load(session_id, self.hot_turns)
+        with self.lock:
+            # Another run of the same session may have restored it meanwhile
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(self, session_id, state)
+                if state is not None:
+                    self.restores += 1
+                    self._count("session_restores_total")
+                    self._resize(session, sum(len(json.dumps(data)) for data in
+                                              (session.resume_data, session.chat_memory, session.enhancements)))
+            self._sessions.move_to_end(session_id)
+            self._evict()
+            return session
+
+    def exists(self, session_id):
+        """Whether session_id is resident or saved, without creating it."""
+        with self.lock:
+            if session_id in self._sessions or session_id in self._dirty:
+                return True
+        return self.backend.load(session_id, 0) is not None
+
+    def delete(self, session_id):
+        """Forget a session in memory and on disk; a run still holding it can no longer write it back."""
+        with self.lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._resident_bytes -= session.size
+            session = session or self._dirty.get(session_id)
+            self._dirty.pop(session_id, None)
+            if session is not None:
+                session.deleted = True
+        self.backend.delete(session_id)
+
+    def flush(self):
+        """Write every dirty session now, in one batch."""
+        with self.lock:
+            dirty, self._dirty = self._dirty, {}
+            batch, marks = [], []
+            for session in dirty.values():
+                history = session.chat_history
+                first_new_turn, new_turns = history.unsaved()
+                resume_json = json.dumps(session.resume_data)
+                memory_json = json.dumps(session.chat_memory)
+                enhancements_json = json.dumps(session.enhancements)
+                batch.append((session.session_id, resume_json, memory_json, enhancements_json, len(history),
+                              first_new_turn, list(new_turns)))
+                marks.append((session, history, len(history),
+                              len(resume_json) + len(memory_json) + len(enhancements_json)))
+        if not batch:
+            return 0
+        try:
+            self.backend.write(batch)
+        except Exception:
+            with self.lock:
+                for session in dirty.values():
+                    self._dirty.setdefault(session.session_id, session)
+            raise
+        with self.lock:
+            for session, history, written, data_bytes in marks:
+                history.mark_saved(written)
+                session.dirty = session.session_id in self._dirty
+                self._resize(session, data_bytes)
+            self.flushes += 1
+            self._evict()
+        self._count("session_flushes_total")
+        self._count("session_flushed_total", len(batch))
+        return len(batch)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "resident_sessions": len(self._sessions),
+                "resident_bytes": self._resident_bytes,
+                "dirty_sessions": len(self._dirty),
+                "restores": self.restores,
+                "evictions": self.evictions,
+                "flushes": self.flushes,
+            }
+
+    def close(self):
+        """Stop the background writer after a final flush."""
+        self._stopped.set()
+        self.flush()
+
+    def _mark_dirty(self, session):
+        with self.lock:
+            if session.deleted:
+                return
+            session.dirty = True
+            self._dirty[session.session_id] = session
+
+    def _resize(self, session, data_bytes):
+        size = data_bytes + sum(len(user_msg) + len(bot_msg) for user_msg, bot_msg in session.chat_history._turns)
+        if self._sessions.get(session.session_id) is session:
+            self._resident_bytes += size - session.size
+        session.size = size
+
+    def _evict(self):
+        """Drop clean sessions, least recently used first, until under both ceilings; call with the lock held.
+
+        The most recently used session is never dropped, since a run is about to use it.
+        """
+        for session_id in list(self._sessions)[:-1]:
+            if len(self._sessions) <= self.max_sessions and self._resident_bytes <= self.max_bytes:
+                break
+            session = self._sessions[session_id]
+            if session.dirty:
+                continue
+            del self._sessions[session_id]
+            self._resident_bytes -= session.size
+            self.evictions += 1
+            self._count("session_evictions_total")
+        if self.metrics is not None:
+            self.metrics.set_gauge("sessions_resident", len(self._sessions))
+            self.metrics.set_gauge("sessions_resident_bytes", self._resident_bytes)
+
+    def _count(self, name, amount=1):
+        if self.metrics is not None:
+            self.metrics.increment(name, amount)
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+                if self.ttl and time.time() - self._pruned_at > 3600:
+                    self._pruned_at = time.time()
+                    self.backend.prune(self._pruned_at - self.ttl)
+            except Exception:
+                # Dirty sessions stay queued and are retried on the next tick
+                self._count("session_flush_errors_total")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Return the process-wide SessionStore, configured from the environment."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore(
+                    SQLiteSessionBackend(SESSION_STORE_PATH or private_path("sessions.db")),
+                    hot_turns=int(os.getenv("SESSION_HOT_TURNS", "20")),
+                    max_sessions=int(os.getenv("SESSION_STORE_MAX_SESSIONS", "500")),
+                    max_bytes=int(float(os.getenv("SESSION_STORE_MAX_MB", "64")) * 1024 * 1024),
+                    flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", "1.0")),
+                    ttl=float(os.getenv("SESSION_TTL_DAYS", "30")) * 24 * 3600,
+                    metrics=get_metrics(),
+                )
+    return _store
@@ -0,0 +1,172 @@
+"""Process-wide coalescing of identical in-flight requests."""
+import os
+import threading
+
+
+class FollowerTimeout(Exception):
+    """Raised to a follower whose leader stalled after part of a stream was already shared."""
+
+
+class _LeaderCancelled(FollowerTimeout):
+    """The leader's consumer stopped reading before its stream finished."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _SharedStream:
+    """Pieces produced by a leading stream, replayed to every follower as they arrive."""
+
+    def __init__(self):
+        self.pieces = []
+        self.finished = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def publish(self, piece):
+        with self.cond:
+            self.pieces.append(piece)
+            self.cond.notify_all()
+
+    def finish(self, error=None):
+        with self.cond:
+            self.finished = True
+            self.error = error
+            self.cond.notify_all()
+
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one upstream call.
+
+    The first caller for a key (the leader) does the work; callers arriving
+    while it is in flight (followers) wait for and receive its result or
+    exception. A follower waits at most max_wait seconds for the leader before
+    making its own call, so one slow request can't stall everyone behind it.
+    """
+
+    def __init__(self, max_wait=30.0):
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self.leaders = 0
+        self.followers = 0
+        self.follower_timeouts = 0
+
+    def do(self, key, fn, on_follow=None):
+        """Return fn(), sharing the call with any identical one already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if on_follow is not None:
+            on_follow()
+        if not call.done.wait(self.max_wait):
+            with self._lock:
+                self.follower_timeouts += 1
+            return fn()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stream(self, key, gen_fn, on_follow=None):
+        """Yield from gen_fn(), replaying the pieces to identical streams started meanwhile."""
+        with self._lock:
+            shared = self._streams.get(key)
+            leader = shared is None
+            if leader:
+                shared = self._streams[key] = _SharedStream()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if leader:
+            yield from self._lead(key, shared, gen_fn)
+            return
+
+        if on_follow is not None:
+            on_follow()
+        index = 0
+        while True:
+            with shared.cond:
+                if not shared.cond.wait_for(lambda: index < len(shared.pieces) or shared.finished,
+                                            timeout=self.max_wait):
+                    with self._lock:
+                        self.follower_timeouts += 1
+                    if index == 0:
+                        break
+                    raise FollowerTimeout("The shared request stalled")
+                pieces = shared.pieces[index:]
+                finished, error = shared.finished, shared.error
+            if finished and isinstance(error, _LeaderCancelled) and index + len(pieces) == 0:
+                break
+            index += len(pieces)
+            yield from pieces
+            if finished and index >= len(shared.pieces):
+                if error is not None:
+                    raise error
+                return
+
+        # Nothing arrived from the leader in time, or it gave up; make our own request instead
+        yield from gen_fn()
+
+    def _lead(self, key, shared, gen_fn):
+        error = None
+        try:
+            for piece in gen_fn():
+                shared.publish(piece)
+                yield piece
+        except GeneratorExit:
+            error = _LeaderCancelled("The shared request was cancelled")
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                del self._streams[key]
+            shared.finish(error)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._streams),
+                "leaders": self.leaders,
+                "followers": self.followers,
+                "follower_timeouts": self.follower_timeouts,
+            }
+
+
+_singleflight = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight():
+    """Return the process-wide SingleFlight used for Groq requests."""
+    global _singleflight
+    if _singleflight is None:
+        with _singleflight_lock:
+            if _singleflight is None:
+                _singleflight = SingleFlight(max_wait=float(os.getenv("SINGLEFLIGHT_MAX_WAIT", "30")))
+    return _singleflight
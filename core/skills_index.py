@@ -0,0 +1,204 @@
+"""Local skills taxonomy: synonym normalisation and role skill profiles for instant gap analysis."""
+import difflib
+import json
+import os
+import re
+import threading
+
+TAXONOMY_PATH = os.getenv("SKILLS_TAXONOMY_PATH",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills_taxonomy.json"))
+
+# Free-text skill lists are split on these; "/" is left alone for CI/CD, TCP/IP and friends
+_LIST_SEPARATORS = re.compile(r"[,;|\n•]+|\s+and\s+|\s*&\s*")
+_WORD = re.compile(r"[^\s()]+")
+# Shorthand in job titles, expanded before a title is looked up
+_TITLE_ABBREVIATIONS = {"dev": "developer", "devs": "developer", "eng": "engineer", "engr": "engineer",
+                        "mgr": "manager", "sr": "senior", "sr.": "senior", "swe": "software engineer"}
+# Title words that set the level of a role; a typo-tolerant match must keep them exactly as typed
+_SENIORITY = {"junior", "jr", "jr.", "senior", "lead", "principal", "staff", "head", "chief", "associate",
+              "intern", "trainee", "entry", "mid", "vp", "director"}
+# Smallest similarity for a misspelt title word ("fronted" for "frontend") to count as the same word
+_WORD_CUTOFF = 0.8
+# Aliases this short ("iam", "sql") only match as a word of their own, never words joined together ("I am")
+_SHORT_ALIAS = 3
+
+
+def normalize(text):
+    """Lowercase, collapse whitespace and trim punctuation, keeping the + and # of C++ and C#."""
+    return re.sub(r"\s+", " ", text.lower()).strip(" \t.,:;-_()[]\"'")
+
+
+def compact(key):
+    """normalize() with every separator removed, so "React JS", "react.js" and "ReactJS" agree."""
+    return re.sub(r"[^\w+#]", "", key).replace("_", "")
+
+
+class SkillsIndex:
+    """Hash indexes from every alias (and its compact form) to a canonical skill or role.
+
+    Lookups are dict hits, so the cost doesn't grow with the number of aliases;
+    free text is scanned in word n-grams no longer than the longest alias.
+    """
+
+    def __init__(self, taxonomy):
+        self.skills = list(taxonomy["skills"])
+        self.related = {skill: set() for skill in self.skills}
+        for skill, neighbours in taxonomy.get("related", {}).items():
+            for neighbour in neighbours:
+                self.related[skill].add(neighbour)
+                self.related[neighbour].add(skill)
+        self.roles = {role: {"required": profile["required"], "nice": profile.get("nice", [])}
+                      for role, profile in taxonomy["roles"].items()}
+
+        self._skill_keys = {}
+        for skill, aliases in taxonomy["skills"].items():
+            self._add_keys(self._skill_keys, skill, [skill] + aliases)
+        self._role_keys = {}
+        # Written-out titles without the compact forms, for word-by-word typo matching
+        self._role_titles = {}
+        for role, profile in taxonomy["roles"].items():
+            self._add_keys(self._role_keys, role, [role] + profile.get("aliases", []))
+            for name in [role] + profile.get("aliases", []):
+                self._role_titles.setdefault(normalize(name), role)
+        self._skill_words = max(len(key.split()) for key in self._skill_keys)
+        self._role_words = max(len(key.split()) for key in self._role_keys)
+
+    @staticmethod
+    def _add_keys(index, canonical, names):
+        for name in names:
+            key = normalize(name)
+            index.setdefault(key, canonical)
+        # Compact forms only fill gaps, so an explicit alias always wins a collision
+        for name in names:
+            index.setdefault(compact(normalize(name)), canonical)
+
+    @staticmethod
+    def _lookup(index, text):
+        key = normalize(text)
+        if key in index:
+            return index[key]
+        joined = compact(key)
+        if " " in key and len(joined) <= _SHORT_ALIAS:
+            return None
+        return index.get(joined)
+
+    def skill(self, text):
+        """Canonical name for a skill alias, or None."""
+        return self._lookup(self._skill_keys, text)
+
+    def _scan(self, index, text, max_words):
+        """Canonical names found in free text, longest match first, in order of appearance."""
+        words = _WORD.findall(text)
+        found = []
+        start = 0
+        while start < len(words):
+            for size in range(min(max_words, len(words) - start), 0, -1):
+                match = self._lookup(index, " ".join(words[start:start + size]))
+                if match:
+                    found.append(match)
+                    start += size
+                    break
+            else:
+                start += 1
+        return found
+
+    def extract_skills(self, text):
+        """Split a free-text skill list into (canonical skills, unrecognised pieces)."""
+        skills, unrecognised = [], []
+        for piece in _LIST_SEPARATORS.split(text or ''):
+            piece = piece.strip()
+            if not piece:
+                continue
+            match = self.skill(piece)
+            matches = [match] if match else self._scan(self._skill_keys, piece, self._skill_words)
+            if matches:
+                skills.extend(matches)
+            else:
+                unrecognised.append(piece)
+        return list(dict.fromkeys(skills)), list(dict.fromkeys(unrecognised))
+
+    def role(self, text):
+        """Canonical role for a job title, tolerating extra words ("Senior Data Analyst at Acme") and typos.
+
+        Returns None rather than a guess when nothing in the title names a known role.
+        """
+        text = " ".join(_TITLE_ABBREVIATIONS.get(word.lower(), word) for word in (text or '').split())
+        match = self._lookup(self._role_keys, text) or self._close_role(normalize(text))
+        if match:
+            return match
+        found = self._scan(self._role_keys, text, self._role_words)
+        return found[0] if found else None
+
+    def _close_role(self, title):
+        """The role whose title matches word for word allowing small typos, or None.
+
+        Seniority words and short words must match exactly, so "junior developer"
+        never becomes "senior developer".
+        """
+        words = title.split()
+        best, best_score = None, 0.0
+        for candidate, role in self._role_titles.items():
+            candidate_words = candidate.split()
+            if len(candidate_words) != len(words):
+                continue
+            score = 0.0
+            for word, candidate_word in zip(words, candidate_words):
+                if word == candidate_word:
+                    score += 1.0
+                    continue
+                if (word in _SENIORITY or candidate_word in _SENIORITY
+                        or min(len(word), len(candidate_word)) <= _SHORT_ALIAS):
+                    break
+                ratio = difflib.SequenceMatcher(None, word, candidate_word).ratio()
+                if ratio < _WORD_CUTOFF:
+                    break
+                score += ratio
+            else:
+                if score > best_score:
+                    best, best_score = role, score
+        return best
+
+    def gap(self, current_skills, target_role):
+        """Matching, missing and adjacent skills for a role, or None if the role isn't in the taxonomy.
+
+        Adjacent skills are missing ones related to something the person already
+        knows, and so the quickest to pick up.
+        """
+        role = self.role(target_role)
+        if role is None:
+            return None
+        have, unrecognised = self.extract_skills(current_skills)
+        have_set = set(have)
+        profile = self.roles[role]
+        missing = [skill for skill in profile["required"] if skill not in have_set]
+        adjacent = []
+        for skill in missing + [s for s in profile["nice"] if s not in have_set]:
+            builds_on = [known for known in have if known in self.related[skill]]
+            if builds_on:
+                adjacent.append({"skill": skill, "builds_on": builds_on})
+        return {
+            "role": role,
+            "have": have,
+            "matching": [skill for skill in profile["required"] if skill in have_set],
+            "missing": missing,
+            "bonus": [skill for skill in profile["nice"] if skill in have_set],
+            "nice_to_have": [skill for skill in profile["nice"] if skill not in have_set],
+            "adjacent": adjacent,
+            "unrecognised": unrecognised,
+            "coverage": round(100 * (len(profile["required"]) - len(missing)) / len(profile["required"])),
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_skills_index():
+    """Return the process-wide SkillsIndex, loading the taxonomy file on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                with open(TAXONOMY_PATH, encoding="utf-8") as f:
+                    _index = SkillsIndex(json.load(f))
+    return _index
@@ -0,0 +1,165 @@
+"""Debounced background pre-enhancement of resume sections the user is still editing."""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.llm_metrics import get_metrics
+from core.rate_limiter import PRIORITY_SPECULATIVE
+from core.resume_enhancer import ENHANCE_PROMPTS, enhance_section
+
+
+def content_digest(field_name, content):
+    return hashlib.sha256(f"{field_name}\0{content}".encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    def __init__(self, digest):
+        self.digest = digest
+        self.timer = None
+        self.future = None
+
+
+class Speculator:
+    """Starts enhancing a section once its text has been stable for debounce seconds.
+
+    observe() is called with every new version of a section; take() is called
+    when the user actually clicks Enhance and returns the speculative result,
+    waiting for it if it is still in flight, or None if there is none for that
+    exact text. Each session may start at most session_limit speculations per
+    session_window seconds, and at most max_in_flight run at once process-wide.
+    Per-section and per-session bookkeeping is kept for the max_entries most
+    recently used keys only, so it doesn't grow with every visitor.
+    """
+
+    def __init__(self, enhance, debounce=2.0, session_limit=10, session_window=600.0,
+                 max_in_flight=4, max_entries=1000, metrics=None):
+        self.enhance = enhance
+        self.debounce = debounce
+        self.session_limit = session_limit
+        self.session_window = session_window
+        self.max_in_flight = max_in_flight
+        self.max_entries = max_entries
+        self.metrics = metrics
+        self.in_flight = 0
+        self.outcomes = {"started": 0, "capped": 0, "hit": 0, "attached": 0, "miss": 0, "wasted": 0}
+        self._entries = OrderedDict()  # (session_id, field) -> _Entry for the latest text seen
+        self._applied = OrderedDict()  # (session_id, field) -> digest of the last result the user applied
+        self._session_starts = OrderedDict()  # session_id -> start times within session_window
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+
+    def observe(self, session_id, field_name, content):
+        """Note the current text of a section, (re)starting its debounce timer if it changed."""
+        if field_name not in ENHANCE_PROMPTS or not content or not content.strip():
+            return
+        key = (session_id, field_name)
+        digest = content_digest(field_name, content)
+        with self._lock:
+            entry = self._entries.get(key)
+            # Unchanged text, or the enhanced text the user just applied: nothing new to speculate on
+            if (entry is not None and entry.digest == digest) or self._applied.get(key) == digest:
+                return
+            self._discard(entry)
+            entry = self._entries[key] = _Entry(digest)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._discard(evicted)
+            entry.timer = threading.Timer(self.debounce, self._start, (key, entry, content))
+            entry.timer.daemon = True
+            entry.timer.start()
+
+    def take(self, session_id, field_name, content):
+        """The speculative enhancement of exactly this text, or None to enhance it now."""
+        key = (session_id, field_name)
+        digest = content_digest(field_name, content)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.digest != digest or entry.future is None:
+                if entry is not None and entry.digest == digest:
+                    # Still debouncing; the caller enhances this text itself, so don't start it again
+                    entry.timer.cancel()
+                    del self._entries[key]
+                self._outcome("miss")
+                return None
+            del self._entries[key]
+            self._outcome("hit" if entry.future.done() else "attached")
+        result = entry.future.result()
+        if not result or result.startswith("Error:"):
+            return None
+        with self._lock:
+            self._applied[key] = content_digest(field_name, result)
+            self._applied.move_to_end(key)
+            self._bound(self._applied)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": self.in_flight, **self.outcomes}
+
+    def _start(self, key, entry, content):
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return
+            session_id = key[0]
+            now = time.monotonic()
+            starts = self._session_starts.setdefault(session_id, deque())
+            self._session_starts.move_to_end(session_id)
+            while starts and starts[0] < now - self.session_window:
+                starts.popleft()
+            if len(starts) >= self.session_limit or self.in_flight >= self.max_in_flight:
+                self._outcome("capped")
+                return
+            starts.append(now)
+            self._bound(self._session_starts)
+            self.in_flight += 1
+            self._outcome("started")
+            future = entry.future = self._executor.submit(self.enhance, key[1], content, PRIORITY_SPECULATIVE)
+        # Outside the lock: a future that is already done (a cache hit) runs the callback right here
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _bound(self, entries):
+        """Drop the least recently used keys beyond max_entries; call with the lock held."""
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _discard(self, entry):
+        """Drop an entry superseded by newer text; a speculation already started for it was wasted."""
+        if entry is None:
+            return
+        if entry.timer is not None:
+            entry.timer.cancel()
+        if entry.future is not None:
+            self._outcome("wasted")
+
+    def _outcome(self, outcome):
+        self.outcomes[outcome] += 1
+        if self.metrics is not None:
+            self.metrics.increment("llm_speculation_total", outcome=outcome)
+
+
+_speculator = None
+_speculator_lock = threading.Lock()
+
+
+def get_speculator():
+    """Return the process-wide Speculator used by the Resume Builder."""
+    global _speculator
+    if _speculator is None:
+        with _speculator_lock:
+            if _speculator is None:
+                _speculator = Speculator(
+                    enhance_section,
+                    debounce=float(os.getenv("SPECULATE_DEBOUNCE", "2")),
+                    session_limit=int(os.getenv("SPECULATE_SESSION_LIMIT", "10")),
+                    max_in_flight=int(os.getenv("SPECULATE_MAX_IN_FLIGHT", "4")),
+                    metrics=get_metrics(),
+                )
+    return _speculator
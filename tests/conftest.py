@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Let the tests import core whether pytest is run from the repo root or from tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
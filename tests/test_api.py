@@ -0,0 +1,214 @@
+import asyncio
+import json
+
+import pytest
+
+import core.api as api
+from core.groq_client import GroqError
+from core.rate_limiter import PRIORITY_CHAT, PRIORITY_INTERACTIVE
+
+
+class FakeClient:
+    """Stands in for GroqClient: echoes the prompt, or raises the error set on it."""
+
+    def __init__(self):
+        self.calls = []
+        self.error = None
+        self.fail_sites = ()
+
+    def chat(self, message, system_prompt=None, use_cache=True, priority=PRIORITY_INTERACTIVE, call_site="other",
+             **options):
+        self.calls.append({"message": message, "use_cache": use_cache, "priority": priority,
+                           "call_site": call_site})
+        if self.error is not None and (not self.fail_sites or call_site in self.fail_sites):
+            raise self.error
+        return "E:" + message.rsplit(": ", 1)[-1]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(api, "get_client", lambda: fake)
+    return fake
+
+
+def call(path, body, method="POST", **app_options):
+    """Send one request through the app, lifespan included; returns (status, headers, body bytes)."""
+    app = api.create_app(**app_options)
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            data = body if isinstance(body, bytes) else json.dumps(body).encode()
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": data, "more_body": False}
+
+            async def send(message):
+                messages.append(message)
+
+            scope = {"type": "http", "method": method, "path": path, "query_string": b"", "app": app,
+                     "headers": [(b"content-type", b"application/json")], "state": {}}
+            await app(scope, receive, send)
+            headers = {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+            return messages[0]["status"], headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+    return asyncio.run(run())
+
+
+def call_json(path, body, **app_options):
+    status, headers, data = call(path, body, **app_options)
+    return status, headers, json.loads(data)
+
+
+def test_enhance_returns_text_and_line_memory(client):
+    status, _, body = call_json("/v1/enhance", {"field": "experience", "content": "- shipped it"})
+    assert status == 200
+    assert body["enhanced"] == "E:- shipped it"
+    assert body["lines"]
+    assert [call["priority"] for call in client.calls] == [PRIORITY_INTERACTIVE]
+
+    status, _, again = call_json("/v1/enhance", {"field": "experience", "content": body["enhanced"],
+                                                 "lines": body["lines"]})
+    assert status == 200
+    assert again["enhanced"] == body["enhanced"]
+    assert len(client.calls) == 1
+
+
+@pytest.mark.parametrize("error, status", [
+    (GroqError("Rate limit exceeded. Please try again later.", 429), 429),
+    (GroqError("The AI service is having trouble right now.", 503), 503),
+])
+def test_enhance_passes_on_rate_limits_with_retry_after(client, error, status):
+    client.error = error
+    code, headers, body = call_json("/v1/enhance", {"field": "skills", "content": "Python"})
+    assert code == status
+    assert int(headers["retry-after"]) >= api.RETRY_AFTER
+    assert body["error"] == str(error)
+
+
+def test_enhance_timeout_is_504(client):
+    client.error = GroqError("Request timed out. Please try again.")
+    assert call_json("/v1/enhance", {"field": "skills", "content": "Python"})[0] == 504
+
+
+def test_enhance_all_reports_partial_failures(client):
+    client.error = GroqError("Rate limit exceeded. Please try again later.", 429)
+    client.fail_sites = ("enhance:skills",)
+    status, headers, body = call_json("/v1/enhance-all", {"sections": {"skills": "Python", "education": "BSc"}})
+    assert status == 200
+    assert body["results"] == {"education": "E:BSc"}
+    assert list(body["errors"]) == ["skills"]
+    assert "retry-after" in headers
+    assert {call["priority"] for call in client.calls} == {PRIORITY_INTERACTIVE}
+
+
+def test_enhance_all_with_nothing_enhanced_uses_the_error_status(client):
+    client.error = GroqError("The AI service is having trouble right now.", 503)
+    status, headers, _ = call_json("/v1/enhance-all", {"sections": {"skills": "Python", "education": "BSc"}})
+    assert status == 503
+    assert "retry-after" in headers
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/v1/enhance", b"not json"),
+    ("/v1/enhance", ["a list"]),
+    ("/v1/enhance", {"field": "experience"}),
+    ("/v1/enhance", {"field": "hobbies", "content": "chess"}),
+    ("/v1/enhance", {"field": "skills", "content": ["Python"]}),
+    ("/v1/enhance", {"field": "skills", "content": "Python", "lines": ["x"]}),
+    ("/v1/enhance-all", {"sections": {"skills": 1}}),
+    ("/v1/career-path", {"current_role": "Developer", "dream_role": "CTO", "experience_level": "forever"}),
+    ("/v1/review-report", {"overall_rating": 9, "achievements": "x"}),
+    ("/v1/review-report", {"overall_rating": 3}),
+    ("/v1/chat", {"message": "   "}),
+    ("/v1/pdf", {"name": "Ada", "skills": {"a": 1}}),
+])
+def test_bad_requests_are_400(client, path, body):
+    status, _, data = call_json(path, body)
+    assert status == 400
+    assert data["error"]
+    assert client.calls == []
+
+
+def test_review_report(client):
+    status, _, body = call_json("/v1/review-report", {"overall_rating": "4", "achievements": "Shipped the API"})
+    assert status == 200
+    assert body["text"].startswith("E:")
+    assert client.calls[0]["call_site"] == "review_report"
+
+
+def test_chat_is_uncached_at_chat_priority(client):
+    status, _, body = call_json("/v1/chat", {"message": "hello"})
+    assert status == 200
+    assert client.calls == [{"message": "hello", "use_cache": False, "priority": PRIORITY_CHAT, "call_site": "chat"}]
+
+
+def test_full_llm_pool_sheds_load(client):
+    status, headers, _ = call_json("/v1/chat", {"message": "hello"}, llm_queue=0)
+    assert status == 503
+    assert headers["retry-after"] == str(api.RETRY_AFTER)
+    assert client.calls == []
+
+
+def test_pdf(client):
+    status, headers, body = call("/v1/pdf", {"name": "Zhang \"Wei\" 张伟", "skills": "Python"}, pdf_workers=1)
+    assert status == 200
+    assert headers["content-type"] == "application/pdf"
+    assert body.startswith(b"%PDF")
+    disposition = headers["content-disposition"]
+    assert 'filename="Zhang_Wei_Resume.pdf"' in disposition
+    assert "filename*=UTF-8''" in disposition and '"Wei"' not in disposition
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Ada Lovelace", 'filename="Ada_Lovelace_Resume.pdf"'),
+    ("张伟", 'filename="resume_Resume.pdf"'),
+    ("a\r\nX-Injected: 1", 'filename="a_X-Injected_1_Resume.pdf"'),
+])
+def test_content_disposition(name, expected):
+    header = api.content_disposition(name)
+    assert expected in header
+    assert "\r" not in header and "\n" not in header
+
+
+def test_healthz_and_metrics(client):
+    status, _, body = call_json("/healthz", b"", method="GET")
+    assert status == 200 and body["status"] == "ok"
+    status, headers, _ = call("/metrics", b"", method="GET")
+    assert status == 200 and headers["content-type"].startswith("text/plain")
+
+
+@pytest.mark.parametrize("current, dream", [("Software Developer", "Technical Lead"), ("Chef", "Technical Lead"),
+                                            ("Developer", "Software Developer")])
+def test_career_path_without_explain_makes_no_llm_call(client, current, dream):
+    status, _, body = call_json("/v1/career-path", {"current_role": current, "dream_role": dream, "explain": False})
+    assert status == 200
+    assert set(body) == {"current_role", "dream_role", "paths"}
+    assert client.calls == []
+
+
+def test_career_path_has_one_shape(client):
+    _, _, found = call_json("/v1/career-path", {"current_role": "Fronted Dev", "dream_role": "Tech Lead"})
+    _, _, unknown = call_json("/v1/career-path", {"current_role": "Chef", "dream_role": "Tech Lead"})
+    assert set(found) == set(unknown) == {"current_role", "dream_role", "paths", "text"}
+    assert found["current_role"] == "Frontend Developer" and found["paths"]
+    assert unknown["current_role"] is None and unknown["paths"] == []
+    assert [call["call_site"] for call in client.calls] == ["career_path", "career_path"]
+
+
+@pytest.mark.parametrize("target, known", [("Data Scientist", True), ("Astronaut", False)])
+def test_skills_gap_without_explain_makes_no_llm_call(client, target, known):
+    status, _, body = call_json("/v1/skills-gap", {"current_skills": "Python, SQL", "target_role": target,
+                                                   "explain": False})
+    assert status == 200
+    assert (body["gap"] is not None) == known
+    assert client.calls == []
+
+
+def test_skills_gap_explains_known_and_unknown_roles(client):
+    _, _, known = call_json("/v1/skills-gap", {"current_skills": "Python, SQL", "target_role": "Data Scientist"})
+    _, _, unknown = call_json("/v1/skills-gap", {"current_skills": "Python, SQL", "target_role": "Astronaut"})
+    assert known["gap"]["role"] == "Data Scientist" and known["text"]
+    assert unknown["gap"] is None and unknown["text"]
+    assert [call["call_site"] for call in client.calls] == ["skills_gap", "skills_gap"]
@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.batch_resumes import bounded_map, iter_records, pdf_file_name, run_batch
+
+
+def write_jsonl(path, lines):
+    path.write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n",
+                    encoding="utf-8")
+    return str(path)
+
+
+def test_bad_rows_are_per_record_failures(tmp_path):
+    source = write_jsonl(tmp_path / "resumes.jsonl", [
+        {"name": "Ada Lovelace", "skills": "Python"},
+        "{not json",
+        ["a", "list"],
+        '"a bare string"',
+        {"email": "no-name@example.com"},
+        {"name": 42},
+        {"name": "Grace Hopper", "experience": "- COBOL"},
+    ])
+    output = str(tmp_path / "out.zip")
+    summary = run_batch(source, output, workers=1)
+    assert summary["rendered"] == 2
+    errors = {failure["index"]: failure["error"] for failure in summary["failures"]}
+    assert sorted(errors) == [2, 3, 4, 5, 6]
+    assert errors[2].startswith("Invalid JSON")
+    assert errors[3] == "Expected a JSON object, got list"
+    assert errors[4] == "Expected a JSON object, got str"
+    assert errors[5] == errors[6] == "Missing name"
+
+    with zipfile.ZipFile(output) as archive:
+        names = archive.namelist()
+        assert sorted(names) == ["00001_Ada_Lovelace_Resume.pdf", "00007_Grace_Hopper_Resume.pdf", "report.json"]
+        assert archive.read(names[0]).startswith(b"%PDF")
+        assert json.loads(archive.read("report.json"))["failed"] == 5
+
+
+def test_csv_input(tmp_path):
+    source = tmp_path / "resumes.csv"
+    source.write_text("name,skills\nAda,Python\n,SQL\n", encoding="utf-8")
+    assert [record for _, record in iter_records(str(source))] == [{"name": "Ada", "skills": "Python"},
+                                                                   {"name": "", "skills": "SQL"}]
+    summary = run_batch(str(source), str(tmp_path / "out.zip"), workers=1)
+    assert (summary["rendered"], summary["failed"]) == (1, 1)
+
+
+@pytest.mark.parametrize("name, file_name", [
+    ("Ada Lovelace", "00003_Ada_Lovelace_Resume.pdf"),
+    ("../../etc/passwd", "00003_.._.._etc_passwd_Resume.pdf"),
+    ("", "00003_resume_Resume.pdf"),
+])
+def test_pdf_file_name(name, file_name):
+    assert pdf_file_name(3, {"name": name}) == file_name
+    assert "/" not in pdf_file_name(3, {"name": name})
+
+
+def test_bounded_map_keeps_at_most_window_in_flight():
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def task(record):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return record * 2
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = {index: future.result()
+                   for index, _, future in bounded_map(executor, task, ((i, i) for i in range(20)), window=3)}
+    assert results == {i: i * 2 for i in range(20)}
+    assert peak[0] <= 3
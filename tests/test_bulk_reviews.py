@@ -0,0 +1,123 @@
+import csv
+import io
+import os
+import stat
+import zipfile
+
+import pytest
+
+import core.app_data as app_data
+import core.bulk_reviews as bulk_reviews
+from core.bulk_reviews import (ReviewCheckpoint, build_archive, checkpoint_path_for, read_reviews,
+                               review_key, run_bulk_reviews)
+
+HEADER = "Employee,Rating,Achievements,Improvements,Goals,Manager's Comments,Recommendations\n"
+
+
+class FakeLLM:
+    """Stands in for chat_with_groq: prompts mentioning a failing word get an "Error:" reply."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.prompts = []
+
+    def __call__(self, prompt, *args, **kwargs):
+        self.prompts.append(prompt)
+        if any(word in prompt for word in self.failing):
+            return "Error: Rate limit exceeded. Please try again later."
+        return f"Report #{len(self.prompts)}"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(bulk_reviews, "chat_with_groq", fake)
+    return fake
+
+
+def write_csv(path, rows):
+    path.write_text(HEADER + "".join(rows), encoding="utf-8")
+    return str(path)
+
+
+def test_rows_are_normalised_and_validated():
+    rows = list(read_reviews(io.StringIO(HEADER + "Ada,5,Shipped the engine,,,Great,\n"
+                                                  "Bob,9,Shipped,,,,\n"
+                                                  "Cy,,,,,,\n")))
+    (_, ada), (_, bob), (_, cy) = rows
+    assert ada["name"] == "Ada" and ada["overall_rating"] == 5
+    assert ada["manager_comments"] == "Great" and "_error" not in ada
+    assert bob["_error"] == "overall_rating must be a number from 1 to 5, got 9"
+    assert cy["overall_rating"] == 3
+    assert cy["_error"].startswith("Fill in at least one")
+    assert [index for index, _ in rows] == [1, 2, 3]
+
+
+def test_rerun_resumes_from_the_checkpoint(tmp_path, llm):
+    source = write_csv(tmp_path / "reviews.csv", ["Ada,4,Shipped the engine,,,,\n",
+                                                  "Bob,3,Fixed the build,,,,\n",
+                                                  "Cy,2,Wrote the flaky docs,,,,\n"])
+    output = str(tmp_path / "reviews.zip")
+    llm.failing = {"flaky"}
+    summary = run_bulk_reviews(source, output, concurrency=2)
+    assert (summary["generated"], summary["resumed"], summary["failed"]) == (2, 0, 1)
+    assert summary["failures"][0]["index"] == 3
+    checkpoint = output + ".checkpoint.jsonl"
+    assert len(ReviewCheckpoint(checkpoint).done) == 2
+
+    llm.failing = set()
+    llm.prompts.clear()
+    summary = run_bulk_reviews(source, output, concurrency=2)
+    assert (summary["generated"], summary["resumed"], summary["failed"]) == (1, 2, 0)
+    assert len(llm.prompts) == 1 and "flaky" in llm.prompts[0]
+    assert not os.path.exists(checkpoint)
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == ["00001_Ada_Review.md", "00002_Bob_Review.md", "00003_Cy_Review.md",
+                                              "summary.csv"]
+
+
+def test_edited_rows_are_generated_again(tmp_path, llm):
+    checkpoint = ReviewCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+    (_, record), = read_reviews(io.StringIO(HEADER + "Ada,4,Shipped the engine,,,,\n"))
+    checkpoint.save(review_key(record), "Old report")
+    edited = dict(record, achievements="Shipped the engine and the compiler")
+    results = list(bulk_reviews.generate_reviews([(1, record), (2, edited)], checkpoint=checkpoint))
+    assert results[0] == {"index": 1, "name": "Ada", "resumed": True, "report": "Old report"}
+    assert results[1]["resumed"] is False and results[1]["report"] != "Old report"
+    assert len(llm.prompts) == 1
+
+
+def test_checkpoint_skips_a_line_cut_short_and_is_private(tmp_path):
+    path = str(tmp_path / "reviews" / "checkpoint.jsonl")
+    checkpoint = ReviewCheckpoint(path)
+    checkpoint.save("a", "Report A")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "b", "rep')
+    assert ReviewCheckpoint(path).done == {"a": "Report A"}
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    checkpoint.remove()
+    checkpoint.remove()
+    assert not os.path.exists(path)
+
+
+def test_checkpoint_path_is_per_upload_in_the_private_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_data, "APP_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(bulk_reviews, "BULK_REVIEW_DIR", None)
+    first = checkpoint_path_for(b"name\nAda\n")
+    assert first == checkpoint_path_for(b"name\nAda\n") != checkpoint_path_for(b"name\nBob\n")
+    assert os.path.dirname(first) == str(tmp_path / "data" / "reviews")
+    assert stat.S_IMODE(os.stat(tmp_path / "data").st_mode) == 0o700
+
+
+def test_archive_lists_every_row_in_order():
+    data = build_archive([
+        {"index": 2, "name": "", "resumed": False, "error": "Fill in at least one of achievements"},
+        {"index": 1, "name": "Ada L/ovelace", "resumed": False, "report": "  Great year.\n"},
+    ])
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.read("00001_Ada_L_ovelace_Review.md").decode() == \
+            "# Performance Review: Ada L/ovelace\n\nGreat year.\n"
+        summary = list(csv.reader(io.StringIO(archive.read("summary.csv").decode())))
+    assert summary == [["index", "name", "status", "file", "error"],
+                       ["1", "Ada L/ovelace", "ok", "00001_Ada_L_ovelace_Review.md", ""],
+                       ["2", "", "failed", "", "Fill in at least one of achievements"]]
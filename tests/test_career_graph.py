@@ -0,0 +1,72 @@
+import pytest
+
+from core.career_graph import CareerGraph, career_paths, get_career_graph
+from core.skills_index import get_skills_index
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return get_career_graph()
+
+
+def small_graph():
+    index = get_skills_index()
+    return CareerGraph([("Software Developer", "Senior Software Engineer", 30),
+                        ("Senior Software Engineer", "Technical Lead", 18),
+                        ("Software Developer", "Technical Lead", 60),
+                        ("Software Developer", "DevOps Engineer", 12),
+                        ("DevOps Engineer", "Technical Lead", 24)], index)
+
+
+def test_k_best_paths_are_loop_free_and_cheapest_first():
+    graph = small_graph()
+    paths = graph.k_best_paths("Software Developer", "Technical Lead", pace=1.0, k=3)
+    routes = [path for _, path in paths]
+    assert len(routes) == 3
+    assert len({tuple(route) for route in routes}) == 3
+    assert all(len(route) == len(set(route)) for route in routes)
+    costs = [cost for cost, _ in paths]
+    assert costs == sorted(costs)
+    assert costs[0] == pytest.approx(graph.shortest_path("Software Developer", "Technical Lead", 1.0)[0])
+
+
+def test_skill_gaps_make_moves_costlier():
+    graph = small_graph()
+    months = graph.edges["Software Developer"]["DevOps Engineer"]
+    gap = graph.new_skills[("Software Developer", "DevOps Engineer")]
+    assert graph.cost("Software Developer", "DevOps Engineer", 1.0) == months + 2 * len(gap)
+
+
+def test_no_path_between_unconnected_roles():
+    assert small_graph().shortest_path("Technical Lead", "Software Developer", 1.0) is None
+
+
+def test_describe_scales_months_with_pace(graph):
+    result = career_paths("Software Developer", "Technical Lead", "2-5 years")
+    slower = career_paths("Software Developer", "Technical Lead", "0-1 years")
+    assert result["paths"][0]["roles"][0] == "Software Developer"
+    assert result["paths"][0]["roles"][-1] == "Technical Lead"
+    assert slower["paths"][0]["total_months"] >= result["paths"][0]["total_months"]
+    step = result["paths"][0]["steps"][0]
+    assert set(step) == {"role", "months", "new_skills"}
+
+
+def test_titles_are_resolved_and_reported():
+    result = career_paths("Fronted Dev", "Data Scientist", "2-5 years")
+    assert result["current_role"] == "Frontend Developer"
+    assert result["paths"]
+
+
+@pytest.mark.parametrize("current, dream, resolved", [
+    ("Chef", "Technical Lead", (None, "Technical Lead")),
+    ("Developer", "Software Engineer", ("Software Developer", "Software Developer")),
+])
+def test_unknown_or_same_role_has_no_paths(current, dream, resolved):
+    result = career_paths(current, dream, "2-5 years")
+    assert (result["current_role"], result["dream_role"]) == resolved
+    assert result["paths"] == []
+
+
+def test_every_graph_role_is_in_the_taxonomy(graph):
+    roles = set(get_skills_index().roles)
+    assert all(source in roles and set(targets) <= roles for source, targets in graph.edges.items())
@@ -0,0 +1,78 @@
+from core.chat_context import build_chat_context, new_chat_memory
+
+# 39 characters estimate to 10 tokens, so each (user, bot) turn costs 20
+SYSTEM = "s" * 39
+MESSAGE = "m" * 39
+
+
+def turns(count, start=0):
+    return [(f"u{i:02d}".ljust(39, "."), f"b{i:02d}".ljust(39, ".")) for i in range(start, start + count)]
+
+
+class Summarizer:
+    def __init__(self, reply="SUM"):
+        self.reply = reply
+        self.calls = []
+
+    def __call__(self, summary, folded):
+        self.calls.append((summary, list(folded)))
+        return self.reply
+
+
+def test_history_that_fits_is_sent_verbatim():
+    history = turns(3)
+    summarize = Summarizer()
+    context = build_chat_context(history, MESSAGE, SYSTEM, new_chat_memory(), token_budget=100, summarize=summarize)
+    assert [m["content"] for m in context] == [text for turn in history for text in turn]
+    assert [m["role"] for m in context[:2]] == ["user", "assistant"]
+    assert summarize.calls == []
+
+
+def test_overflowing_turns_are_folded_into_the_summary_in_a_batch():
+    history = turns(12)
+    memory = new_chat_memory()
+    summarize = Summarizer()
+    # 20 tokens of system prompt and message leave room for 9 turns, so 3 overflow plus a batch of 4
+    context = build_chat_context(history, MESSAGE, SYSTEM, memory, token_budget=200, summarize=summarize)
+    assert summarize.calls == [("", history[:7])]
+    assert memory == {"summary": "SUM", "summarized_turns": 7}
+    assert context[0] == {"role": "system", "content": "Summary of the earlier conversation: SUM"}
+    assert [m["content"] for m in context[1:]] == [text for turn in history[7:] for text in turn]
+
+
+def test_summary_is_not_recomputed_until_the_batch_is_used_up():
+    history = turns(12)
+    memory = new_chat_memory()
+    summarize = Summarizer()
+    build_chat_context(history, MESSAGE, SYSTEM, memory, token_budget=200, summarize=summarize)
+    for i in range(12, 15):
+        history.append(turns(1, start=i)[0])
+        build_chat_context(history, MESSAGE, SYSTEM, memory, token_budget=200, summarize=summarize)
+    assert len(summarize.calls) == 1
+
+    history.extend(turns(2, start=15))
+    build_chat_context(history, MESSAGE, SYSTEM, memory, token_budget=200, summarize=summarize)
+    assert summarize.calls[1][0] == "SUM"
+    assert summarize.calls[1][1][0] == history[7]
+    assert memory["summarized_turns"] > 7
+
+
+def test_failed_summary_keeps_memory_and_drops_only_the_oldest_turns():
+    history = turns(12)
+    memory = new_chat_memory()
+    summarize = Summarizer("Error: rate limited")
+    context = build_chat_context(history, MESSAGE, SYSTEM, memory, token_budget=200, summarize=summarize)
+    assert memory == new_chat_memory()
+    assert len(summarize.calls) == 1
+    assert [m["content"] for m in context] == [text for turn in history[3:] for text in turn]
+
+
+def test_summary_counts_against_the_budget():
+    memory = {"summary": "x" * 79, "summarized_turns": 0}
+    history = turns(4)
+    summarize = Summarizer("y" * 79)
+    # 20 tokens of summary leave 60 for turns, so the oldest is folded with the whole batch
+    context = build_chat_context(history, MESSAGE, SYSTEM, memory, token_budget=100, summarize=summarize)
+    assert summarize.calls == [("x" * 79, history)]
+    assert memory["summarized_turns"] == 4
+    assert len(context) == 1
@@ -0,0 +1,61 @@
+import time
+
+from core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def fail(breaker, count):
+    for _ in range(count):
+        assert breaker.allow()
+        breaker.record(False)
+
+
+def test_opens_once_error_rate_is_exceeded():
+    breaker = CircuitBreaker(error_rate=0.5, min_calls=4, open_seconds=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(True)
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+    fail(breaker, 1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.retry_in() > 0
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(min_calls=2, slow_call=1.0)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(True, latency=5.0)
+    assert breaker.state == OPEN
+
+
+def test_abandoned_calls_are_not_counted():
+    breaker = CircuitBreaker(min_calls=2)
+    for _ in range(5):
+        assert breaker.allow()
+        breaker.record(None)
+    assert breaker.stats()["window_calls"] == 0
+
+
+def test_half_open_probe_success_closes():
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0.01)
+    fail(breaker, 1)
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only half_open_probes calls are let through at a time
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0.01)
+    fail(breaker, 1)
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert [t["to"] for t in breaker.stats()["transitions"]] == [OPEN, HALF_OPEN, OPEN]
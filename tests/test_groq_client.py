@@ -0,0 +1,301 @@
+import io
+import threading
+import time
+
+import pytest
+import requests
+
+import core.groq_client as groq_client
+from benchmarks.mock_groq_server import MockConfig, MockGroqServer
+from core.call_policy import FAST_MODEL, QUALITY_MODEL, HedgeBudget
+from core.groq_client import GroqClient, GroqError
+from core.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def server():
+    with MockGroqServer(MockConfig(latency="fixed:0", token_delay=0, reply_words=5)) as server:
+        yield server
+
+
+def make_client(server=None, **kwargs):
+    """A client with no cache, limiter, breaker or hedging unless a test asks for one."""
+    kwargs.setdefault("backoff_base", 0.01)
+    return GroqClient(api_key="test", url=server.url if server else "http://127.0.0.1:9/none", **kwargs)
+
+
+class FakePost:
+    """Replaces GroqClient.post: fails with the error set for a model, otherwise answers."""
+
+    def __init__(self, errors, delay=0.0):
+        self.errors = errors
+        self.delay = delay
+        self.models = []
+
+    def __call__(self, payload, priority=None, info=None, deadline=None):
+        self.models.append(payload["model"])
+        time.sleep(self.delay)
+        error = self.errors.get(payload["model"])
+        if error is not None:
+            raise error
+        return Reply(payload["model"])
+
+
+class Reply:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.text}}]}
+
+    def close(self):
+        pass
+
+
+def test_upstream_unavailable_falls_back_to_the_next_model():
+    client = make_client()
+    client.post = FakePost({FAST_MODEL: GroqError("HTTP 503", 503)})
+    assert client.chat("hi", call_site="chat") == QUALITY_MODEL
+    assert client.post.models == [FAST_MODEL, QUALITY_MODEL]
+
+
+def test_bad_request_does_not_fall_back():
+    client = make_client()
+    client.post = FakePost({FAST_MODEL: GroqError("HTTP 400", 400)})
+    with pytest.raises(GroqError):
+        client.chat("hi", call_site="chat")
+    assert client.post.models == [FAST_MODEL]
+
+
+def test_no_fallback_once_the_deadline_has_passed(monkeypatch):
+    monkeypatch.setattr(groq_client, "policy_for", lambda call_site: {"deadline": 0.05, "hedge": False})
+    client = make_client()
+    client.post = FakePost({FAST_MODEL: GroqError("HTTP 503", 503)}, delay=0.1)
+    with pytest.raises(GroqError):
+        client.chat("hi", call_site="chat")
+    assert client.post.models == [FAST_MODEL]
+
+
+def test_local_rate_limit_timeout_does_not_fall_back(server):
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=100000, max_wait=0.05)
+    limiter.requests.tokens = 0
+    waits = []
+    acquire = limiter.acquire
+    limiter.acquire = lambda *args, **kwargs: waits.append(1) or acquire(*args, **kwargs)
+    client = make_client(server, rate_limiter=limiter)
+    with pytest.raises(GroqError) as error:
+        client.chat("hi", call_site="chat")
+    assert error.value.status_code == 429
+    # One wait for the first model, and no second model queued behind it
+    assert len(waits) == 1
+    assert server.counters == {}
+
+
+def test_explicit_model_has_no_fallbacks():
+    client = make_client()
+    client.post = FakePost({"my-model": GroqError("HTTP 503", 503)})
+    with pytest.raises(GroqError):
+        client.chat("hi", call_site="chat", model="my-model")
+    assert client.post.models == ["my-model"]
+
+
+class FlakyServer(MockGroqServer):
+    """Answers the first `failures` requests with a 5xx, then recovers."""
+
+    def __init__(self, failures):
+        super().__init__(MockConfig(latency="fixed:0", token_delay=0, reply_words=5, error_5xx=1.0))
+        self.failures = failures
+
+    def count(self, name):
+        super().count(name)
+        if name == "injected_5xx" and self.counters[name] >= self.failures:
+            self.config.error_5xx = 0.0
+
+
+def test_transient_errors_are_retried():
+    with FlakyServer(failures=2) as server:
+        client = make_client(server, max_retries=3)
+        assert client.chat("hello world", call_site="other")
+        assert server.counters["requests"] == 3
+
+
+def test_gives_up_after_max_retries():
+    with FlakyServer(failures=100) as server:
+        client = make_client(server, max_retries=2)
+        with pytest.raises(GroqError) as error:
+            client.chat("hi", call_site="other", model="only-model")
+        assert error.value.status_code in (500, 502, 503)
+        assert server.counters["requests"] == 3
+
+
+def test_distant_retry_after_is_not_waited_for(server):
+    server.config.error_429 = 1.0  # answered with Retry-After: 1
+    client = make_client(server, max_retries=3, max_retry_after=0.5)
+    started = time.monotonic()
+    with pytest.raises(GroqError) as error:
+        client.chat("hi", call_site="other", model="only-model")
+    assert error.value.status_code == 429
+    assert server.counters["requests"] == 1
+    assert time.monotonic() - started < 0.5
+
+
+def test_bad_api_key_is_not_retried(monkeypatch):
+    sent = []
+
+    def unauthorized(url, **kwargs):
+        sent.append(kwargs["json"]["model"])
+        response = requests.models.Response()
+        response.status_code = 401
+        response.raw = io.BytesIO(b'{"error": {"message": "Invalid API Key"}}')
+        return response
+
+    client = make_client(max_retries=3)
+    monkeypatch.setattr(client.session, "post", unauthorized)
+    with pytest.raises(GroqError, match="GROQ_API_KEY") as error:
+        client.chat("hi", call_site="chat")
+    assert error.value.status_code == 401
+    assert sent == [FAST_MODEL]
+
+
+def test_missing_api_key(monkeypatch, server):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    client = GroqClient(url=server.url)
+    with pytest.raises(GroqError, match="GROQ_API_KEY"):
+        client.chat("hi")
+    assert server.counters == {}
+
+
+@pytest.mark.parametrize("value, seconds", [("3", 3.0), ("0.5", 0.5), ("-2", 0.0), ("", None), ("soon", None)])
+def test_parse_retry_after(value, seconds):
+    assert groq_client.parse_retry_after(value) == seconds
+
+
+def test_connections_are_reused(server):
+    client = make_client(server)
+    for i in range(5):
+        client.chat(f"message {i}", call_site="other")
+    adapter = client.session.get_adapter(server.url)
+    assert len(adapter.poolmanager.pools) == 1
+
+
+class DictCache(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+class Lines:
+    def __init__(self, *lines):
+        self.lines = lines
+
+    def iter_lines(self, chunk_size=None):
+        return iter(self.lines)
+
+
+def test_sse_events_are_split_on_blank_lines():
+    response = Lines(b"data: one", b"", b": keep-alive", b"", b"data: two", b"data: lines", b"", b"data: [DONE]")
+    assert list(groq_client.iter_sse_data(response)) == ["one", "two\nlines", "[DONE]"]
+
+
+def test_stream_yields_the_reply_piece_by_piece(server):
+    client = make_client(server)
+    pieces = list(client.stream_chat("hello world", call_site="other"))
+    assert len(pieces) == 5
+    assert "".join(pieces) == "hello world hello world hello"
+
+
+def test_complete_stream_is_cached(server):
+    client = make_client(server, cache=DictCache())
+    reply = "".join(client.stream_chat("hello world", call_site="other"))
+    assert list(client.cache.values()) == [reply]
+    assert list(client.stream_chat("hello world", call_site="other")) == [reply]
+    assert server.counters["requests"] == 1
+
+
+def test_abandoned_stream_is_not_cached(server):
+    client = make_client(server, cache=DictCache())
+    stream = client.stream_chat("hello world", call_site="other")
+    next(stream)
+    stream.close()
+    assert client.cache == {}
+
+
+def test_malformed_event_fails_the_stream_uncached(monkeypatch):
+    client = make_client(cache=DictCache())
+
+    def post(payload, priority=None, info=None, deadline=None):
+        response = requests.models.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(b'data: {"choices": [{"delta": {"content": "Hi"}}]}\n\ndata: {oops\n\n')
+        return response
+
+    monkeypatch.setattr(client, "post", post)
+    stream = client.stream_chat("hello", call_site="other")
+    assert next(stream) == "Hi"
+    with pytest.raises(GroqError, match="Invalid response"):
+        next(stream)
+    assert client.cache == {}
+
+
+class RacePost:
+    """Replaces GroqClient.post: the nth call sleeps delays[n], then answers "attempt <n>"."""
+
+    def __init__(self, *delays):
+        self.delays = delays
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, payload, priority=None, info=None, deadline=None):
+        with self.lock:
+            n = self.calls
+            self.calls += 1
+        time.sleep(self.delays[n])
+        return Reply(f"attempt {n}")
+
+
+@pytest.fixture
+def hedged(monkeypatch):
+    monkeypatch.setattr(groq_client, "hedge_delay", lambda metrics, call_site: 0.05)
+    return make_client(hedge_budget=HedgeBudget(ratio=1.0))
+
+
+def test_hedge_budget_caps_hedges_at_a_fraction_of_requests():
+    budget = HedgeBudget(ratio=0.5, max_tokens=2.0)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    for _ in range(10):
+        budget.record_request()
+    assert budget.tokens == 2.0
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+    assert budget.stats() == {"hedges": 3, "denied": 2, "tokens": 0.0}
+
+
+def test_slow_first_attempt_is_hedged(hedged):
+    hedged.post = RacePost(1.0, 0.0)
+    started = time.monotonic()
+    assert hedged.chat("hi", call_site="chat") == "attempt 1"
+    assert time.monotonic() - started < 0.5
+    assert hedged.hedge_budget.hedges == 1
+
+
+def test_fast_first_attempt_is_not_hedged(hedged):
+    hedged.post = RacePost(0.0, 0.0)
+    assert hedged.chat("hi", call_site="chat") == "attempt 0"
+    assert hedged.post.calls == 1
+
+
+def test_no_hedge_without_budget(hedged):
+    hedged.hedge_budget = HedgeBudget(ratio=0.0)
+    hedged.hedge_budget.tokens = 0.0
+    hedged.post = RacePost(0.2, 0.0)
+    assert hedged.chat("hi", call_site="chat") == "attempt 0"
+    assert hedged.post.calls == 1
+    assert hedged.hedge_budget.denied == 1
+
+
+def test_call_sites_without_hedging_are_not_raced(hedged):
+    hedged.post = RacePost(0.2, 0.0)
+    assert hedged.chat("hi", call_site="enhance") == "attempt 0"
+    assert hedged.post.calls == 1
@@ -0,0 +1,94 @@
+import json
+import threading
+
+import pytest
+
+import core.job_matching as job_matching
+from core.job_matching import JobIndex, tokenize
+
+POSTINGS = [
+    {"title": "Data Scientist", "company": "Acme", "description": "Build machine learning models in Python and SQL",
+     "skills": ["python", "pandas", "scikit-learn"]},
+    {"title": "Frontend Developer", "company": "Globex", "description": "React and TypeScript single page apps"},
+    {"title": "Pastry Chef", "company": "Bakery", "description": "Laminated doughs and plated desserts"},
+]
+RESUME = {"skills": "Python, pandas, scikit-learn, SQL", "experience": "Built machine learning models"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = JobIndex(str(tmp_path / "jobs"))
+    index.add(POSTINGS[:2])
+    index.add(POSTINGS[2:])
+    return index
+
+
+def test_tokenize_keeps_languages_whole_and_drops_stop_words():
+    assert tokenize("C++, C# and Node.js with the team") == ["c++", "c#", "node.js"]
+
+
+def test_search_ranks_the_best_fit_first(index):
+    matches = index.search(RESUME, k=3)
+    assert matches[0]["posting"]["title"] == "Data Scientist"
+    assert "python" in matches[0]["overlap"]["skills"]
+    assert all(match["posting"]["title"] != "Pastry Chef" for match in matches)
+    assert [m["score"] for m in matches] == sorted((m["score"] for m in matches), reverse=True)
+
+
+def test_empty_resume_has_no_matches(index):
+    assert index.search({}, k=3) == []
+
+
+def test_compact_merges_segments_without_changing_results(index):
+    before = index.search(RESUME, k=3)
+    assert index.stats() == {"postings": 3, "segments": 2}
+    index.compact()
+    assert index.stats() == {"postings": 3, "segments": 1}
+    assert index.search(RESUME, k=3) == before
+
+
+def test_reopened_index_sees_all_postings(index):
+    reopened = JobIndex(index.path)
+    assert reopened.stats() == index.stats()
+    assert reopened.search(RESUME, k=1)[0]["posting"] == POSTINGS[0]
+
+
+def test_failed_segment_write_leaves_no_orphan_records(index, monkeypatch):
+    postings_path = f"{index.path}/postings.jsonl"
+    with open(postings_path, "rb") as f:
+        before = f.read()
+
+    def fail(path, docs, offsets):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(job_matching._Segment, "write", staticmethod(fail))
+    with pytest.raises(OSError):
+        index.add([{"title": "Orphan", "description": "never indexed"}])
+    with open(postings_path, "rb") as f:
+        assert f.read() == before
+    monkeypatch.undo()
+
+    index.compact()
+    assert index.stats()["postings"] == 3
+    assert [json.loads(line)["title"] for line in before.decode().splitlines()] == [p["title"] for p in POSTINGS]
+
+
+def test_search_during_adds_sees_a_consistent_index(index):
+    errors = []
+
+    def search():
+        try:
+            for _ in range(20):
+                assert index.search(RESUME, k=3)[0]["posting"]["title"] == "Data Scientist"
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(5):
+        index.add([{"title": f"Baker {i}", "description": "bread"}])
+    for thread in threads:
+        thread.join(10)
+    assert errors == []
+    assert index.stats()["postings"] == 8
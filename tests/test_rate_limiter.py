@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from core.rate_limiter import (PRIORITY_BULK, PRIORITY_CHAT, RateLimiter, RateLimitTimeout, estimate_tokens,
+                               parse_duration)
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("2m59.56s", 179.56), ("7.66s", 7.66), ("250ms", 0.25), ("1h", 3600), ("12", 12), ("", None), ("soon", None),
+])
+def test_parse_duration(value, seconds):
+    if seconds is None:
+        assert parse_duration(value) is None
+    else:
+        assert parse_duration(value) == pytest.approx(seconds)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("x" * 400) == 101
+
+
+def test_acquire_within_budget_does_not_wait():
+    limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000)
+    assert limiter.acquire(100) < 0.05
+    stats = limiter.stats()
+    assert stats["remaining_requests"] == 9
+    assert stats["remaining_tokens"] == 900
+
+
+def test_acquire_times_out_when_budget_is_gone():
+    limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=1000, max_wait=0.1)
+    limiter.acquire(1)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(1)
+    assert limiter.stats()["timeouts"] == 1
+
+
+def test_headers_resync_the_buckets():
+    limiter = RateLimiter(requests_per_minute=30, tokens_per_minute=6000)
+    limiter.update_from_headers({
+        "x-ratelimit-limit-requests": "14400", "x-ratelimit-remaining-requests": "14000",
+        "x-ratelimit-reset-requests": "2m", "x-ratelimit-limit-tokens": "18000",
+        "x-ratelimit-remaining-tokens": "500", "x-ratelimit-reset-tokens": "7.5s",
+    })
+    stats = limiter.stats()
+    assert stats["remaining_requests"] == 14000
+    assert 500 <= stats["remaining_tokens"] < 600
+
+
+def test_higher_priority_is_served_first():
+    # Two requests a second, so the second waiter queues well before the first is admitted
+    limiter = RateLimiter(requests_per_minute=120, tokens_per_minute=100000)
+    limiter.requests.tokens = 0
+    order = []
+
+    def wait(priority, name):
+        limiter.acquire(1, priority=priority)
+        order.append(name)
+
+    bulk = threading.Thread(target=wait, args=(PRIORITY_BULK, "bulk"))
+    bulk.start()
+    while limiter.stats()["queue_depth"] < 1:
+        time.sleep(0.001)
+    chat = threading.Thread(target=wait, args=(PRIORITY_CHAT, "chat"))
+    chat.start()
+    for thread in (bulk, chat):
+        thread.join(5)
+    assert order == ["chat", "bulk"]
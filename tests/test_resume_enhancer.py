@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+import core.resume_enhancer as resume_enhancer
+from core.rate_limiter import PRIORITY_INTERACTIVE
+from core.resume_enhancer import ENHANCE_PROMPTS, enhance_changed_lines, line_key, record_enhancement
+
+SECTION = "\n".join(["Acme Corp - Engineer, 2020-2024"] +
+                    [f"- built feature {i} with Python and SQL" for i in range(12)])
+
+
+class FakeGroq:
+    """Stands in for chat_with_groq: prefixes every line it is asked to rewrite with "E:"."""
+
+    def __init__(self):
+        self.calls = []
+        self.reply = None
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, priority=None, call_site=None, **kwargs):
+        with self._lock:
+            self.calls.append({"prompt": prompt, "priority": priority, "call_site": call_site})
+        if self.reply is not None:
+            return self.reply
+        if call_site.endswith(":lines"):
+            body = prompt.split("\n\n", 1)[1]
+            return "\n".join("E:" + line[3:] for line in body.split("\n") if line.startswith(">> "))
+        field = call_site.split(":")[1]
+        content = prompt[len(ENHANCE_PROMPTS[field].format(content="")):]
+        return "\n".join("E:" + line if line.strip() else line for line in content.split("\n"))
+
+    def sites(self):
+        return [call["call_site"] for call in self.calls]
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    fake = FakeGroq()
+    monkeypatch.setattr(resume_enhancer, "chat_with_groq", fake)
+    return fake
+
+
+@pytest.fixture
+def enhanced(groq):
+    """The section after a first, whole-section enhancement, with its line memory."""
+    text, memory = enhance_changed_lines("experience", SECTION, None)
+    groq.calls.clear()
+    return text, memory
+
+
+def test_empty_memory_enhances_whole_section(groq):
+    text, memory = enhance_changed_lines("experience", SECTION, None)
+    assert groq.sites() == ["enhance:experience"]
+    assert text.split("\n") == ["E:" + line for line in SECTION.split("\n")]
+    assert memory == record_enhancement(SECTION, text)
+
+
+def test_unchanged_section_makes_no_calls(groq, enhanced):
+    text, memory = enhanced
+    again, again_memory = enhance_changed_lines("experience", text, memory)
+    assert groq.calls == []
+    assert again == text
+    assert all(again_memory[line_key(line)] == line for line in text.split("\n"))
+
+
+def test_edited_line_is_re_enhanced_alone(groq, enhanced):
+    text, memory = enhanced
+    lines = text.split("\n")
+    lines[5] = "- rewrote the billing service"
+    result, memory = enhance_changed_lines("experience", "\n".join(lines), memory)
+    assert groq.sites() == ["enhance:experience:lines"]
+    assert ">> - rewrote the billing service" in groq.calls[0]["prompt"]
+    assert result.split("\n") == text.split("\n")[:5] + ["E:- rewrote the billing service"] + text.split("\n")[6:]
+    assert line_key("- rewrote the billing service") in memory
+
+
+def test_inserted_lines_are_enhanced_in_place(groq, enhanced):
+    text, memory = enhanced
+    lines = text.split("\n")
+    lines.insert(1, "- new line a")
+    lines.insert(12, "- new line b")
+    result, _ = enhance_changed_lines("experience", "\n".join(lines), memory)
+    # Far enough apart to go as two requests, one new line each
+    assert groq.sites() == ["enhance:experience:lines"] * 2
+    assert sorted(call["prompt"].count("\n>> ") for call in groq.calls) == [1, 1]
+    result_lines = result.split("\n")
+    assert result_lines[1] == "E:- new line a"
+    assert result_lines[12] == "E:- new line b"
+    assert [line for line in result_lines if "new line" not in line] == text.split("\n")
+
+
+def test_reverted_line_comes_back_enhanced_without_calls(groq, enhanced):
+    text, memory = enhanced
+    lines = text.split("\n")
+    lines[3] = SECTION.split("\n")[3]
+    result, _ = enhance_changed_lines("experience", "\n".join(lines), memory)
+    assert groq.calls == []
+    assert result == text
+
+
+def test_original_section_pasted_back_makes_no_calls(groq, enhanced):
+    text, memory = enhanced
+    result, _ = enhance_changed_lines("experience", SECTION, memory)
+    assert groq.calls == []
+    assert result == text
+
+
+def test_mostly_new_section_is_enhanced_whole(groq, enhanced):
+    _, memory = enhanced
+    enhance_changed_lines("experience", "totally\nnew\ntext", memory)
+    assert groq.sites() == ["enhance:experience"]
+
+
+def test_other_fields_are_enhanced_whole(groq):
+    skills = "Python, SQL\nDocker"
+    _, memory = enhance_changed_lines("skills", skills, None)
+    enhance_changed_lines("skills", skills + "\nKubernetes", memory)
+    assert groq.sites() == ["enhance:skills", "enhance:skills"]
+
+
+def test_priority_is_passed_through(groq, enhanced):
+    text, memory = enhanced
+    enhance_changed_lines("experience", text + "\n- one more line", memory, priority=PRIORITY_INTERACTIVE)
+    assert [call["priority"] for call in groq.calls] == [PRIORITY_INTERACTIVE]
+
+
+def test_error_keeps_memory(groq, enhanced):
+    text, memory = enhanced
+    groq.reply = "Error: upstream unavailable"
+    result, result_memory = enhance_changed_lines("experience", text + "\n- one more line", memory)
+    assert result == "Error: upstream unavailable"
+    assert result_memory == memory
+
+
+def test_miscounted_reply_is_retried_line_by_line(groq, enhanced, monkeypatch):
+    text, memory = enhanced
+    lines = text.split("\n")
+    lines[4:4] = ["- new line a", "- new line b"]
+    replies = iter(["E:- both lines merged into one", "E:- new line a", "E:- new line b"])
+
+    def reply(prompt, priority=None, call_site=None, **kwargs):
+        groq.calls.append({"prompt": prompt, "priority": priority, "call_site": call_site})
+        return next(replies)
+
+    monkeypatch.setattr(resume_enhancer, "chat_with_groq", reply)
+    result, _ = enhance_changed_lines("experience", "\n".join(lines), memory)
+    assert len(groq.calls) == 3
+    assert result.split("\n")[4:6] == ["E:- new line a", "E:- new line b"]
@@ -0,0 +1,59 @@
+import pytest
+
+import core.resume_pdf as resume_pdf
+from core.resume_pdf import generate_pdf, layout_section, wrap_line
+
+RESUME = {"name": "Ada Lovelace", "email": "ada@example.com", "skills": "Python, SQL",
+          "experience": "Analytical Engine\n- Wrote the first program\n- " + "very long line " * 30}
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    resume_pdf._render_pdf.cache_clear()
+    layout_section.cache_clear()
+
+
+def test_pdf_bytes_are_reused_for_identical_content():
+    first = generate_pdf(RESUME)
+    assert first.startswith(b"%PDF")
+    assert generate_pdf(dict(RESUME)) is first
+    assert resume_pdf._render_pdf.cache_info().hits == 1
+
+
+def test_editing_one_section_keeps_the_others_laid_out():
+    generate_pdf(RESUME)
+    misses = layout_section.cache_info().misses
+    changed = generate_pdf(dict(RESUME, skills="Python, SQL, Rust"))
+    assert changed != generate_pdf(RESUME)
+    assert layout_section.cache_info().misses == misses + 1
+
+
+def test_layout_wraps_and_marks_bullets():
+    entries = layout_section("Heading\n\n- short bullet\n• " + "word " * 80)
+    assert [is_bullet for is_bullet, _ in entries] == [False, True, True]
+    assert entries[0][1] == ("Heading",)
+    assert len(entries[2][1]) > 1
+
+
+def test_overlong_words_are_broken():
+    lines = wrap_line("x" * 400, 50)
+    assert len(lines) > 1 and "".join(lines) == "x" * 400
+
+
+def test_unrenderable_characters_are_dropped():
+    assert generate_pdf(dict(RESUME, name="张伟 Zhang")).startswith(b"%PDF")
+
+
+def test_failed_section_is_raised_and_not_cached(monkeypatch):
+    real_layout = resume_pdf.layout_section
+
+    def broken(content):
+        raise ValueError("layout failed")
+
+    monkeypatch.setattr(resume_pdf, "layout_section", broken)
+    with pytest.raises(Exception, match="layout failed"):
+        generate_pdf(RESUME)
+    assert resume_pdf._render_pdf.cache_info().currsize == 0
+
+    monkeypatch.setattr(resume_pdf, "layout_section", real_layout)
+    assert generate_pdf(RESUME).startswith(b"%PDF")
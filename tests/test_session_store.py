@@ -0,0 +1,115 @@
+import os
+import stat
+
+import pytest
+
+from core.session_store import SessionStore, SQLiteSessionBackend
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def make_store(path, **kwargs):
+    # A long flush interval keeps the background writer out of the way; tests flush explicitly
+    return SessionStore(SQLiteSessionBackend(path), flush_interval=3600, **kwargs)
+
+
+def test_database_is_owner_only(db_path):
+    make_store(db_path).close()
+    assert stat.S_IMODE(os.stat(db_path).st_mode) == 0o600
+
+
+def test_session_survives_a_new_store(db_path):
+    store = make_store(db_path)
+    session = store.get("a")
+    session.resume_data["name"] = "Ada"
+    session.enhancements["experience"] = {"k": "line"}
+    session.chat_history.append(("hi", "hello"))
+    assert store.flush() == 1
+    store.close()
+
+    restored = make_store(db_path).get("a")
+    assert restored.resume_data == {"name": "Ada"}
+    assert restored.enhancements == {"experience": {"k": "line"}}
+    assert list(restored.chat_history) == [("hi", "hello")]
+
+
+def test_unchanged_assignment_is_not_written(db_path):
+    store = make_store(db_path)
+    session = store.get("a")
+    session.resume_data["name"] = "Ada"
+    store.flush()
+    session.resume_data["name"] = "Ada"
+    assert store.flush() == 0
+
+
+def test_old_turns_are_read_back_from_disk(db_path):
+    store = make_store(db_path, hot_turns=2)
+    history = store.get("a").chat_history
+    turns = [(f"q{i}", f"a{i}") for i in range(6)]
+    for turn in turns:
+        history.append(turn)
+    store.flush()
+    assert len(history._turns) == 2
+    assert len(history) == 6
+    assert history[:] == turns
+    assert history[1] == turns[1]
+    assert history[-1] == turns[-1]
+
+
+def test_clean_sessions_are_evicted_and_restored(db_path):
+    store = make_store(db_path, max_sessions=2)
+    for session_id in "abc":
+        store.get(session_id).resume_data["name"] = session_id
+    store.flush()
+    assert store.stats()["resident_sessions"] == 2
+    assert store.get("a").resume_data == {"name": "a"}
+    assert store.stats()["restores"] == 1
+
+
+def test_dirty_sessions_are_not_evicted(db_path):
+    store = make_store(db_path, max_sessions=1)
+    store.get("a").resume_data["name"] = "a"
+    store.get("b")
+    assert store.get("a").resume_data == {"name": "a"}
+    assert store.stats()["restores"] == 0
+
+
+def test_clear_chat_drops_old_turns(db_path):
+    store = make_store(db_path)
+    session = store.get("a")
+    session.chat_history.append(("hi", "hello"))
+    store.flush()
+    session.clear_chat()
+    session.chat_history.append(("again", "welcome back"))
+    store.flush()
+    store.close()
+    assert list(make_store(db_path).get("a").chat_history) == [("again", "welcome back")]
+
+
+def test_exists_does_not_create_sessions(db_path):
+    store = make_store(db_path)
+    assert not store.exists("a")
+    assert store.stats()["resident_sessions"] == 0
+    store.get("a").resume_data["name"] = "Ada"
+    assert store.exists("a")
+    store.flush()
+    store.close()
+    assert make_store(db_path).exists("a")
+
+
+def test_deleted_session_is_gone_and_stays_gone(db_path):
+    store = make_store(db_path)
+    session = store.get("a")
+    session.resume_data["name"] = "Ada"
+    store.flush()
+    store.delete("a")
+    # A run that still holds the session can't write it back
+    session.resume_data["name"] = "Grace"
+    store.flush()
+    assert not store.exists("a")
+    assert store.stats()["resident_bytes"] == 0
+    store.close()
+    assert not make_store(db_path).exists("a")
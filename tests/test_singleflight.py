@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from core.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fn)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", fn))) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    while flight.stats()["followers"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    assert calls == [1]
+    assert results == ["result"] * 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_error_reaches_followers():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    while flight.stats()["followers"] < 1:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(errors) == 2
+
+
+def test_follower_makes_its_own_call_when_leader_stalls():
+    flight = SingleFlight(max_wait=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "leader"
+
+    leader = threading.Thread(target=flight.do, args=("k", slow))
+    leader.start()
+    started.wait(5)
+    assert flight.do("k", lambda: "own") == "own"
+    assert flight.stats()["follower_timeouts"] == 1
+    release.set()
+    leader.join(5)
+
+
+def test_stream_replays_pieces_to_followers():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def gen():
+        yield "a"
+        started.set()
+        release.wait(5)
+        yield "b"
+
+    leader_pieces = []
+    leader = threading.Thread(target=lambda: leader_pieces.extend(flight.stream("k", gen)))
+    leader.start()
+    started.wait(5)
+    follower = flight.stream("k", lambda: iter(["own"]))
+    assert next(follower) == "a"
+    release.set()
+    assert list(follower) == ["b"]
+    leader.join(5)
+    assert leader_pieces == ["a", "b"]
+
+
+def test_different_keys_do_not_share():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["leaders"] == 2
+    with pytest.raises(KeyError):
+        flight.do("c", lambda: {}["missing"])
@@ -0,0 +1,28 @@
+import pytest
+
+from core.skills_index import get_skills_index
+
+
+@pytest.fixture(scope="module")
+def index():
+    return get_skills_index()
+
+
+@pytest.mark.parametrize("title, role", [
+    ("Junior Developer", "Software Developer"),
+    ("Junior dev", "Software Developer"),
+    ("junior software engineer", "Software Developer"),
+    ("Sr dev", "Senior Software Engineer"),
+    ("Fronted Developer", "Frontend Developer"),
+    ("Bakend Enginer", "Backend Developer"),
+    ("Senior Data Analyst at Acme", "Data Analyst"),
+    ("qa", "QA Engineer"),
+    ("Astronaut", None),
+])
+def test_role(index, title, role):
+    assert index.role(title) == role
+
+
+def test_short_aliases_need_a_word_of_their_own(index):
+    assert index.extract_skills("I am good at communication") == (["Communication"], [])
+    assert index.extract_skills("AWS IAM, React JS")[0] == ["AWS", "Identity and Access Management", "React"]